@@ -12,7 +12,7 @@ a = Analysis(
         'encodings', 'encodings.utf_8', 'encodings.cp1252', 'encodings.latin_1',
         'PIL', 'PIL.Image', 'PIL.ImageDraw', 'PIL.ImageFont',
         'barcode', 'barcode.writer', 'barcode.writer.ImageWriter',
-        'reportlab', 'reportlab.pdfgen', 'reportlab.platypus',
+        'reportlab', 'reportlab.pdfgen', 'reportlab.platypus', 'pypdf',
         'qrcode', 'openpyxl', 'openpyxl.utils', 'pandas', 'numpy'
     ],
     hookspath=[],
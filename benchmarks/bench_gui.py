@@ -0,0 +1,235 @@
+"""
+Benchmark de la GUI simulando lectores de código de barras (keyboard wedge).
+
+Conduce AppGeneradorCP con la ventana raíz oculta y sintetiza ráfagas de <KeyRelease>
+sobre cientos de filas, midiendo add_new_row, _calculate_preview, _apply_style_to_all_rows,
+_on_mode_change y _clear_all_rows conforme crece el número de filas.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_gui                     # compara contra la línea base
+    python -m benchmarks.bench_gui --save-baseline     # graba la línea base
+    python -m benchmarks.bench_gui --rows 50,200,800 --tolerance 0.3
+
+Sin DISPLAY (Linux) intenta levantar Xvfb. Devuelve código 1 si hay regresiones.
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import time
+import tkinter as tk
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(PROJECT_ROOT, "benchmarks", "baseline_gui.json")
+DEFAULT_CSV = os.path.join(PROJECT_ROOT, "data", "frescuras.csv")
+FRESCURAS = ["J305", "L315", "A011", "K120"]
+# Se aplican antes de construir la app: sin restaurar la sesión guardada ni autoguardar (las filas
+# sintéticas no deben tocar la sesión real), sin vigilantes de archivos y sin latido de telemetría
+ISOLATED_SETTINGS = {
+    "session.enabled": False,
+    "catalog.watch.enabled": False,
+    "catalog.sources": [],
+    "telemetry.ui.enabled": False,
+}
+
+logger = logging.getLogger("bench_gui")
+
+
+def ensure_display() -> Optional[subprocess.Popen]:
+    """Si no hay servidor X, levanta un Xvfb temporal. Devuelve el proceso para cerrarlo al final."""
+    if os.name == "nt" or sys.platform == "darwin" or os.environ.get("DISPLAY"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        raise SystemExit("No hay DISPLAY ni Xvfb disponible; ejecute con xvfb-run o en un escritorio.")
+    display = ":97"
+    process = subprocess.Popen([xvfb, display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    time.sleep(1.0)
+    return process
+
+
+def isolate_settings() -> None:
+    """Sobrescribe en memoria (no en settings.yaml) las claves de ISOLATED_SETTINGS."""
+    from config.config_loader import conf
+
+    for path, value in ISOLATED_SETTINGS.items():
+        *parents, key = path.split(".")
+        node = conf._config
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[key] = value
+
+
+def timed(func: Callable[[], Any], repeat: int = 1) -> float:
+    """Milisegundos promedio de 'repeat' llamadas."""
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - t0) * 1000 / repeat
+
+
+class GuiBench:
+    def __init__(self, csv_path: str):
+        from main import AppGeneradorCP
+
+        isolate_settings()
+        self.root = tk.Tk()
+        self.root.withdraw()
+        self.app = AppGeneradorCP(self.root)
+
+        # Carga del catálogo sin el diálogo de archivo
+        self.app.catalog_sources = [csv_path]
+        self.app.input_path_var.set(csv_path)
+        self.app.catalog = self.app._load_shelf_data()
+        self.skus: List[str] = pd.read_csv(csv_path)["CODIGO"].astype(str).str.strip().tolist()
+
+        # Contador de vistas previas para comprobar que las teclas sintéticas llegan a los bindings
+        self.previews = 0
+        original = self.app._calculate_preview
+
+        def counting_preview(row):
+            self.previews += 1
+            return original(row)
+
+        self.app._calculate_preview = counting_preview
+
+    def close(self) -> None:
+        self.root.destroy()
+
+    def _reset(self) -> None:
+        self.app.mode_var.set("frescuras")
+        self.app._clear_all_rows()
+
+    def _fill_rows(self, count: int) -> None:
+        while len(self.app.rows_data) < count:
+            self.app.add_new_row()
+
+    def _type(self, entry: tk.Entry, text: str) -> int:
+        """Escribe carácter por carácter como un lector: insert + <KeyRelease> por tecla, sin pausas."""
+        for char in text:
+            entry.insert("end", char)
+            entry.event_generate("<KeyRelease>", keysym=char)
+        return len(text)
+
+    def scanner_burst(self) -> Dict[str, float]:
+        keys = 0
+        self.previews = 0
+        t0 = time.perf_counter()
+        for index, row in enumerate(self.app.rows_data):
+            keys += self._type(row["sku"], self.skus[index % len(self.skus)])
+            keys += self._type(row["frescura"], FRESCURAS[index % len(FRESCURAS)])
+        self.root.update_idletasks()
+        elapsed = (time.perf_counter() - t0) * 1000
+        if self.previews == 0:
+            logger.warning("Las teclas sintéticas no llegaron a los bindings; la ráfaga no es representativa.")
+        return {"keystrokes": keys, "burst_ms": elapsed, "per_key_ms": elapsed / max(keys, 1)}
+
+    def run_size(self, count: int, repeat: int) -> Dict[str, float]:
+        self._reset()
+        result: Dict[str, float] = {}
+
+        t0 = time.perf_counter()
+        self._fill_rows(count)
+        self.root.update_idletasks()
+        result["add_new_row_ms"] = (time.perf_counter() - t0) * 1000 / max(count - 1, 1)
+
+        burst = self.scanner_burst()
+        result["scanner_per_key_ms"] = burst["per_key_ms"]
+        result["scanner_burst_ms"] = burst["burst_ms"]
+
+        rows = self.app.rows_data
+        result["calculate_preview_ms"] = timed(lambda: [self.app._calculate_preview(row) for row in rows], repeat) / count
+        result["apply_style_to_all_rows_ms"] = timed(self.app._apply_style_to_all_rows, repeat)
+
+        result["clear_all_rows_ms"] = timed(self.app._clear_all_rows)
+
+        self._fill_rows(count)
+        self.app.mode_var.set("barcodes")
+        result["on_mode_change_ms"] = timed(self.app._on_mode_change)
+        self.app.mode_var.set("frescuras")
+        self.app._on_mode_change()
+        return result
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float, min_delta_ms: float) -> List[str]:
+    """Regresión: más lento que la línea base por encima de la tolerancia relativa y del mínimo absoluto."""
+    regressions = []
+    for size, metrics in results.items():
+        base_metrics = baseline.get(size, {})
+        for name, value in metrics.items():
+            base = base_metrics.get(name)
+            if base is None:
+                continue
+            if value > base * (1 + tolerance) and value - base > min_delta_ms:
+                regressions.append(f"{size} filas · {name}: {base:.3f} -> {value:.3f} ms (+{(value / base - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_table(results: Dict[str, Dict[str, float]]) -> None:
+    names = sorted({name for metrics in results.values() for name in metrics})
+    print(f"{'métrica (ms)':<28}" + "".join(f"{size:>12}" for size in results))
+    for name in names:
+        print(f"{name:<28}" + "".join(f"{results[size].get(name, 0.0):>12.3f}" for size in results))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de la GUI con entrada de lector simulada")
+    parser.add_argument("--rows", default="50,100,200,400", help="Tamaños de lote separados por coma")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones de las mediciones directas")
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Regresión relativa tolerada (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="Diferencia absoluta mínima para contar")
+    parser.add_argument("--output", help="Ruta para guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(filename)s:%(lineno)d: %(message)s")
+    sizes = [int(size) for size in args.rows.split(",") if size.strip()]
+
+    xvfb = ensure_display()
+    try:
+        bench = GuiBench(args.csv)
+        try:
+            results = {str(size): bench.run_size(size, args.repeat) for size in sizes}
+        finally:
+            bench.close()
+    finally:
+        if xvfb:
+            xvfb.terminate()
+
+    print_table(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Línea base guardada en {args.baseline}")
+        return 0
+
+    if not os.path.isfile(args.baseline):
+        print("Sin línea base; ejecute con --save-baseline para crearla.")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    for line in regressions:
+        print(f"REGRESIÓN {line}")
+    if not regressions:
+        print("Sin regresiones respecto a la línea base.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,9 @@ EXCLUDED_DIRS = {".venv", "venv"}
 
 PYINSTALLER_DIRS = {"build", "dist"}
 
+# Carpetas dentro de las salidas que no se vacían (puntos de control y manifiestos de corridas)
+PRESERVED_OUTPUT_DIRS = {".checkpoints", ".runs"}
+
 def cleanup_pyinstaller_temp() -> None:
     r"""Elimina carpetas temporales _MEIxxxxx de PyInstaller en %LOCALAPPDATA%\Temp."""
     import tempfile
@@ -38,6 +41,8 @@ def clear_output_folders(output_paths: List[str]) -> None:
             continue
         
         for item_name in os.listdir(folder_path):
+            if item_name in PRESERVED_OUTPUT_DIRS:
+                continue
             item_path = os.path.join(folder_path, item_name)
             try:
                 if os.path.isdir(item_path):
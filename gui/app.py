@@ -3,6 +3,7 @@ import sys
 import os
 from gui.main_window import MainWindow
 from config.config_loader import conf  # <--- IMPORTAR
+from utils.logging_setup import configure_logging
 
 def get_application_path() -> str:
     """Obtiene la ruta de la aplicación (compatible con PyInstaller)."""
@@ -11,6 +12,7 @@ def get_application_path() -> str:
     return os.path.dirname(os.path.abspath(__file__))
 
 def main():
+    configure_logging()
     root = tk.Tk()
     
     # Usar valores del YAML
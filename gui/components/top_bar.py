@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import filedialog
-from typing import Callable, Optional
+import os
+from typing import Callable, List, Optional
 
 class TopBar(tk.Frame):
     """
@@ -8,7 +9,7 @@ class TopBar(tk.Frame):
     Contiene: selector de archivo de entrada y carpeta de salida.
     
     Callbacks:
-        - on_file_selected: Se llama cuando el usuario selecciona un archivo CSV
+        - on_file_selected: Se llama con la lista de CSV seleccionados (el primero tiene precedencia)
         - on_output_changed: Se llama cuando el usuario cambia la carpeta de salida
     """
     
@@ -16,7 +17,7 @@ class TopBar(tk.Frame):
         self,
         parent: tk.Widget,
         initial_output_path: str = "",
-        on_file_selected: Optional[Callable[[str], None]] = None,
+        on_file_selected: Optional[Callable[[List[str]], None]] = None,
         on_output_changed: Optional[Callable[[str], None]] = None
     ):
         super().__init__(parent, padx=10, pady=10)
@@ -71,16 +72,16 @@ class TopBar(tk.Frame):
     # ==================== Handlers internos ====================
     
     def _handle_select_file(self):
-        """Abre diálogo para seleccionar archivo CSV."""
-        file_path = filedialog.askopenfilename(
-            title="Seleccionar archivo de frescuras",
+        """Abre diálogo para seleccionar uno o varios archivos CSV."""
+        file_paths = filedialog.askopenfilenames(
+            title="Seleccionar archivo(s) de frescuras",
             filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
         )
-        if file_path:
-            self._input_path_var.set(file_path)
+        if file_paths:
+            self._input_path_var.set(os.pathsep.join(file_paths))
             # Notificar a MainWindow via callback
             if self._on_file_selected:
-                self._on_file_selected(file_path)
+                self._on_file_selected(list(file_paths))
     
     def _handle_select_output(self):
         """Abre diálogo para seleccionar carpeta de salida."""
@@ -94,7 +95,7 @@ class TopBar(tk.Frame):
     # ==================== Métodos públicos ====================
     
     def get_input_path(self) -> str:
-        """Retorna la ruta del archivo de entrada seleccionado."""
+        """Retorna las rutas de entrada seleccionadas, separadas por os.pathsep."""
         return self._input_path_var.get()
     
     def get_output_path(self) -> str:
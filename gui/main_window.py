@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import messagebox
-from typing import Optional
-import pandas as pd
+from typing import List, Optional
+from src.catalog import BinaryCatalog, load_catalog
 from gui.components.top_bar import TopBar
 
 class MainWindow:
@@ -13,7 +13,7 @@ class MainWindow:
         self.master = master
         
         # Estado global
-        self.shelf_data: Optional[pd.DataFrame] = None
+        self.catalog: Optional[BinaryCatalog] = None
         
         # ==================== Crear componentes ====================
         
@@ -33,15 +33,13 @@ class MainWindow:
     
     # ==================== Handlers (reciben eventos de componentes) ====================
     
-    def _handle_file_selected(self, file_path: str):
+    def _handle_file_selected(self, file_paths: List[str]):
         """
-        Callback: El usuario seleccionó un archivo CSV.
-        Carga los datos y actualiza los componentes necesarios.
+        Callback: El usuario seleccionó uno o varios CSV (el primero tiene precedencia).
+        Carga el catálogo unificado y actualiza los componentes necesarios.
         """
         try:
-            df = pd.read_csv(file_path)
-            df['CODIGO'] = df['CODIGO'].astype(str).str.strip()
-            self.shelf_data = df
+            self.catalog = load_catalog(file_paths)
             
             messagebox.showinfo("Información", "Archivo cargado correctamente.")
             
@@ -50,7 +48,7 @@ class MainWindow:
             
         except Exception as e:
             messagebox.showwarning("Advertencia", f"Error al cargar: {e}")
-            self.shelf_data = None
+            self.catalog = None
     
     def _handle_output_changed(self, folder_path: str):
         """
@@ -0,0 +1,163 @@
+import json
+import logging
+import os
+import queue
+import threading
+import tkinter as tk
+from typing import Any, Dict, List, Optional
+from config.config_loader import conf
+from utils.utils import get_application_path
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = "sesion.json"
+JOURNAL_FILE = "sesion.journal"
+
+_STOP = object()
+
+
+class SessionStore:
+    """
+    Persistencia de la cuadrícula de pedidos entre reinicios.
+
+    El hilo de Tk solo actualiza un modelo en memoria (filas como [sku, frescura, copias])
+    y encola; un hilo de escritura hace toda la E/S:
+      - cada edición de fila se anexa al diario (una línea JSON);
+      - tras 'debounce_ms' sin cambios se escribe la instantánea completa (tmp + os.replace)
+        y el diario se vacía, porque la instantánea ya lo contiene.
+    Al restaurar: instantánea + reproducción del diario.
+    """
+
+    def __init__(self, master: tk.Misc, folder: str, debounce_ms: int = 1500):
+        self.master = master
+        self.folder = folder
+        self.debounce_ms = debounce_ms
+        self.snapshot_path = os.path.join(folder, SNAPSHOT_FILE)
+        self.journal_path = os.path.join(folder, JOURNAL_FILE)
+        self.mode = ""
+        self.input_path = ""
+        self.rows: List[List[str]] = []
+        self._after_id: Optional[str] = None
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_loop, name="session-writer", daemon=True)
+        os.makedirs(folder, exist_ok=True)
+        self._writer.start()
+
+    @classmethod
+    def from_config(cls, master: tk.Misc) -> Optional["SessionStore"]:
+        if not conf.get("session.enabled", True):
+            return None
+        folder = conf.get("session.folder", "sesion")
+        if not os.path.isabs(folder):
+            folder = os.path.join(get_application_path(), folder)
+        try:
+            return cls(master, folder, int(conf.get("session.debounce_ms", 1500)))
+        except OSError as e:
+            logger.warning(f"Sesión desactivada: {e}")
+            return None
+
+    # ==================== Lectura (arranque) ====================
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Estado guardado: {'mode', 'input_path', 'rows'} o None si no hay nada que restaurar."""
+        state: Dict[str, Any] = {"mode": "", "input_path": "", "rows": []}
+        try:
+            if os.path.isfile(self.snapshot_path):
+                with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                    state.update(json.load(f))
+            if os.path.isfile(self.journal_path):
+                with open(self.journal_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            self._apply(state, json.loads(line))
+                        except ValueError:
+                            # Última línea cortada por un cierre abrupto
+                            break
+        except (OSError, ValueError) as e:
+            logger.warning(f"No se pudo leer la sesión anterior: {e}")
+            return None
+
+        self.mode, self.input_path, self.rows = state["mode"], state["input_path"], state["rows"]
+        if not any(any(value.strip() for value in row[:2]) for row in state["rows"]):
+            return None
+        return state
+
+    @staticmethod
+    def _apply(state: Dict[str, Any], entry: List[Any]) -> None:
+        op = entry[0]
+        if op == "row":
+            index, values = entry[1], entry[2:]
+            rows = state["rows"]
+            while len(rows) <= index:
+                rows.append(["", "", "1"])
+            rows[index] = values
+
+    # ==================== Cambios (hilo de Tk, sin E/S) ====================
+
+    def set_row(self, index: int, values: List[str]) -> None:
+        while len(self.rows) <= index:
+            self.rows.append(["", "", "1"])
+        if self.rows[index] == values:
+            return
+        self.rows[index] = values
+        self._queue.put(("journal", json.dumps(["row", index, *values], ensure_ascii=False)))
+        self._schedule_snapshot()
+
+    def set_rows(self, rows: List[List[str]], mode: str, input_path: str) -> None:
+        """
+        Cambio estructural (borrar, limpiar, cambiar modo): se encola la instantánea de inmediato,
+        porque los índices del diario posterior ya se refieren a la nueva disposición.
+        """
+        self.rows = rows
+        self.mode = mode
+        self.input_path = input_path
+        if self._after_id is not None:
+            self.master.after_cancel(self._after_id)
+        self._enqueue_snapshot()
+
+    def _schedule_snapshot(self) -> None:
+        if self._after_id is not None:
+            self.master.after_cancel(self._after_id)
+        self._after_id = self.master.after(self.debounce_ms, self._enqueue_snapshot)
+
+    def _enqueue_snapshot(self) -> None:
+        self._after_id = None
+        state = {"mode": self.mode, "input_path": self.input_path, "rows": [list(row) for row in self.rows]}
+        self._queue.put(("snapshot", state))
+
+    def close(self) -> None:
+        """Escribe la instantánea final y espera al hilo de escritura (llamar al cerrar la ventana)."""
+        if self._after_id is not None:
+            try:
+                self.master.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+        self._enqueue_snapshot()
+        self._queue.put((_STOP, None))
+        self._writer.join(timeout=5)
+
+    # ==================== Hilo de escritura ====================
+
+    def _write_loop(self) -> None:
+        while True:
+            kind, payload = self._queue.get()
+            if kind is _STOP:
+                return
+            try:
+                if kind == "journal":
+                    with open(self.journal_path, "a", encoding="utf-8") as f:
+                        f.write(payload + "\n")
+                else:
+                    self._write_snapshot(payload)
+            except OSError as e:
+                logger.warning(f"No se pudo guardar la sesión: {e}")
+
+    def _write_snapshot(self, state: Dict[str, Any]) -> None:
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.snapshot_path)
+        # Todo lo anterior en la cola ya está en la instantánea
+        with open(self.journal_path, "w", encoding="utf-8"):
+            pass
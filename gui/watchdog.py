@@ -0,0 +1,204 @@
+import bisect
+import json
+import logging
+import os
+import time
+import tkinter as tk
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from config.config_loader import conf
+from utils.utils import get_application_path
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores de los buckets del histograma (ms); el último es abierto
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+MAX_STALLS = 200
+
+
+class LatencyHistogram:
+    """Histograma de latencias con buckets fijos: registrar es O(log n) y no guarda muestras."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Aproximación por el límite superior del bucket que contiene el percentil."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(float(BUCKETS_MS[index]), self.max_ms) if index < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={limit}" for limit in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "buckets_ms": dict(zip(labels, self.counts)),
+        }
+
+
+class UiWatchdog:
+    """
+    Vigila el bucle principal de Tk con un latido periódico (after()).
+    Si el latido llega tarde por encima del umbral, registra un bloqueo y lo atribuye
+    al manejador más largo que corrió desde el latido anterior.
+    También acumula histogramas de duración por manejador y de tecla -> vista previa.
+    """
+
+    def __init__(self, master: tk.Misc, heartbeat_ms: int = 100, stall_threshold_ms: int = 200):
+        self.master = master
+        self.heartbeat_ms = heartbeat_ms
+        self.stall_threshold_ms = stall_threshold_ms
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.stalls: List[Dict[str, Any]] = []
+        # Manejadores que corrieron desde el último latido: (nombre, duración ms)
+        self._recent: List[Tuple[str, float]] = []
+        self._running: Optional[str] = None
+        # Tiempo del manejador en curso pasado en diálogos modales (esperando al usuario)
+        self._paused_ms = 0.0
+        self._expected = 0.0
+        self._after_id: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, master: tk.Misc) -> Optional["UiWatchdog"]:
+        if not conf.get("telemetry.ui.enabled", True):
+            return None
+        return cls(
+            master,
+            heartbeat_ms=int(conf.get("telemetry.ui.heartbeat_ms", 100)),
+            stall_threshold_ms=int(conf.get("telemetry.ui.stall_threshold_ms", 200)),
+        )
+
+    # ==================== Latido ====================
+
+    def start(self) -> None:
+        self._expected = time.perf_counter() + self.heartbeat_ms / 1000
+        self._after_id = self.master.after(self.heartbeat_ms, self._beat)
+
+    def stop(self) -> None:
+        if self._after_id is not None:
+            self.master.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _beat(self) -> None:
+        now = time.perf_counter()
+        lag_ms = (now - self._expected) * 1000
+        self.record("heartbeat_lag", max(lag_ms, 0.0))
+        if lag_ms > self.stall_threshold_ms:
+            handler, duration = max(self._recent, key=lambda item: item[1], default=(self._running or "desconocido", 0.0))
+            stall = {
+                "at": datetime.now().isoformat(timespec="seconds"),
+                "lag_ms": round(lag_ms, 1),
+                "handler": handler,
+                "handler_ms": round(duration, 1),
+            }
+            if len(self.stalls) < MAX_STALLS:
+                self.stalls.append(stall)
+            logger.warning(f"GUI bloqueada {lag_ms:.0f} ms (manejador: {handler})")
+        self._recent.clear()
+        self._expected = now + self.heartbeat_ms / 1000
+        self._after_id = self.master.after(self.heartbeat_ms, self._beat)
+
+    # ==================== Mediciones ====================
+
+    def record(self, metric: str, value_ms: float) -> None:
+        histogram = self.histograms.get(metric)
+        if histogram is None:
+            histogram = self.histograms[metric] = LatencyHistogram()
+        histogram.add(value_ms)
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[None]:
+        """Mide un manejador de la GUI; los anidados se atribuyen al externo."""
+        if self._running is not None:
+            yield
+            return
+        self._running = name
+        self._paused_ms = 0.0
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = (time.perf_counter() - t0) * 1000 - self._paused_ms
+            self._running = None
+            self._recent.append((name, duration))
+            self.record(f"handler:{name}", duration)
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """Excluye del manejador en curso el tiempo de un diálogo modal: mide el trabajo, no la respuesta del usuario."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self._running is not None:
+                self._paused_ms += (time.perf_counter() - t0) * 1000
+
+    def mark_keystroke(self, t0: float) -> None:
+        """Registra tecla -> vista previa cuando Tk queda libre (incluye el redibujado pendiente)."""
+        self.master.after_idle(lambda: self.record("keystroke_to_preview", (time.perf_counter() - t0) * 1000))
+
+    # ==================== Exportación ====================
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "generated": datetime.now().isoformat(timespec="seconds"),
+            "heartbeat_ms": self.heartbeat_ms,
+            "stall_threshold_ms": self.stall_threshold_ms,
+            "stalls": list(self.stalls),
+            "histograms": {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())},
+        }
+
+    def export_json(self, path: Optional[str] = None) -> str:
+        if path is None:
+            path = conf.get("telemetry.ui.export_file", "logs/ui_latencia.json")
+            if not os.path.isabs(path):
+                path = os.path.join(get_application_path(), path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
+        logger.info(f"Telemetría de la GUI exportada: {path}")
+        return path
+
+
+def modal(owner: Any, dialog: Callable, *args, **kwargs) -> Any:
+    """Abre un diálogo modal (messagebox, filedialog) sin contar su espera en el manejador de 'owner'."""
+    watchdog = getattr(owner, "watchdog", None)
+    if watchdog is None:
+        return dialog(*args, **kwargs)
+    with watchdog.paused():
+        return dialog(*args, **kwargs)
+
+
+def tracked(name: str) -> Callable:
+    """Decorador para métodos de la GUI con atributo 'watchdog' (puede ser None)."""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            watchdog = getattr(self, "watchdog", None)
+            if watchdog is None:
+                return func(self, *args, **kwargs)
+            with watchdog.track(name):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,28 +1,55 @@
 import tkinter as tk
 import sys
+import threading
 from tkinter import messagebox, ttk, filedialog
 import logging
+import multiprocessing
 import os
+import queue
 import re
-import pandas as pd
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from src.frescures import Frescurer
 from src.barcoder import Barcoder
 from utils.utils import validate_frescures, validate_sku, frescure_to_date
 from config.config_loader import conf
+from utils.profiling import profiled
+from utils.logging_setup import configure_logging
+from gui.watchdog import UiWatchdog, modal, tracked
+from gui.session import SessionStore
+from src.engine import LabelEngine
+from src.labels import LabelLine
+from src.combined import MODE_COMBINED, CombinedRun
+from src.catalog import BinaryCatalog, diff_catalogs, expand_sources, load_catalog, release_catalog
+from utils.file_watcher import FileWatcher
+from utils.output_cache import build_key
+from utils.retention import get_retention
 
 logger = logging.getLogger(__name__)
 
-if not getattr(sys, 'frozen', False):
-    from cleanning_service import run_full_cleanup
-    run_full_cleanup(os.path.dirname(os.path.abspath(__file__)))
+# Solo en el proceso principal: los procesos de trabajo (spawn) reimportan este módulo
+if __name__ == "__main__":
+    configure_logging()
+    if not getattr(sys, 'frozen', False):
+        from cleanning_service import run_full_cleanup
+        run_full_cleanup(os.path.dirname(os.path.abspath(__file__)))
 
 class AppGeneradorCP:
     def __init__(self, master):
         self.master = master
-        self.shelf_data = None
-        self.shelf_times_path = None
+        # Catálogo de shelf life (binario mapeado) y su vigilante de cambios
+        self.catalog: Optional[BinaryCatalog] = None
+        self.catalog_watchers: List[FileWatcher] = []
+        self._reload_lock = threading.Lock()
+        self._catalog_updates: queue.SimpleQueue = queue.SimpleQueue()
+        self._catalog_poll_id: Optional[str] = None
+        # Latido del bucle de Tk y latencias de la GUI (None si la telemetría está desactivada)
+        self.watchdog = UiWatchdog.from_config(master)
+        if self.watchdog:
+            self.watchdog.start()
+        # Fuentes del catálogo en orden de precedencia (archivos, carpetas o patrones)
+        self.catalog_sources: List[str] = []
         
         def resource_path(relative_path):
             """ Obtiene la ruta absoluta al recurso, funciona para dev y para PyInstaller """
@@ -50,8 +77,11 @@ class AppGeneradorCP:
         # --- Datos y Variables ---
         frescura_pattern = conf.get("validation.frescura.pattern", r"^[A-L](0[1-9]|1[0-9]|2[0-9]|3[0-1])[0-9]$")
         self.frescures_pattern = re.compile(frescura_pattern)
+        self._label_engine: Optional[LabelEngine] = None
         self.rows_data: List[Dict[str, Any]] = []
         self.mode_var = tk.StringVar(value="frescuras")
+        # Modo con el que se dibujó la cuadrícula (decide si un cambio de modo debe rehacer las filas)
+        self._grid_mode = "frescuras"
         self.deletion_mode = False
 
         # ==========================================================
@@ -108,6 +138,7 @@ class AppGeneradorCP:
         
         tk.Radiobutton(mode_frame, text="Hojas de Consumo Preferente", variable=self.mode_var, value="frescuras", command=self._on_mode_change).pack(side="left", padx=20)
         tk.Radiobutton(mode_frame, text="Código de Barras", variable=self.mode_var, value="barcodes", command=self._on_mode_change).pack(side="left", padx=20)
+        tk.Radiobutton(mode_frame, text="Ambos", variable=self.mode_var, value=MODE_COMBINED, command=self._on_mode_change).pack(side="left", padx=20)
         
         # ==========================================================
         # SECCIÓN 2: Encabezados
@@ -181,8 +212,20 @@ class AppGeneradorCP:
         self.btn_clear.pack(side="left", padx=5)
         self.btn_generate = tk.Button(self.control_frame, text="GENERAR", command=self.execute_generation, bg=self.colors['button_generate_bg'], fg=self.colors['button_generate_fg'], font=self.fonts['button'], height=2)
         self.btn_generate.pack(side="right", padx=10)
-
-        self.add_new_row()
+        # Anexar: solo renderiza las copias de cada línea que no se entregaron en corridas anteriores (se avisa cuáles se omiten)
+        self.append_var = tk.BooleanVar(value=False)
+        self.chk_append = tk.Checkbutton(self.control_frame, text="Anexar a la anterior", variable=self.append_var, font=self.fonts['default'])
+        self.chk_append.pack(side="right", padx=5)
+
+        # Autoguardado de la cuadrícula; al arrancar se restaura la sesión anterior si existe
+        self.session = SessionStore.from_config(master)
+        if not self._restore_session():
+            # Fuentes fijas del catálogo en settings.yaml (catalog.sources), si las hay
+            configured = [path if os.path.isabs(path) else os.path.join(application_path, path)
+                          for path in conf.get("catalog.sources", []) or []]
+            if configured:
+                self._set_catalog_sources(configured)
+            self.add_new_row()
 
     # ==========================================================
     # MÉTODOS DE ESTILO CENTRALIZADOS
@@ -314,23 +357,90 @@ class AppGeneradorCP:
     # ==========================================================
     # LÓGICA DE NEGOCIO
     # ==========================================================
-    def _load_shelf_data(self) -> pd.DataFrame:
+    def _load_shelf_data(self) -> Optional[BinaryCatalog]:
         try:
-            if self.shelf_times_path and os.path.exists(self.shelf_times_path):
-                df = pd.read_csv(self.shelf_times_path)
-                df['CODIGO'] = df['CODIGO'].astype(str).str.strip()
-                return df
-            return pd.DataFrame()
+            if self.catalog_sources:
+                return load_catalog(self.catalog_sources)
+            return None
         except Exception as e:
             logger.error(f"Error cargando CSV: {e}")
-            return pd.DataFrame()
+            return None
+
+    def _set_catalog_sources(self, sources: List[str]) -> bool:
+        """Carga el catálogo unificado de las fuentes (la primera tiene precedencia) y empieza a vigilarlas."""
+        self.catalog_sources = [source for source in sources if source]
+        self.input_path_var.set(os.pathsep.join(self.catalog_sources))
+        self.catalog = self._load_shelf_data()
+        self._watch_catalog()
+        if self.catalog is not None and self.catalog.conflicts:
+            logger.warning(f"Catálogo con {len(self.catalog.conflicts)} SKUs en conflicto entre fuentes")
+        return bool(self.catalog)
+
+    def _watch_catalog(self):
+        """Vigila los CSV cargados: al cambiar alguno se recarga en segundo plano (ver _poll_catalog_updates)."""
+        for watcher in self.catalog_watchers:
+            watcher.stop()
+        self.catalog_watchers = []
+        if not self.catalog_sources or not conf.get("catalog.watch.enabled", True):
+            return
+        # Base del diff; solo la tocan los hilos de los vigilantes a partir de aquí
+        self._watch_baseline = self.catalog
+        sources = tuple(self.catalog_sources)
+        interval = float(conf.get("catalog.watch.interval_seconds", 1.0))
+        self.catalog_watchers = [
+            FileWatcher(path, lambda _path: self._reload_catalog(sources), interval=interval).start()
+            for path in expand_sources(self.catalog_sources)
+        ]
+        if self._catalog_poll_id is None:
+            self._catalog_poll_id = self.master.after(250, self._poll_catalog_updates)
+
+    def _reload_catalog(self, sources: tuple):
+        """Hilo del vigilante: reconstruye el catálogo (solo se relee la fuente editada) y calcula qué SKUs cambiaron."""
+        with self._reload_lock:
+            new_catalog = load_catalog(list(sources))
+            changed = diff_catalogs(self._watch_baseline, new_catalog)
+            self._watch_baseline = new_catalog
+        self._catalog_updates.put((sources, new_catalog, changed))
+
+    def _poll_catalog_updates(self):
+        """Hilo de Tk: aplica el catálogo recargado y recalcula solo las filas con SKU modificado."""
+        self._catalog_poll_id = None
+        if not self.catalog_watchers:
+            return
+        while True:
+            try:
+                sources, new_catalog, changed = self._catalog_updates.get_nowait()
+            except queue.Empty:
+                break
+            if sources != tuple(self.catalog_sources) or new_catalog is self.catalog:
+                continue
+            old_catalog, self.catalog = self.catalog, new_catalog
+            if old_catalog is not None:
+                release_catalog(old_catalog)
+            refreshed = 0
+            for row in self.rows_data:
+                sku = row['sku'].get().strip()
+                if sku.isdecimal() and int(sku) in changed:
+                    self._calculate_preview(row)
+                    refreshed += 1
+            logger.info(f"Catálogo recargado: {len(changed)} SKUs cambiaron, {refreshed} filas actualizadas")
+        self._catalog_poll_id = self.master.after(250, self._poll_catalog_updates)
 
     def _select_output_folder(self):
-        folder = filedialog.askdirectory()
+        folder = modal(self, filedialog.askdirectory)
         if folder:
             self.output_path_var.set(folder)
 
+    @tracked("_on_mode_change")
     def _on_mode_change(self):
+        mode = self.mode_var.get()
+        # Frescuras y combinado usan las mismas columnas: las filas se conservan
+        if mode != "barcodes" and self._grid_mode != "barcodes":
+            self._grid_mode = mode
+            self._session_sync()
+            return
+        self._grid_mode = mode
+
         # 1. Limpiar todas las filas existentes primero
         # Usamos una versión interna que no dependa del modo actual
         for row in self.rows_data:
@@ -338,7 +448,6 @@ class AppGeneradorCP:
         self.rows_data.clear()
         
         # 2. Configurar el nuevo modo
-        mode = self.mode_var.get()
         if mode == "barcodes":
             self.header_sku.config(text="Texto")
             self.header_frescura.grid_remove()
@@ -353,20 +462,30 @@ class AppGeneradorCP:
         
         # 3. Aplicar estilos (aunque estará vacío o con una nueva fila)
         self._apply_style_to_all_rows()
+        self._session_sync()
     
+    @tracked("add_new_row")
     def add_new_row(self):
         # Bloquear si estamos en modo eliminación
         if self.deletion_mode:
-            messagebox.showwarning("Finalice o cancele la eliminación de filas primero.")
+            modal(self, messagebox.showwarning, "Finalice o cancele la eliminación de filas primero.")
             return
         
         # Bloquear si estamos en modo frescuras y no hay archivo cargado
         # (solo si ya hay filas, para no bloquear la primera fila inicial)
-        if self.mode_var.get() == "frescuras" and not self.input_path_var.get():
+        if self.mode_var.get() != "barcodes" and not self.input_path_var.get():
             if self.rows_data:  # Solo mostrar mensaje si ya hay filas
-                messagebox.showwarning("Archivo requerido", "Debe cargar un archivo CSV antes de agregar filas en modo Frescuras.")
+                modal(self, messagebox.showwarning, "Archivo requerido", "Debe cargar un archivo CSV antes de agregar filas en modo Frescuras.")
             return
-        
+
+        row_data = self._create_row()
+
+        # Aplicar estilo según el estado actual
+        state = self._get_current_row_state()
+        self._apply_row_style(row_data, state)
+
+    def _create_row(self, values: List[str] = None) -> Dict[str, Any]:
+        """Construye los widgets de una fila (opcionalmente con valores) sin aplicar estilo."""
         row_frame = tk.Frame(self.input_frame)
         row_frame.pack(fill="x", pady=2)
 
@@ -386,7 +505,12 @@ class AppGeneradorCP:
         entry_frescura.grid(row=0, column=3, padx=2)
         
         entry_cant = tk.Entry(row_frame, width=self.W_COL3 + 2, justify="center", font=self.fonts['default'])
-        entry_cant.insert(0, "1")
+        if values:
+            entry_sku.insert(0, values[0])
+            entry_frescura.insert(0, values[1])
+            entry_cant.insert(0, values[2])
+        else:
+            entry_cant.insert(0, "1")
         entry_cant.grid(row=0, column=4, padx=(2, 0))
 
         # Validadores
@@ -432,17 +556,70 @@ class AppGeneradorCP:
         }
         
         # Bindings para cálculo en tiempo real
-        entry_sku.bind("<KeyRelease>", lambda e, r=row_data: self._calculate_preview(r))
-        entry_frescura.bind(
-            "<KeyRelease>",
-            lambda e, r=row_data: (self._force_upper(e.widget), self._calculate_preview(r))
-        )
+        entry_sku.bind("<KeyRelease>", lambda e, r=row_data: self._on_row_key(r))
+        entry_frescura.bind("<KeyRelease>", lambda e, r=row_data: self._on_row_key(r, e.widget))
+        entry_cant.bind("<KeyRelease>", lambda e, r=row_data: self._session_row(r))
         
         self.rows_data.append(row_data)
-        
-        # Aplicar estilo según el estado actual
-        state = self._get_current_row_state()
-        self._apply_row_style(row_data, state)
+        return row_data
+
+    def _on_row_key(self, row: Dict[str, Any], upper_widget: tk.Entry = None):
+        """Tecla en una fila: normaliza y recalcula la vista previa, midiendo tecla -> vista previa."""
+        t0 = time.perf_counter()
+        if upper_widget is not None:
+            self._force_upper(upper_widget)
+        self._calculate_preview(row)
+        if self.watchdog:
+            self.watchdog.mark_keystroke(t0)
+        self._session_row(row)
+
+    # ==========================================================
+    # SESIÓN (autoguardado y restauración de la cuadrícula)
+    # ==========================================================
+    def _row_values(self, row: Dict[str, Any]) -> List[str]:
+        return [row['sku'].get(), row['frescura'].get(), row['copias'].get()]
+
+    def _session_row(self, row: Dict[str, Any]):
+        """Edición de una fila: se anexa al diario de la sesión."""
+        if self.session and row in self.rows_data:
+            self.session.set_row(self.rows_data.index(row), self._row_values(row))
+
+    def _session_sync(self):
+        """Cambio estructural de la cuadrícula: instantánea completa de la sesión."""
+        if self.session:
+            rows = [self._row_values(row) for row in self.rows_data]
+            self.session.set_rows(rows, self.mode_var.get(), self.input_path_var.get())
+
+    def _restore_session(self) -> bool:
+        """Reconstruye la cuadrícula guardada de una sola vez: estilo y vistas previas al final, no por fila."""
+        state = self.session.load() if self.session else None
+        if not state:
+            return False
+
+        mode = state["mode"] or self.mode_var.get()
+        self.mode_var.set(mode)
+        self._grid_mode = mode
+        if mode == "barcodes":
+            self.header_sku.config(text="Texto")
+            self.header_frescura.grid_remove()
+
+        sources = [path for path in state["input_path"].split(os.pathsep) if path and os.path.exists(path)]
+        if sources:
+            self._set_catalog_sources(sources)
+
+        for values in state["rows"]:
+            self._create_row(values)
+        self._apply_style_to_all_rows()
+        self._schedule_previews(0)
+        logger.info(f"Sesión restaurada: {len(self.rows_data)} filas")
+        return True
+
+    def _schedule_previews(self, start: int, chunk: int = 50):
+        """Calcula las vistas previas por bloques para no congelar el arranque con muchas filas."""
+        for row in self.rows_data[start:start + chunk]:
+            self._calculate_preview(row)
+        if start + chunk < len(self.rows_data):
+            self.master.after(1, lambda: self._schedule_previews(start + chunk, chunk))
 
     def _force_upper(self, widget: tk.Entry):
         current = widget.get()
@@ -479,6 +656,7 @@ class AppGeneradorCP:
             return True
         return P.isdigit() and len(P) <= 2
 
+    @tracked("_calculate_preview")
     def _calculate_preview(self, row):
         """Lógica para mostrar descripción o cálculo completo."""
         mode = self.mode_var.get()
@@ -487,7 +665,7 @@ class AppGeneradorCP:
         status_lbl = row['status']
          
         # Si estamos en modo frescuras y no hay CSV cargado válido
-        if mode == "frescuras" and (self.shelf_data is None or self.shelf_data.empty):
+        if mode != "barcodes" and not self.catalog:
             status_lbl.config(
                 text=self.texts['status_blocked'],
                 fg=self.colors['status_blocked_fg'],
@@ -521,9 +699,9 @@ class AppGeneradorCP:
             return
 
         # 2. Buscar en Base de Datos
-        match = self.shelf_data.loc[self.shelf_data['CODIGO'] == sku_val]
+        match = self.catalog.lookup(sku_val)
         
-        if match.empty:
+        if match is None:
             status_lbl.config(
                 text="SKU inexistente",
                 fg=self.colors['status_warn'],
@@ -532,7 +710,7 @@ class AppGeneradorCP:
             return
 
         # Obtener Descripción
-        descripcion = match.iloc[0]['DESCRIPCION']
+        descripcion, shelf_life = match
 
         # CASO A: Solo SKU ingresado -> Mostrar solo Descripción
         if not frescura_val:
@@ -562,7 +740,7 @@ class AppGeneradorCP:
             return
 
         try:
-            shelf_days = int(match.iloc[0]['SHELF_LIFE'])
+            shelf_days = int(shelf_life)
             fecha_base = datetime.strptime(fecha_elab_str, "%d/%m/%Y")
             fecha_venc = fecha_base + timedelta(days=shelf_days)
             fecha_venc_str = fecha_venc.strftime("%d/%m/%Y")
@@ -598,31 +776,35 @@ class AppGeneradorCP:
 
         entry.delete(0, tk.END)
         entry.insert(0, str(val))
+        for row in self.rows_data:
+            if row['copias'] is entry:
+                self._session_row(row)
+                break
     
+    @tracked("_select_input_file")
     def _select_input_file(self):
-        """Permite elegir el CSV y lo carga solo cuando el usuario lo selecciona."""
-        file_path = filedialog.askopenfilename(
-            title="Seleccionar archivo de frescuras",
+        """Permite elegir uno o varios CSV (el primero tiene precedencia) y los carga al seleccionarlos."""
+        file_paths = modal(
+            self, filedialog.askopenfilenames,
+            title="Seleccionar archivo(s) de frescuras",
             filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
         )
-        if not file_path:
+        if not file_paths:
             return
 
-        self.input_path_var.set(file_path)
-        self.shelf_times_path = file_path
-
-        self.shelf_data = self._load_shelf_data()
-        if self.shelf_data.empty:
-            messagebox.showwarning("Advertencia", "No se pudieron cargar datos del archivo seleccionado.")
+        if not self._set_catalog_sources(list(file_paths)):
+            modal(self, messagebox.showwarning, "Advertencia", "No se pudieron cargar datos del archivo seleccionado.")
         else:
             # Aplicar estilos a TODAS las filas consistentemente
             self._apply_style_to_all_rows()
-            messagebox.showinfo("Información", "Archivo cargado correctamente.")
+            self._session_sync()
+            modal(self, messagebox.showinfo, "Información", "Archivo cargado correctamente.")
 
+    @tracked("_clear_all_rows")
     def _clear_all_rows(self):
         # Bloquear si estamos en modo eliminación
         if self.deletion_mode:
-            messagebox.showwarning("Operación bloqueada", "Finalice o cancele la eliminación de filas primero.")
+            modal(self, messagebox.showwarning, "Operación bloqueada", "Finalice o cancele la eliminación de filas primero.")
             return
         
         for row in self.rows_data:
@@ -632,11 +814,12 @@ class AppGeneradorCP:
         # Solo agregar fila si hay archivo cargado en modo frescuras, o si es modo barcodes
         if self.mode_var.get() == "barcodes" or self.input_path_var.get():
             self.add_new_row()
+        self._session_sync()
 
     def _toggle_deletion_mode(self):
         """Alterna entre modo normal y modo de eliminación."""
         if not self.rows_data:
-            messagebox.showinfo("Sin filas", "No hay filas para eliminar.")
+            modal(self, messagebox.showinfo, "Sin filas", "No hay filas para eliminar.")
             return
 
         if not self.deletion_mode:
@@ -652,7 +835,7 @@ class AppGeneradorCP:
             selected_indices = [i for i, row in enumerate(self.rows_data) if row['select_var'].get()]
 
             if not selected_indices:
-                messagebox.showinfo("Seleccione filas", "Marca al menos una fila para eliminar.")
+                modal(self, messagebox.showinfo, "Seleccione filas", "Marca al menos una fila para eliminar.")
                 return
 
             for index in reversed(selected_indices):
@@ -667,6 +850,7 @@ class AppGeneradorCP:
                 self._renumber_rows()
 
             self._exit_deletion_mode()
+            self._session_sync()
     
     def _cancel_deletion_mode(self):
         """Cancela el modo de eliminación sin eliminar filas."""
@@ -702,96 +886,96 @@ class AppGeneradorCP:
             row['index_lbl'].config(text=str(i))
             row['select_var'].set(False)
 
+    @staticmethod
+    def _skipped_summary(skipped: List[LabelLine], limit: int = 10) -> str:
+        """Texto para el aviso final del modo anexar: filas que ya se habían entregado y no se repitieron."""
+        if not skipped:
+            return ""
+        rows = [f"  {' '.join(filter(None, (line.text, line.frescura)))} x{line.copies}" for line in skipped[:limit]]
+        if len(skipped) > limit:
+            rows.append(f"  ... (+{len(skipped) - limit} filas más)")
+        return "\n\nOmitidas por estar ya impresas en la corrida anterior:\n" + "\n".join(rows)
+
+    def _engine(self) -> LabelEngine:
+        """Motor de etiquetas del catálogo actual; se reconstruye cuando cambia el catálogo o la plantilla en disco."""
+        engine = self._label_engine
+        if engine is None or engine.catalog is not self.catalog or not engine.template_is_current():
+            self._label_engine = LabelEngine(self.catalog, self.template_path, self.frescures_pattern.pattern)
+        return self._label_engine
+
+    @tracked("execute_generation")
+    @profiled("execute_generation", lambda self: self.output_path_var.get())
     def execute_generation(self):
         # Bloquear si estamos en modo eliminación
         if self.deletion_mode:
-            messagebox.showwarning("Operación bloqueada", "Finalice o cancele la eliminación de filas primero.")
+            modal(self, messagebox.showwarning, "Operación bloqueada", "Finalice o cancele la eliminación de filas primero.")
             return
         
         mode = self.mode_var.get()
         if not mode:
             return
         
-        # --- VALIDACIÓN PREVIA ---
-        filas_invalidas = []
-        for idx, row in enumerate(self.rows_data, start=1):
-            v1 = row['sku'].get().strip()
-            v2 = row['frescura'].get().strip()
-            cant_str = row['copias'].get().strip()
-            status_text = row['status'].cget('text')
-            status_fg = row['status'].cget('fg')
-            
-            if mode == "frescuras":
-                if not v1 or not v2:
-                    filas_invalidas.append(f"Fila {idx}: Datos incompletos")
-                    continue
-                if status_fg == self.colors['status_warn'] or "inválido" in status_text.lower() or "inexistente" in status_text.lower():
-                    filas_invalidas.append(f"Fila {idx}: {status_text}")
-            else:
-                if not v1:
-                    filas_invalidas.append(f"Fila {idx}: Texto vacío")
-                    continue
-            
-            try:
-                cantidad = int(cant_str)
-                if cantidad < 1 or cantidad > 99:
-                    filas_invalidas.append(f"Fila {idx}: Cantidad fuera de rango (1-99)")
-            except ValueError:
-                filas_invalidas.append(f"Fila {idx}: Cantidad inválida")
-        
-        if filas_invalidas:
-            msg_error = "Corrija los siguientes errores antes de generar:\n\n" + "\n".join(filas_invalidas)
-            messagebox.showerror("Validación fallida", msg_error)
+        # --- VALIDACIÓN PREVIA (una sola pasada sobre el pedido completo) ---
+        rows = [[row['sku'].get(), row['frescura'].get(), row['copias'].get()] for row in self.rows_data]
+        engine = self._engine()
+        # El modo combinado se valida como frescuras: los códigos usan el mismo SKU
+        validation = engine.validate("frescuras" if mode == MODE_COMBINED else mode, rows)
+
+        if not validation.is_valid:
+            msg_error = "Corrija los siguientes errores antes de generar:\n\n" + "\n".join(validation.messages())
+            modal(self, messagebox.showerror, "Validación fallida", msg_error)
             return
         
         output_folder = self.output_path_var.get()
-        query: List[List[str]] = []
         
         if not os.path.exists(output_folder):
             try:
                 os.makedirs(output_folder)
             except OSError:
-                messagebox.showerror("Error", "Ruta de salida inválida.")
+                modal(self, messagebox.showerror, "Error", "Ruta de salida inválida.")
                 return
 
-        for row in self.rows_data:
-            v1 = row['sku'].get().strip()
-            v2 = row['frescura'].get().strip()
-            cant_str = row['copias'].get().strip()
-            
-            if not v1:
-                continue
-            
-            try:
-                cantidad = int(cant_str)
-                if cantidad < 1:
-                    cantidad = 1
-            except:
-                cantidad = 1
-
-            if mode == "frescuras":
-                if validate_sku(v1) and validate_frescures(self.frescures_pattern, v2.upper()):
-                    for _ in range(cantidad):
-                        query.append([v1, v2.upper()])
-            else:
-                query.append([v1, str(cantidad)])
+        query: List[List[str]] = validation.to_query()
 
         if not query:
-            messagebox.showwarning("Vacío", "No hay datos válidos.")
+            modal(self, messagebox.showwarning, "Vacío", "No hay datos válidos.")
             return
 
+        # Cada generación en su subcarpeta; la retención expulsa las viejas en segundo plano.
+        # La llave del pedido hace que repetir un pedido que falló reutilice su carpeta y reanude
+        append = self.append_var.get()
+        job_key = build_key(mode=mode, query=query)
+        output_retention = get_retention(output_folder, "output")
+        temp_retention = get_retention(self.temp_path, "temp")
+        job_folder = output_retention.job_folder(mode, job_key, append) if output_retention else output_folder
+        temp_folder = temp_retention.job_folder(mode, job_key) if temp_retention else self.temp_path
+        finished = False
+
         try:
-            if mode == "frescuras":
-                Frescurer(self.shelf_times_path, self.template_path, output_folder, query, self.project_root, self.frescures_pattern)
+            if mode == MODE_COMBINED:
+                run = CombinedRun(engine, self.catalog_sources, job_folder, temp_folder, validation, self.project_root, append=append)
+                msg = "Hojas de consumo preferente y códigos generados."
+            elif mode == "frescuras":
+                run = Frescurer(self.catalog_sources, self.template_path, job_folder, query, self.project_root, self.frescures_pattern, append=append, engine=engine)
                 msg = "Hojas de consumo preferente generadas."
             else:
-                Barcoder(output_folder, self.temp_path, query, self.project_root)
+                run = Barcoder(job_folder, temp_folder, query, self.project_root, append=append)
                 msg = "Códigos generados."
-            messagebox.showinfo("Éxito", f"{msg}\nEn: {output_folder}")
+            finished = True
+            # Con render.sharding.delivery zip/parts un documento grande llega en partes: se avisa
+            split = [os.path.basename(path) for path in run.outputs if path.endswith(".zip") or os.path.isdir(path)]
+            if split:
+                msg += f"\nEntregado en partes: {', '.join(split)}"
+            modal(self, messagebox.showinfo, "Éxito", f"{msg}\nEn: {job_folder}{self._skipped_summary(run.skipped)}")
             
         except Exception as e:
             logger.error(f"Error: {e}", exc_info=True)
-            messagebox.showerror("Error", str(e))
+            modal(self, messagebox.showerror, "Error", str(e))
+        finally:
+            if output_retention:
+                output_retention.commit(job_folder, finished)
+            if temp_retention:
+                temp_retention.commit(temp_folder, finished)
 
 def main():
     root = tk.Tk()
@@ -809,9 +993,21 @@ def main():
     root.rowconfigure(3, weight=1) 
     root.columnconfigure(0, weight=1)
 
-    AppGeneradorCP(root)
+    app = AppGeneradorCP(root)
     root.mainloop()
 
+    if app.session:
+        app.session.close()
+    for watcher in app.catalog_watchers:
+        watcher.stop()
+
+    if app.watchdog:
+        try:
+            app.watchdog.export_json()
+        except OSError as e:
+            logger.warning(f"No se pudo exportar la telemetría de la GUI: {e}")
+
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -1,8 +1,13 @@
 import os
+import re
 import logging
 from src.frescures import Frescurer
 from src.barcoder import Barcoder
-from services.cache_service import  clear_output_folders
+from src.validation import validate_order
+from src.catalog import load_catalog
+from config.config_loader import conf
+from utils.output_cache import build_key
+from utils.retention import get_retention
 
 def configure_logging():
     level_name = os.environ.get("DEBUG", "INFO").upper()
@@ -29,10 +34,24 @@ if __name__ == "__main__":
     TEMP_PATH = os.path.join(PROJECT_ROOT, "temp_img")
     query = [["3017868", "J305"], ["3010443", "L305"], ["3010443 ", "L315"], ["1234567", "Z135"], ["30173672", "J265"]]
     # query = [["119", "2"], ["117", "4"], ["50", "1"], ["80", "2"]]
-    clear_output_folders([OUTPUT_PATH], TEMP_PATH)
+    # Misma validación que la GUI: se reportan las filas inválidas y se generan las válidas
+    catalog_codes = load_catalog(SHELF_TIMES).code_strings()
+    validation = validate_order(query, "frescuras", catalog_codes)
+    for message in validation.messages():
+        logger.warning(message)
+
+    # Subcarpeta por corrida (la misma si el pedido anterior igual no terminó); las viejas se expulsan por presupuesto
+    retention = get_retention(OUTPUT_PATH, "output")
+    job_path = retention.job_folder("frescuras", build_key(mode="frescuras", query=validation.to_query())) if retention else OUTPUT_PATH
+    finished = False
     try:
-        # Barcoder(OUTPUT_PATH, TEMP_PATH, query, PROJECT_ROOT)
-        Frescurer(SHELF_TIMES, TEMPLATE, OUTPUT_PATH, query, PROJECT_ROOT)
+        # Barcoder(OUTPUT_PATH, TEMP_PATH, validate_order(query, "barcodes").to_query(), PROJECT_ROOT)
+        frescures_pattern = re.compile(conf.get("validation.frescura.pattern", r"^[A-L](0[1-9]|1[0-9]|2[0-9]|3[0-1])[0-9]$"))
+        Frescurer(SHELF_TIMES, TEMPLATE, job_path, validation.to_query(), PROJECT_ROOT, frescures_pattern)
+        finished = True
         logger.info("Proceso terminado correctamente.")
     except Exception as e:
         logger.error("Error en el proceso de generación del modelo: {e}", exc_info=True)
+    finally:
+        if retention:
+            retention.commit(job_path, finished)
@@ -0,0 +1,365 @@
+import glob
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+import numpy as np
+import pandas as pd
+from config.config_loader import conf
+from utils.output_cache import file_fingerprint
+from utils.utils import get_application_path
+
+logger = logging.getLogger(__name__)
+
+# Formato binario del catálogo (little-endian, secciones alineadas a 8 bytes):
+#   cabecera: magic(8s) versión(I) reservado(I) cantidad(Q) sha256 del CSV fuente en hex(64s)
+#   codes:  int64[cantidad], ordenados ascendentemente
+#   shelf:  int32[cantidad]   (-1 = vida útil desconocida)
+#   desc:   uint32[cantidad + 1] desplazamientos dentro del blob de descripciones (UTF-8)
+#   blob:   descripciones concatenadas
+MAGIC = b"CATLG001"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIQ64s")
+UNKNOWN_SHELF_LIFE = -1
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _binary_prefix(key: str, name: str) -> str:
+    folder = conf.get("catalog.binary_folder", "cache_catalogo")
+    if not os.path.isabs(folder):
+        folder = os.path.join(get_application_path(), folder)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(folder, f"{name}_{digest}_")
+
+
+def _source_prefix(csv_path: str) -> str:
+    source = os.path.abspath(csv_path)
+    return _binary_prefix(source, os.path.splitext(os.path.basename(source))[0])
+
+
+def catalog_binary_path(csv_path: str, fingerprint: str) -> str:
+    """
+    Ruta del binario derivado de un CSV dentro de catalog.binary_folder.
+    Lleva la huella del contenido en el nombre: una versión nueva nunca reemplaza a un archivo
+    que otro proceso tenga mapeado (en Windows eso fallaría), solo se agrega al lado.
+    """
+    return f"{_source_prefix(csv_path)}{fingerprint[:16]}.bin"
+
+
+def read_catalog_csv(csv_path: str) -> pd.DataFrame:
+    """Lee un CSV de shelf life (CODIGO, DESCRIPCION, SHELF_LIFE) con los tipos normalizados."""
+    df = pd.read_csv(csv_path, dtype=str, encoding="utf-8-sig", keep_default_na=False)
+    df["CODIGO"] = df["CODIGO"].str.strip()
+    df["DESCRIPCION"] = df.get("DESCRIPCION", pd.Series("", index=df.index)).fillna("")
+    df["SHELF_LIFE"] = pd.to_numeric(df["SHELF_LIFE"], errors="coerce")
+    return df
+
+
+def write_binary_catalog(df: pd.DataFrame, bin_path: str, fingerprint: str) -> int:
+    """Escribe el catálogo binario de forma atómica (tmp + os.replace). Devuelve la cantidad de SKUs."""
+    codes = pd.to_numeric(df["CODIGO"], errors="coerce")
+    invalid = codes.isna()
+    if invalid.any():
+        logger.warning(f"{int(invalid.sum())} códigos no numéricos omitidos del catálogo binario")
+    df = df.loc[~invalid].assign(_code=codes[~invalid].astype(np.int64))
+    # Ante duplicados gana la primera aparición, igual que la búsqueda en el DataFrame
+    df = df.drop_duplicates("_code", keep="first").sort_values("_code", kind="stable")
+
+    count = len(df)
+    code_array = df["_code"].to_numpy(dtype="<i8")
+    shelf_array = df["SHELF_LIFE"].fillna(UNKNOWN_SHELF_LIFE).to_numpy().astype("<i4")
+    encoded = [str(text).encode("utf-8") for text in df["DESCRIPCION"]]
+    offsets = np.zeros(count + 1, dtype="<u4")
+    if count:
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+
+    os.makedirs(os.path.dirname(bin_path) or ".", exist_ok=True)
+    tmp_path = f"{bin_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, count, fingerprint.encode("ascii")))
+            for array in (code_array, shelf_array, offsets):
+                f.write(b"\0" * (_align(f.tell()) - f.tell()))
+                f.write(array.tobytes())
+            f.write(b"".join(encoded))
+        os.replace(tmp_path, bin_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return count
+
+
+def _stored_fingerprint(bin_path: str) -> Optional[str]:
+    try:
+        with open(bin_path, "rb") as f:
+            magic, version, _, _, fingerprint = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+    return fingerprint.decode("ascii")
+
+
+def _prune_stale(prefix: str, current: str) -> None:
+    """Elimina versiones anteriores del binario; las que sigan mapeadas por otro proceso se dejan."""
+    folder = os.path.dirname(prefix)
+    for item in os.scandir(folder):
+        if item.path.startswith(prefix) and item.name.endswith(".bin") and item.path != current:
+            try:
+                os.remove(item.path)
+            except OSError:
+                pass
+
+
+def build_binary_catalog(csv_path: str) -> str:
+    """
+    Genera (o reutiliza) el binario de un CSV. Incremental: si ya existe el binario
+    de esta huella de contenido no se vuelve a leer el CSV.
+    """
+    fingerprint = file_fingerprint(csv_path)
+    if fingerprint is None:
+        raise FileNotFoundError(csv_path)
+    bin_path = catalog_binary_path(csv_path, fingerprint)
+    if _stored_fingerprint(bin_path) == fingerprint:
+        return bin_path
+    count = write_binary_catalog(read_catalog_csv(csv_path), bin_path, fingerprint)
+    logger.info(f"Catálogo binario generado: {bin_path} ({count} SKUs)")
+    _prune_stale(_source_prefix(csv_path), bin_path)
+    return bin_path
+
+
+class BinaryCatalog:
+    """
+    Lector de solo lectura sobre el binario mapeado en memoria.
+    Los arreglos son vistas sobre el mmap (sin copia): varios procesos que abren el mismo
+    archivo comparten las páginas del sistema operativo. Búsqueda binaria con np.searchsorted.
+    """
+
+    def __init__(self, bin_path: str):
+        self.path = bin_path
+        with open(bin_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count, fingerprint = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"Catálogo binario con formato desconocido: {bin_path}")
+        self.fingerprint = fingerprint.decode("ascii")
+        # Solo para catálogos unificados (ver load_catalog)
+        self.conflicts: List[Dict[str, Any]] = []
+
+        offset = _align(HEADER.size)
+        self.codes = np.frombuffer(self._mmap, dtype="<i8", count=count, offset=offset)
+        offset = _align(offset + self.codes.nbytes)
+        self.shelf_life = np.frombuffer(self._mmap, dtype="<i4", count=count, offset=offset)
+        offset = _align(offset + self.shelf_life.nbytes)
+        self._desc_offsets = np.frombuffer(self._mmap, dtype="<u4", count=count + 1, offset=offset)
+        self._blob_start = offset + self._desc_offsets.nbytes
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def index_of(self, sku: str) -> int:
+        """Posición del SKU en el arreglo ordenado, o -1 si no existe."""
+        sku = str(sku).strip()
+        if not sku.isdecimal():
+            return -1
+        code = int(sku)
+        position = int(np.searchsorted(self.codes, code))
+        if position < len(self.codes) and self.codes[position] == code:
+            return position
+        return -1
+
+    def __contains__(self, sku: str) -> bool:
+        return self.index_of(sku) >= 0
+
+    def description_at(self, index: int) -> str:
+        start = self._blob_start + int(self._desc_offsets[index])
+        end = self._blob_start + int(self._desc_offsets[index + 1])
+        return self._mmap[start:end].decode("utf-8")
+
+    def lookup(self, sku: str) -> Optional[Tuple[str, Optional[int]]]:
+        """(descripción, días de vida útil o None) del SKU, o None si no está en el catálogo."""
+        index = self.index_of(sku)
+        if index < 0:
+            return None
+        shelf_life = int(self.shelf_life[index])
+        return self.description_at(index), (None if shelf_life == UNKNOWN_SHELF_LIFE else shelf_life)
+
+    def code_strings(self) -> set:
+        """Códigos como texto de 7 dígitos (para validar pedidos en bloque)."""
+        width = int(conf.get("validation.sku.max_length", 7))
+        return {str(code).zfill(width) for code in self.codes.tolist()}
+
+    def close(self) -> None:
+        # Las vistas de numpy deben soltarse antes de cerrar el mmap
+        self.codes = self.shelf_life = self._desc_offsets = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+
+_open_catalogs: Dict[str, BinaryCatalog] = {}
+_open_lock = threading.Lock()
+
+
+def get_catalog(csv_path: str) -> BinaryCatalog:
+    """
+    Catálogo del CSV para este proceso: construye el binario si hace falta y lo abre una sola vez.
+    Si el CSV cambió, la huella nueva apunta a otro binario; los lectores anteriores conservan su mapeo.
+    """
+    bin_path = build_binary_catalog(csv_path)
+    return _open_binary(bin_path, _source_prefix(csv_path))
+
+
+def _open_binary(bin_path: str, prefix: str) -> BinaryCatalog:
+    """Abre (una vez por proceso) el binario y suelta las referencias a versiones anteriores del mismo origen."""
+    with _open_lock:
+        catalog = _open_catalogs.get(bin_path)
+        if catalog is None:
+            for stale in [path for path in _open_catalogs if path.startswith(prefix)]:
+                # Sin cerrar: quien aún lo use lo conserva; se libera al soltar la última referencia
+                del _open_catalogs[stale]
+            catalog = _open_catalogs[bin_path] = BinaryCatalog(bin_path)
+        return catalog
+
+
+def release_catalog(catalog: BinaryCatalog) -> None:
+    """Cierra un catálogo reemplazado para que su binario pueda eliminarse."""
+    with _open_lock:
+        if _open_catalogs.get(catalog.path) is catalog:
+            del _open_catalogs[catalog.path]
+    catalog.close()
+
+
+def diff_catalogs(old: Optional[BinaryCatalog], new: BinaryCatalog) -> Set[int]:
+    """
+    SKUs (como enteros) cuyo registro cambió entre dos catálogos: altas, bajas,
+    vida útil o descripción distinta. Altas, bajas y vida útil se comparan vectorizado.
+    """
+    if old is None:
+        return set(new.codes.tolist())
+    changed = set(np.setxor1d(old.codes, new.codes, assume_unique=True).tolist())
+    common, old_index, new_index = np.intersect1d(old.codes, new.codes, assume_unique=True, return_indices=True)
+    shelf_changed = old.shelf_life[old_index] != new.shelf_life[new_index]
+    changed.update(common[shelf_changed].tolist())
+    same_shelf = ~shelf_changed
+    for code, i, j in zip(common[same_shelf].tolist(), old_index[same_shelf].tolist(), new_index[same_shelf].tolist()):
+        if old.description_at(i) != new.description_at(j):
+            changed.add(code)
+    return changed
+
+
+# ==================== Varias fuentes ====================
+
+def expand_sources(sources: Union[str, Sequence[str]]) -> List[str]:
+    """
+    Lista ordenada de CSVs a partir de rutas de archivo, carpetas (todos sus *.csv) o patrones glob.
+    El orden de la lista es el orden de precedencia; los repetidos se conservan en su primera posición.
+    """
+    if isinstance(sources, str):
+        sources = [sources]
+    paths: List[str] = []
+    for source in sources:
+        if os.path.isdir(source):
+            found = sorted(glob.glob(os.path.join(source, "*.csv")))
+        elif glob.has_magic(source):
+            found = sorted(glob.glob(source))
+        else:
+            found = [source]
+        for path in found:
+            path = os.path.abspath(path)
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def _merge_conflicts(catalogs: List[BinaryCatalog], paths: List[str], ranks: np.ndarray, indices: np.ndarray,
+                     codes: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> List[Dict[str, Any]]:
+    """Conflictos: SKUs presentes en varias fuentes con vida útil o descripción distinta a la ganadora."""
+    conflicts: List[Dict[str, Any]] = []
+    for start, count in zip(starts[counts > 1].tolist(), counts[counts > 1].tolist()):
+        winner_rank, winner_index = int(ranks[start]), int(indices[start])
+        winner = catalogs[winner_rank]
+        winner_entry = (winner.description_at(winner_index), int(winner.shelf_life[winner_index]))
+        overridden = []
+        for position in range(start + 1, start + count):
+            rank, index = int(ranks[position]), int(indices[position])
+            entry = (catalogs[rank].description_at(index), int(catalogs[rank].shelf_life[index]))
+            if entry != winner_entry:
+                overridden.append({"source": paths[rank], "description": entry[0], "shelf_life": entry[1]})
+        if overridden:
+            conflicts.append({
+                "sku": int(codes[start]),
+                "source": paths[winner_rank],
+                "description": winner_entry[0],
+                "shelf_life": winner_entry[1],
+                "overridden": overridden,
+            })
+    return conflicts
+
+
+def load_catalog(sources: Union[str, Sequence[str]]) -> BinaryCatalog:
+    """
+    Catálogo unificado de una o varias fuentes. Cada fuente se compila a su propio binario
+    (cacheado por huella), así que al editar un archivo solo ese se vuelve a leer; la unión
+    se hace sobre los arreglos ya compilados y también se guarda como binario por huella.
+    Precedencia (catalog.precedence): 'first' = gana la primera fuente que tenga el SKU, 'last' = la última.
+    Los conflictos quedan en 'catalog.conflicts' y se registran en el log.
+    """
+    paths = expand_sources(sources)
+    if not paths:
+        raise FileNotFoundError("No se encontraron archivos de catálogo")
+    catalogs = [get_catalog(path) for path in paths]
+    if len(catalogs) == 1:
+        return catalogs[0]
+
+    precedence = conf.get("catalog.precedence", "first")
+    order = list(range(len(catalogs))) if precedence == "first" else list(reversed(range(len(catalogs))))
+    ordered_paths = [paths[i] for i in order]
+    ordered = [catalogs[i] for i in order]
+
+    fingerprint = hashlib.sha256("|".join(f"{path}={catalog.fingerprint}" for path, catalog in zip(ordered_paths, ordered)).encode("utf-8")).hexdigest()
+    prefix = _binary_prefix("|".join(ordered_paths), "catalogo_unificado")
+    bin_path = f"{prefix}{fingerprint[:16]}.bin"
+    with _open_lock:
+        cached = _open_catalogs.get(bin_path)
+    if cached is not None:
+        return cached
+
+    # Todas las filas de todas las fuentes, ordenadas por (código, rango de precedencia)
+    codes = np.concatenate([catalog.codes for catalog in ordered])
+    ranks = np.concatenate([np.full(len(catalog), rank, dtype=np.int32) for rank, catalog in enumerate(ordered)])
+    indices = np.concatenate([np.arange(len(catalog), dtype=np.int64) for catalog in ordered])
+    sort = np.lexsort((ranks, codes))
+    codes, ranks, indices = codes[sort], ranks[sort], indices[sort]
+    unique_codes, starts, counts = np.unique(codes, return_index=True, return_counts=True)
+
+    conflicts = _merge_conflicts(ordered, ordered_paths, ranks, indices, codes, starts, counts)
+
+    if _stored_fingerprint(bin_path) != fingerprint:
+        winners = zip(ranks[starts].tolist(), indices[starts].tolist())
+        rows = [(ordered[rank].description_at(index), int(ordered[rank].shelf_life[index])) for rank, index in winners]
+        df = pd.DataFrame({
+            "CODIGO": unique_codes.astype(str),
+            "DESCRIPCION": [description for description, _ in rows],
+            "SHELF_LIFE": [shelf_life for _, shelf_life in rows],
+        })
+        write_binary_catalog(df, bin_path, fingerprint)
+        logger.info(f"Catálogo unificado de {len(paths)} fuentes: {len(unique_codes)} SKUs")
+        _prune_stale(prefix, bin_path)
+
+    if conflicts:
+        logger.warning(f"{len(conflicts)} SKUs con datos distintos entre fuentes; gana la de mayor precedencia")
+        for conflict in conflicts:
+            logger.debug(f"Conflicto SKU {conflict['sku']}: {conflict['source']} sobre {[item['source'] for item in conflict['overridden']]}")
+
+    catalog = _open_binary(bin_path, prefix)
+    catalog.conflicts = conflicts
+    return catalog
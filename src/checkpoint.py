@@ -0,0 +1,91 @@
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Any, Dict, Optional
+from src.labels import LabelJob
+from utils.output_cache import build_key
+
+logger = logging.getLogger(__name__)
+
+# Carpeta oculta dentro de la salida; cleanning_service la respeta al vaciar salidas
+CHECKPOINT_DIR = ".checkpoints"
+MANIFEST_NAME = "manifest.json"
+
+
+def job_fingerprint(job: LabelJob, **extra: Any) -> str:
+    """Huella del trabajo: si cambian las líneas o la forma de partirlo, no se reanuda."""
+    return build_key(kind=job.kind, lines=[line.to_list() for line in job.lines], **extra)
+
+
+class JobCheckpoint:
+    """
+    Manifiesto de progreso de un trabajo largo que se escribe por partes.
+    Guarda qué partes terminaron (con su ruta) y el índice de la siguiente etiqueta.
+    Se reescribe completo y de forma atómica en cada avance y se elimina al terminar.
+    """
+
+    def __init__(self, output_path: str, name: str, fingerprint: str, total_parts: int):
+        self.folder = os.path.join(output_path, CHECKPOINT_DIR, name)
+        self.manifest_path = os.path.join(self.folder, MANIFEST_NAME)
+        self.fingerprint = fingerprint
+        self.manifest: Dict[str, Any] = self._load(total_parts)
+
+    def _load(self, total_parts: int) -> Dict[str, Any]:
+        fresh = {
+            "fingerprint": self.fingerprint,
+            "total_parts": total_parts,
+            "next_label": 0,
+            "parts": {},
+            "updated": time.time(),
+        }
+        if not os.path.isfile(self.manifest_path):
+            return fresh
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Manifiesto de reanudación ilegible, se reinicia: {e}")
+            return fresh
+        if manifest.get("fingerprint") != self.fingerprint or manifest.get("total_parts") != total_parts:
+            logger.info(f"Trabajo distinto al del punto de control en {self.folder}: se reinicia")
+            return fresh
+        done = len(manifest.get("parts", {}))
+        if done:
+            logger.info(f"Reanudando trabajo: {done}/{total_parts} partes ya terminadas (etiqueta {manifest['next_label']})")
+        return manifest
+
+    def completed_part(self, index: int) -> Optional[str]:
+        """Ruta de la parte si ya terminó en una corrida anterior y el archivo sigue existiendo."""
+        entry = self.manifest["parts"].get(str(index))
+        if entry and os.path.exists(entry["path"]):
+            return entry["path"]
+        return None
+
+    def mark_done(self, index: int, path: str, labels: int) -> None:
+        self.manifest["parts"][str(index)] = {"path": path, "labels": labels}
+        # Siguiente etiqueta = fin del tramo contiguo de partes terminadas
+        next_label = 0
+        for part in range(1, self.manifest["total_parts"] + 1):
+            entry = self.manifest["parts"].get(str(part))
+            if entry is None:
+                break
+            next_label += entry["labels"]
+        self.manifest["next_label"] = next_label
+        self.manifest["updated"] = time.time()
+        self._write()
+
+    def _write(self) -> None:
+        os.makedirs(self.folder, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, separators=(",", ":"))
+        os.replace(tmp_path, self.manifest_path)
+
+    def finish(self) -> None:
+        """Trabajo completo: se elimina el punto de control (y la carpeta raíz si quedó vacía)."""
+        shutil.rmtree(self.folder, ignore_errors=True)
+        root = os.path.dirname(self.folder)
+        if os.path.isdir(root) and not os.listdir(root):
+            os.rmdir(root)
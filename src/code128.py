@@ -0,0 +1,272 @@
+import logging
+import os
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from config.config_loader import conf
+
+logger = logging.getLogger(__name__)
+
+# Anchos barra/espacio de los 106 símbolos de Code128 (valor = índice) + STOP (13 módulos)
+PATTERNS = (
+    "212222", "222122", "222221", "121223", "121322", "131222", "122213", "122312", "132212", "221213",
+    "221312", "231212", "112232", "122132", "122231", "113222", "123122", "123221", "223211", "221132",
+    "221231", "213212", "223112", "312131", "311222", "321122", "321221", "312212", "322112", "322211",
+    "212123", "212321", "232121", "111323", "131123", "131321", "112313", "132113", "132311", "211313",
+    "231113", "231311", "112133", "112331", "132131", "113123", "113321", "133121", "313121", "211331",
+    "231131", "213113", "213311", "213131", "311123", "311321", "331121", "312113", "312311", "332111",
+    "314111", "221411", "431111", "111224", "111422", "121124", "121421", "141122", "141221", "112214",
+    "112412", "122114", "122411", "142112", "142211", "241211", "221114", "413111", "241112", "134111",
+    "111242", "121142", "121241", "114212", "124112", "124211", "411212", "421112", "421211", "212141",
+    "214121", "412121", "111143", "111341", "131141", "114113", "114311", "411113", "411311", "113141",
+    "114131", "311141", "411131", "211412", "211214", "211232", "2331112",
+)
+STOP = 106
+START = {"A": 103, "B": 104, "C": 105}
+SWITCH = {"A": 101, "B": 100, "C": 99}
+
+
+def _pattern_bits(widths: str) -> np.ndarray:
+    """'212222' -> [1,1,0,1,1,0,0,...]: barras (1) y espacios (0) alternados empezando por barra."""
+    return np.repeat(np.arange(len(widths)) % 2 == 0, [int(w) for w in widths]).astype(np.uint8)
+
+
+# Tabla de módulos precalculada: un arreglo de bits por valor
+MODULES = tuple(_pattern_bits(widths) for widths in PATTERNS)
+
+
+def value_in_set(char: str, code_set: str) -> Optional[int]:
+    """Valor del carácter en el subconjunto A o B, o None si no se puede representar."""
+    code = ord(char)
+    if code_set == "B" and 32 <= code <= 127:
+        return code - 32
+    if code_set == "A":
+        if 32 <= code <= 95:
+            return code - 32
+        if 0 <= code < 32:
+            return code + 64
+    return None
+
+
+SHIFT = 98
+_SETS = ("C", "B", "A")  # Orden de preferencia en empates
+_INF = float("inf")
+
+
+def _pair(text: str, i: int) -> Optional[int]:
+    """Valor en el subconjunto C de los dos dígitos en 'i', o None."""
+    pair = text[i:i + 2]
+    return int(pair) if len(pair) == 2 and pair.isdigit() and pair.isascii() else None
+
+
+def encode_values(text: str) -> List[int]:
+    """
+    Valores de símbolo (inicio, datos, cambios de subconjunto, checksum, stop) con la secuencia
+    de subconjuntos más corta. Programación dinámica de derecha a izquierda sobre (posición, subconjunto):
+    consumir un carácter en A/B, un par de dígitos en C, un SHIFT A<->B para un solo carácter,
+    o cambiar de subconjunto (un símbolo) antes de consumir. Todos los símbolos miden 11 módulos,
+    así que menos símbolos = símbolo más angosto.
+    """
+    if not text:
+        raise ValueError("Code128 requiere texto")
+    n = len(text)
+    # consume[i][s]: costo desde i estando en s sin cambiar antes de consumir; best[i][s]: permitiendo un cambio
+    consume = [dict.fromkeys(_SETS, _INF) for _ in range(n + 1)]
+    best = [dict.fromkeys(_SETS, _INF) for _ in range(n + 1)]
+    choice: List[dict] = [{} for _ in range(n + 1)]
+    consume[n] = dict.fromkeys(_SETS, 0)
+    best[n] = dict.fromkeys(_SETS, 0)
+    for i in range(n - 1, -1, -1):
+        for code_set in _SETS:
+            options = []
+            if code_set == "C":
+                if _pair(text, i) is not None:
+                    options.append((1 + best[i + 2]["C"], ("pair",)))
+            else:
+                other = "B" if code_set == "A" else "A"
+                if value_in_set(text[i], code_set) is not None:
+                    options.append((1 + best[i + 1][code_set], ("char",)))
+                elif value_in_set(text[i], other) is not None:
+                    options.append((2 + best[i + 1][code_set], ("shift", other)))
+            if options:
+                consume[i][code_set], choice[i][code_set] = min(options, key=lambda option: option[0])
+        for code_set in _SETS:
+            best[i][code_set] = consume[i][code_set]
+            for target in _SETS:
+                if target != code_set and 1 + consume[i][target] < best[i][code_set]:
+                    best[i][code_set] = 1 + consume[i][target]
+                    choice[i][code_set] = ("switch", target)
+
+    current = min(_SETS, key=lambda code_set: consume[0][code_set])
+    if consume[0][current] == _INF:
+        bad = next(char for char in text if value_in_set(char, "A") is None and value_in_set(char, "B") is None)
+        raise ValueError(f"Carácter no representable en Code128: {bad!r}")
+    values: List[int] = [START[current]]
+    i = 0
+    while i < n:
+        step = choice[i][current]
+        if step[0] == "switch":
+            current = step[1]
+            values.append(SWITCH[current])
+            step = choice[i][current]
+        if step[0] == "pair":
+            values.append(_pair(text, i))
+            i += 2
+        elif step[0] == "shift":
+            values.extend((SHIFT, value_in_set(text[i], step[1])))
+            i += 1
+        else:
+            values.append(value_in_set(text[i], current))
+            i += 1
+    return with_checksum(values)
+
+
+def with_checksum(values: List[int]) -> List[int]:
+    checksum = (values[0] + sum(position * value for position, value in enumerate(values[1:], start=1))) % 103
+    return values + [checksum, STOP]
+
+
+def module_array(values: Sequence[int], quiet_modules: int = 10) -> np.ndarray:
+    """Arreglo de módulos (1 = barra) con zona de silencio a ambos lados."""
+    quiet = np.zeros(quiet_modules, dtype=np.uint8)
+    return np.concatenate([quiet, *(MODULES[value] for value in values), quiet])
+
+
+@lru_cache(maxsize=int(conf.get("barcodes.encoding_cache_size", 4096)))
+def encoded_modules(text: str, quiet_modules: int = 10) -> np.ndarray:
+    """
+    Módulos de 'text' memorizados en un LRU acotado que comparten todas las corridas del proceso:
+    los mismos SKU se imprimen en muchas copias y trabajos. El arreglo es de solo lectura.
+    """
+    modules = module_array(encode_values(text), quiet_modules)
+    modules.flags.writeable = False
+    return modules
+
+
+def log_cache_stats() -> None:
+    """Registra el uso del LRU de patrones codificados."""
+    info = encoded_modules.cache_info()
+    lookups = info.hits + info.misses
+    rate = info.hits / lookups * 100 if lookups else 0.0
+    logger.info(f"Caché Code128: {info.hits}/{lookups} aciertos ({rate:.1f}%), {info.currsize}/{info.maxsize} patrones")
+
+
+class SymbolStyle:
+    """Geometría del símbolo en píxeles a partir de milímetros y DPI (sección barcodes.symbol)."""
+
+    def __init__(self, dpi: int = 300, module_width_mm: float = 0.25, bar_height_mm: float = 15.0,
+                 quiet_modules: int = 10, text: bool = True, font_size_px: int = 0, font_path: str = "arial.ttf"):
+        self.dpi = dpi
+        self.module_px = max(1, round(module_width_mm / 25.4 * dpi))
+        self.bar_height_px = max(1, round(bar_height_mm / 25.4 * dpi))
+        self.quiet_modules = quiet_modules
+        self.text = text
+        self.font_size_px = font_size_px or max(8, round(10 / 72 * dpi))
+        self.font_path = font_path
+
+    @classmethod
+    def from_config(cls) -> "SymbolStyle":
+        return cls(
+            dpi=int(conf.get("barcodes.symbol.dpi", 300)),
+            module_width_mm=float(conf.get("barcodes.symbol.module_width_mm", 0.25)),
+            bar_height_mm=float(conf.get("barcodes.symbol.bar_height_mm", 15)),
+            quiet_modules=int(conf.get("barcodes.symbol.quiet_modules", 10)),
+            text=bool(conf.get("barcodes.symbol.text", True)),
+            font_size_px=int(conf.get("barcodes.symbol.font_size_px", 0)),
+            font_path=conf.get("barcodes.symbol.font_path", "arial.ttf"),
+        )
+
+    def key(self) -> tuple:
+        return (self.dpi, self.module_px, self.bar_height_px, self.quiet_modules, self.text, self.font_size_px, self.font_path)
+
+
+@lru_cache(maxsize=8)
+def load_font(path: str, size: int) -> ImageFont.ImageFont:
+    """Fuente TrueType de 'path' (nombre o ruta); si no está instalada, la fuente por defecto de Pillow."""
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        try:
+            return ImageFont.load_default(size=size)
+        except TypeError:  # Pillow < 10.1
+            return ImageFont.load_default()
+
+
+@lru_cache(maxsize=1024)
+def _glyph(font_path: str, size: int, char: str) -> Tuple[np.ndarray, int]:
+    """Tinta (True) de un carácter y su avance en píxeles; se dibuja con PIL una sola vez por carácter."""
+    font = load_font(font_path, size)
+    _, _, right, bottom = font.getbbox(char)
+    image = Image.new("1", (max(1, right), max(1, bottom)), 1)
+    ImageDraw.Draw(image).text((0, 0), char, font=font, fill=0)
+    return ~np.asarray(image), round(font.getlength(char))
+
+
+def _text_ink(text: str, font_path: str, size: int) -> np.ndarray:
+    """Texto legible compuesto con glifos cacheados (sin kerning, suficiente para números y códigos)."""
+    glyphs = [_glyph(font_path, size, char) for char in text]
+    width = sum(advance for _, advance in glyphs) + max(glyph.shape[1] for glyph, _ in glyphs)
+    ink = np.zeros((max(glyph.shape[0] for glyph, _ in glyphs), width), dtype=bool)
+    x = 0
+    for glyph, advance in glyphs:
+        ink[:glyph.shape[0], x:x + glyph.shape[1]] |= glyph
+        x += advance
+    return ink[:, :max(x, 1)]
+
+
+def rasterize(text: str, style: Optional[SymbolStyle] = None) -> Image.Image:
+    """
+    Imagen de 1 bit del Code128 de 'text'. La fila de barras se expande con np.repeat
+    y se replica a toda la altura por broadcasting; no hay una llamada de dibujo por barra.
+    """
+    style = style or SymbolStyle.from_config()
+    bars = encoded_modules(text, style.quiet_modules).astype(bool)
+    row = np.repeat(~bars, style.module_px)  # True = blanco en modo "1"
+    text_height = int(style.font_size_px * 1.4) if style.text else 0
+    canvas = np.ones((style.bar_height_px + text_height, row.size), dtype=bool)
+    canvas[:style.bar_height_px] = row[np.newaxis, :]
+    if style.text:
+        ink = _text_ink(text, style.font_path, style.font_size_px)
+        top = style.bar_height_px + int(style.font_size_px * 0.15)
+        height = min(ink.shape[0], canvas.shape[0] - top)
+        width = min(ink.shape[1], row.size)
+        left = (row.size - width) // 2
+        canvas[top:top + height, left:left + width] &= ~ink[:height, :width]
+    return Image.fromarray(canvas)
+
+
+def export_symbols(texts: Iterable[str], folder: str, names: Optional[Iterable[str]] = None,
+                   style: Optional[SymbolStyle] = None, fmt: str = "png") -> List[str]:
+    """Exporta muchos símbolos en una sola llamada; los textos repetidos se rasterizan una vez."""
+    style = style or SymbolStyle.from_config()
+    os.makedirs(folder, exist_ok=True)
+    texts = list(texts)
+    names = list(names) if names is not None else [f"{index:04d}_{text}" for index, text in enumerate(texts, start=1)]
+    rendered: dict = {}
+    paths: List[str] = []
+    for text, name in zip(texts, names):
+        image = rendered.get(text)
+        if image is None:
+            image = rendered[text] = rasterize(text, style)
+        path = os.path.join(folder, f"{name}.{fmt}")
+        image.save(path, dpi=(style.dpi, style.dpi))
+        paths.append(path)
+    return paths
+
+
+def export_tiff(texts: Iterable[str], path: str, style: Optional[SymbolStyle] = None) -> str:
+    """Un TIFF multipágina (CCITT G4, 1 bit) con un símbolo por página."""
+    style = style or SymbolStyle.from_config()
+    rendered: dict = {}
+    pages: List[Image.Image] = []
+    for text in texts:
+        image = rendered.get(text)
+        if image is None:
+            image = rendered[text] = rasterize(text, style)
+        pages.append(image)
+    if not pages:
+        raise ValueError("No hay símbolos para exportar")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    pages[0].save(path, save_all=True, append_images=pages[1:], compression="group4", dpi=(style.dpi, style.dpi))
+    return path
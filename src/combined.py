@@ -0,0 +1,81 @@
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional, Union
+from config.config_loader import conf
+from utils.output_cache import get_output_cache
+from utils.profiling import profile_run
+from src import barcoder, frescures
+from src.code128 import log_cache_stats
+from src.engine import LabelEngine
+from src.labels import KIND_BARCODES, LabelJob, LabelLine
+from src.renderers import get_renderer, render_job
+from src.validation import OrderValidation
+
+logger = logging.getLogger(__name__)
+
+# Valor de mode_var en la GUI para generar ambos documentos con las mismas líneas
+MODE_COMBINED = "combinado"
+
+
+def _render_outputs(job: LabelJob, formats: List[str], template_path: str, temp_path: str,
+                    output_path: str, base_name: str, cache_key: str, append: bool) -> List[str]:
+    """Un lado de la corrida combinada (nivel de módulo para poder ejecutarse en otro proceso)."""
+    renderers = [get_renderer(name, template_path=template_path, temp_path=temp_path) for name in formats]
+    outputs = render_job(lambda: job, renderers, output_path, base_name, cache_key, append)
+    if job.kind == KIND_BARCODES:
+        log_cache_stats()
+    return outputs
+
+
+class CombinedRun:
+    """
+    Hojas de consumo preferente + códigos de barras de las mismas líneas en una sola corrida.
+
+    El pedido se valida una vez (como frescuras) y se resuelve una vez contra el catálogo; los códigos
+    se arman de esas mismas líneas resueltas. Luego ambos renderizadores corren a la vez en trabajadores
+    separados, así la corrida tarda aproximadamente lo del más lento. Los trabajos grandes usan un proceso para los códigos
+    (reportlab y openpyxl no sueltan el GIL); los pequeños, un hilo, para no pagar el arranque.
+    """
+
+    def __init__(self, engine: LabelEngine, shelf_time_path: Union[str, List[str]], output_path: str, temp_path: str,
+                 validation: OrderValidation, project_root: str, append: bool = False,
+                 freshness_formats: Optional[List[str]] = None, barcode_formats: Optional[List[str]] = None):
+        t0 = time.perf_counter()
+        self.engine = engine
+        self.project_root = project_root
+        self.outputs: List[str] = []
+        # Modo anexar: líneas ya entregadas (las de las hojas; los códigos salen de las mismas líneas)
+        self.skipped: List[LabelLine] = []
+        freshness_formats = freshness_formats or conf.get("render.frescuras.formats", ["xlsx"])
+        barcode_formats = barcode_formats or conf.get("render.barcodes.formats", ["pdf"])
+
+        with profile_run("combined", output_path):
+            all_frescures = engine.freshness_rows(validation)
+            freshness_job = engine.build_freshness_job(all_frescures)
+            # Los códigos salen de las líneas ya resueltas: los SKU sin shelf life quedan fuera de ambos documentos
+            query = engine.barcode_rows(freshness_job)
+            caching = get_output_cache() is not None
+            freshness_key = frescures.freshness_cache_key(all_frescures, shelf_time_path, engine.template_path,
+                                                           engine.template_fingerprint) if caching else ""
+            barcode_key = barcoder.barcode_cache_key(query) if caching else ""
+            barcode_job = LabelJob.from_barcodes(query)
+
+            with self._executor(barcode_job.total_labels) as pool:
+                barcodes_future = pool.submit(
+                    _render_outputs, barcode_job, barcode_formats, "", temp_path,
+                    output_path, barcoder.BASE_NAME, barcode_key, append
+                )
+                # Las frescuras se dibujan en este hilo mientras tanto (pueden repartirse en procesos por su cuenta)
+                freshness_renderers = [engine.renderer(name) for name in freshness_formats]
+                self.outputs = render_job(lambda: freshness_job, freshness_renderers, output_path,
+                                          frescures.BASE_NAME, freshness_key, append, self.skipped)
+                self.outputs += barcodes_future.result()
+
+        logger.info(f"Corrida combinada: {freshness_job.total_labels} hojas y {barcode_job.total_labels} códigos en {time.perf_counter() - t0:.3f} s")
+
+    @staticmethod
+    def _executor(labels: int) -> Executor:
+        if labels >= int(conf.get("render.combined.process_min_labels", 400)):
+            return ProcessPoolExecutor(max_workers=1)
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="combined-barcodes")
@@ -0,0 +1,122 @@
+import hashlib
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+from config.config_loader import conf
+from utils.output_cache import file_fingerprint
+from utils.utils import Preview
+from src.catalog import BinaryCatalog, load_catalog
+from src.labels import KIND_BARCODES, KIND_FRESCURAS, LabelJob
+from src.renderers import RENDERERS, Renderer
+from src.validation import OrderValidation, validate_order
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_freshness(catalog: BinaryCatalog, all_frescures: Iterable[Sequence[str]]) -> List[List[str]]:
+    """Cruza [sku, frescura, fecha_lote] con el catálogo de shelf life: [sku, frescura, fecha_lote, caducidad]."""
+    complete_data: List[List[str]] = []
+    for frescure in all_frescures:
+        sku = frescure[0].strip()
+        fecha_base = datetime.strptime(frescure[2], "%d/%m/%Y").date()
+
+        entry = catalog.lookup(sku)
+        if entry is None or entry[1] is None:
+            logger.warning(f"SKU {sku} no encontrado en tabla de shelf life.")
+            continue
+
+        fecha_final_consumo = (fecha_base + timedelta(days=entry[1])).strftime("%d/%m/%Y")
+        complete_data.append([frescure[0], frescure[1], frescure[2], fecha_final_consumo])
+
+    logger.info("Final Query: %s", Preview(complete_data))
+    return complete_data
+
+
+class LabelEngine:
+    """
+    Motor de etiquetas reutilizable: se construye una vez con el catálogo y la plantilla cargados
+    y render() devuelve el documento en bytes, sin rutas fijas ni escrituras en disco.
+
+    No guarda estado entre llamadas: el catálogo es un mapeo de solo lectura, la plantilla se guarda
+    en bytes y cada llamada abre su propio libro/lienzo, así que varias llamadas pueden correr
+    en paralelo desde distintos hilos. La GUI y Frescurer son clientes de este motor.
+    """
+
+    def __init__(self, catalog: Optional[BinaryCatalog] = None, template_path: str = "",
+                 frescura_pattern: Optional[str] = None, temp_path: str = ""):
+        self.catalog = catalog
+        self.template_path = template_path
+        self.frescura_pattern = frescura_pattern or conf.get("validation.frescura.pattern", r"^[A-L](0[1-9]|1[0-9]|2[0-9]|3[0-1])[0-9]$")
+        # Códigos para validar existencia: se calculan una sola vez por catálogo
+        self.catalog_codes = frozenset(catalog.code_strings()) if catalog is not None else None
+        template_data = b""
+        if template_path and os.path.isfile(template_path):
+            with open(template_path, "rb") as f:
+                template_data = f.read()
+        # Huella de los bytes que realmente se renderizan (llave de caché y detección de cambios)
+        self.template_fingerprint = hashlib.sha256(template_data).hexdigest() if template_data else None
+        self._renderers: Dict[str, Renderer] = {}
+        for name, renderer_cls in RENDERERS.items():
+            renderer = renderer_cls(template_path=template_path, temp_path=temp_path)
+            renderer.template_data = template_data
+            self._renderers[name] = renderer
+
+    @classmethod
+    def from_sources(cls, sources: Union[str, List[str]], template_path: str = "", **kwargs) -> "LabelEngine":
+        return cls(load_catalog(sources), template_path, **kwargs)
+
+    def template_is_current(self) -> bool:
+        """False si la plantilla en disco ya no es la que el motor tiene en memoria (se editó mientras corría)."""
+        return file_fingerprint(self.template_path) == self.template_fingerprint
+
+    def validate(self, kind: str, rows: Iterable[Sequence[str]], max_rows: Optional[int] = None) -> OrderValidation:
+        catalog_codes = self.catalog_codes if kind == KIND_FRESCURAS else None
+        return validate_order(rows, kind, catalog_codes, self.frescura_pattern, max_rows=max_rows)
+
+    def build_job(self, validation: OrderValidation) -> LabelJob:
+        """Trabajo resuelto a partir de un pedido ya validado (solo las filas válidas)."""
+        if validation.mode == KIND_BARCODES:
+            return LabelJob.from_barcodes(validation.to_query())
+        return self.build_freshness_job(self.freshness_rows(validation))
+
+    @staticmethod
+    def freshness_rows(validation: OrderValidation) -> List[List[str]]:
+        """Filas válidas de un pedido de frescuras como [sku, frescura, fecha_lote], una por copia."""
+        valid = validation.table[validation.valid_mask]
+        valid = valid.loc[valid.index.repeat(valid["copias"].astype(int))]
+        fechas = valid["fecha_lote"].dt.strftime("%d/%m/%Y")
+        return [[sku, frescura, fecha] for sku, frescura, fecha in zip(valid["sku"], valid["frescura"], fechas)]
+
+    @staticmethod
+    def barcode_rows(job: LabelJob) -> List[List[str]]:
+        """Líneas ya resueltas de un trabajo como consulta de Barcoder: [texto, copias]."""
+        return [[line.text, str(line.copies)] for line in job.lines]
+
+    def build_freshness_job(self, all_frescures: Iterable[Sequence[str]]) -> LabelJob:
+        """[[sku, frescura, fecha_lote], ...] -> trabajo de frescuras con la caducidad resuelta."""
+        if self.catalog is None:
+            raise ValueError("El motor no tiene catálogo de shelf life para generar frescuras")
+        return LabelJob.from_freshness(resolve_freshness(self.catalog, all_frescures))
+
+    def renderer(self, fmt: str) -> Renderer:
+        """Backend compartido del motor (sin estado por llamada; usa la plantilla en memoria)."""
+        renderer = self._renderers.get(fmt)
+        if renderer is None:
+            raise ValueError(f"Formato de salida desconocido: '{fmt}'. Disponibles: {', '.join(self._renderers)}")
+        return renderer
+
+    def render_job(self, job: LabelJob, fmt: str) -> bytes:
+        renderer = self.renderer(fmt)
+        if not renderer.supports(job):
+            raise ValueError(f"El formato '{fmt}' no soporta trabajos de tipo '{job.kind}'")
+        return renderer.render_bytes(job)
+
+    def render(self, kind: str, rows: Iterable[Sequence[str]], fmt: str = "pdf") -> bytes:
+        """
+        rows: [[sku/texto, frescura, copias], ...] como en la GUI. Lanza ValueError si el pedido no es válido.
+        """
+        validation = self.validate(kind, rows)
+        if not validation.is_valid:
+            raise ValueError("\n".join(validation.messages()))
+        return self.render_job(self.build_job(validation), fmt)
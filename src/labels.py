@@ -0,0 +1,68 @@
+from itertools import groupby
+from typing import Iterable, Iterator, List
+
+# Tipos de trabajo (coinciden con los valores de mode_var en la GUI)
+KIND_FRESCURAS = "frescuras"
+KIND_BARCODES = "barcodes"
+
+
+class LabelLine:
+    """
+    Línea resuelta de un trabajo de etiquetas.
+    text: SKU (frescuras) o texto del código (barcodes).
+    frescura / lote / caducidad: solo aplican a frescuras.
+    """
+
+    __slots__ = ("text", "frescura", "lote", "caducidad", "copies")
+
+    def __init__(self, text: str, copies: int = 1, frescura: str = "", lote: str = "", caducidad: str = ""):
+        self.text = text
+        self.copies = copies
+        self.frescura = frescura
+        self.lote = lote
+        self.caducidad = caducidad
+
+    def key(self) -> tuple:
+        return (self.text, self.frescura, self.lote, self.caducidad)
+
+    def to_list(self) -> List[str]:
+        return [self.text, self.frescura, self.lote, self.caducidad, str(self.copies)]
+
+    def __repr__(self) -> str:
+        return f"LabelLine({self.text!r}, copies={self.copies}, lote={self.lote!r}, caducidad={self.caducidad!r})"
+
+
+class LabelJob:
+    """
+    Trabajo de etiquetas listo para renderizar: líneas resueltas + copias.
+    start_index: etiquetas ya entregadas antes de este trabajo (anexos y partes), para continuar la numeración.
+    """
+
+    def __init__(self, kind: str, lines: List[LabelLine], start_index: int = 0):
+        self.kind = kind
+        self.lines = lines
+        self.start_index = start_index
+
+    @classmethod
+    def from_freshness(cls, complete_data: Iterable[List[str]]) -> "LabelJob":
+        """complete_data: [[sku, frescura, fecha_lote, caducidad], ...]; las filas consecutivas iguales se agrupan en copias."""
+        lines: List[LabelLine] = []
+        rows = ((str(d[0]).strip(), str(d[1]), str(d[2]), str(d[3])) for d in complete_data)
+        for (sku, frescura, lote, caducidad), group in groupby(rows):
+            lines.append(LabelLine(sku, sum(1 for _ in group), frescura, lote, caducidad))
+        return cls(KIND_FRESCURAS, lines)
+
+    @classmethod
+    def from_barcodes(cls, query: Iterable[List[str]]) -> "LabelJob":
+        """query: [[texto, copias], ...] como en Barcoder."""
+        return cls(KIND_BARCODES, [LabelLine(lote[0].strip(), int(lote[1])) for lote in query])
+
+    @property
+    def total_labels(self) -> int:
+        return sum(line.copies for line in self.lines)
+
+    def expanded(self) -> Iterator[LabelLine]:
+        """Itera una línea por copia (para formatos que no manejan copias de forma nativa)."""
+        for line in self.lines:
+            for _ in range(line.copies):
+                yield line
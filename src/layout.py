@@ -0,0 +1,119 @@
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from reportlab.lib.pagesizes import A4, LETTER
+from reportlab.lib.units import mm
+from config.config_loader import conf
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZES: Dict[str, Tuple[float, float]] = {
+    "A4": A4,
+    "LETTER": LETTER,
+}
+
+# Hojas de etiquetas predefinidas (medidas en mm)
+PRESETS: Dict[str, Dict[str, Any]] = {
+    # Diseño original de Barcoder: una columna a todo el ancho, 4 por página
+    "a4_columna": {
+        "page": "A4", "columns": 1, "rows": 4,
+        "label_width": 202.5, "label_height": 50,
+        "margin_left": 15, "margin_top": 25,
+        "gutter_x": 0, "gutter_y": 15, "padding": 0,
+    },
+    "avery_l7160": {
+        "page": "A4", "columns": 3, "rows": 7,
+        "label_width": 63.5, "label_height": 38.1,
+        "margin_left": 7.2, "margin_top": 15.1,
+        "gutter_x": 2.5, "gutter_y": 0, "padding": 1.5,
+    },
+    "avery_l7163": {
+        "page": "A4", "columns": 2, "rows": 7,
+        "label_width": 99.1, "label_height": 38.1,
+        "margin_left": 4.65, "margin_top": 15.1,
+        "gutter_x": 2.5, "gutter_y": 0, "padding": 2,
+    },
+    "avery_l7159": {
+        "page": "A4", "columns": 3, "rows": 8,
+        "label_width": 63.5, "label_height": 33.9,
+        "margin_left": 6.4, "margin_top": 12.9,
+        "gutter_x": 2.5, "gutter_y": 0, "padding": 1.5,
+    },
+    "avery_5160": {
+        "page": "LETTER", "columns": 3, "rows": 10,
+        "label_width": 66.675, "label_height": 25.4,
+        "margin_left": 4.7625, "margin_top": 12.7,
+        "gutter_x": 3.175, "gutter_y": 0, "padding": 1,
+    },
+}
+
+
+class SheetLayout:
+    """
+    Hoja de N x M etiquetas. Las posiciones (esquina inferior izquierda, en puntos PDF)
+    se calculan una sola vez al construir la hoja y se recorren por filas.
+    """
+
+    def __init__(self, name: str, page: str, columns: int, rows: int, label_width: float, label_height: float,
+                 margin_left: float, margin_top: float, gutter_x: float = 0, gutter_y: float = 0, padding: float = 0):
+        if columns < 1 or rows < 1:
+            raise ValueError(f"Hoja '{name}': columnas y filas deben ser >= 1")
+        page_key = page.upper()
+        if page_key not in PAGE_SIZES:
+            raise ValueError(f"Hoja '{name}': tamaño de página desconocido '{page}'")
+
+        self.name = name
+        self.page_size = PAGE_SIZES[page_key]
+        self.columns = columns
+        self.rows = rows
+        self.padding = padding * mm
+        self.label_width = label_width * mm
+        self.label_height = label_height * mm
+        # Área útil para el símbolo dentro de cada etiqueta
+        self.content_width = self.label_width - 2 * self.padding
+        self.content_height = self.label_height - 2 * self.padding
+        self.positions = self._compute_positions(margin_left * mm, margin_top * mm, gutter_x * mm, gutter_y * mm)
+
+    @property
+    def labels_per_page(self) -> int:
+        return len(self.positions)
+
+    def _compute_positions(self, margin_left: float, margin_top: float, gutter_x: float, gutter_y: float) -> List[Tuple[float, float]]:
+        _, page_height = self.page_size
+        positions: List[Tuple[float, float]] = []
+        for row in range(self.rows):
+            y = page_height - margin_top - (row + 1) * self.label_height - row * gutter_y
+            for col in range(self.columns):
+                x = margin_left + col * (self.label_width + gutter_x)
+                positions.append((x + self.padding, y + self.padding))
+        return positions
+
+
+_layouts: Dict[Tuple, SheetLayout] = {}
+_layouts_lock = threading.Lock()
+
+
+def get_layout(preset: Optional[str] = None, **overrides: Any) -> SheetLayout:
+    """
+    Devuelve la hoja pedida (preset y/o medidas sueltas), reutilizando las ya calculadas.
+    Sin argumentos usa 'barcodes.layout' de settings.yaml.
+    """
+    if preset is None and not overrides:
+        preset = conf.get("barcodes.layout.preset", "a4_columna")
+        overrides = conf.get("barcodes.layout.custom", {}) or {}
+
+    params: Dict[str, Any] = {}
+    if preset:
+        if preset not in PRESETS:
+            raise ValueError(f"Hoja de etiquetas desconocida: '{preset}'. Disponibles: {', '.join(PRESETS)}")
+        params.update(PRESETS[preset])
+    params.update(overrides)
+
+    key = (preset or "custom",) + tuple(sorted(params.items()))
+    with _layouts_lock:
+        layout = _layouts.get(key)
+        if layout is None:
+            layout = SheetLayout(preset or "custom", **params)
+            _layouts[key] = layout
+            logger.debug(f"Hoja '{layout.name}' calculada: {layout.labels_per_page} etiquetas por página")
+    return layout
@@ -0,0 +1,111 @@
+import logging
+from typing import Any, Callable, Dict, List, Optional, Type
+from config.config_loader import conf
+from src.labels import LabelJob, LabelLine
+from src.renderers.base import Renderer
+from src.renderers.image import ImageRenderer
+from src.renderers.pdf import PdfRenderer
+from src.renderers.xlsx import XlsxRenderer
+from src.renderers.zpl import ZplRenderer
+from utils.output_cache import get_output_cache
+from src.sharding import render_sharded, sharding_settings
+from src.run_manifest import RunManifest, compute_delta
+
+logger = logging.getLogger(__name__)
+
+# Backends disponibles por nombre de formato (settings.yaml -> render.<tipo>.formats)
+RENDERERS: Dict[str, Type[Renderer]] = {
+    XlsxRenderer.name: XlsxRenderer,
+    PdfRenderer.name: PdfRenderer,
+    ImageRenderer.name: ImageRenderer,
+    ZplRenderer.name: ZplRenderer,
+}
+
+
+def get_renderer(name: str, template_path: str = "", temp_path: str = "") -> Renderer:
+    renderer_cls = RENDERERS.get(name)
+    if renderer_cls is None:
+        raise ValueError(f"Formato de salida desconocido: '{name}'. Disponibles: {', '.join(RENDERERS)}")
+    return renderer_cls(template_path=template_path, temp_path=temp_path)
+
+
+def _render_one(renderer: Renderer, job: LabelJob, output_path: str, base_name: str) -> str:
+    sharding, shard_size, workers = sharding_settings()
+    # Por defecto se entrega un solo archivo: los formatos cuyas partes no se unen solo se parten si se pidió
+    split_delivery = conf.get("render.sharding.delivery", "single") != "single"
+    if (sharding and job.kind in renderer.shardable_kinds and job.total_labels > shard_size
+            and (renderer.merges_shards or split_delivery)):
+        return render_sharded(renderer, job, output_path, base_name, shard_size, workers)
+    return renderer.render(job, output_path, base_name)
+
+
+def _render_append(renderer: Renderer, job: LabelJob, output_path: str, base_name: str,
+                   manifest: RunManifest, previous: Dict[str, Any], skipped: Optional[List[LabelLine]]) -> List[str]:
+    """
+    Modo anexar: renderiza solo lo que no se entregó antes como una parte adicional; las partes previas no se tocan.
+    Las líneas ya entregadas se agregan a 'skipped' (una sola vez aunque haya varios formatos).
+    """
+    delta, lines, already = compute_delta(previous, job)
+    if already:
+        logger.info(f"Anexo '{renderer.name}': {sum(line.copies for line in already)} etiquetas ya entregadas se omiten")
+        if skipped is not None and not skipped:
+            skipped.extend(already)
+    parts: List[str] = previous["parts"]
+    if delta.total_labels == 0:
+        logger.info(f"Sin etiquetas nuevas para '{renderer.name}': se conservan {len(parts)} partes")
+        return parts
+
+    delta.start_index = previous["labels"]
+    part_base = f"{base_name}_anexo_{len(parts):03d}"
+    path = _render_one(renderer, delta, output_path, part_base)
+    parts = parts + [path]
+    manifest.save(job.kind, lines, parts, previous["labels"] + delta.total_labels)
+    logger.info(f"Anexo '{renderer.name}': {delta.total_labels} etiquetas nuevas en {path}")
+    return parts
+
+
+def render_job(build_job: Callable[[], LabelJob], renderers: List[Renderer], output_path: str,
+               base_name: str, cache_key: str = "", append: bool = False,
+               skipped: Optional[List[LabelLine]] = None) -> List[str]:
+    """
+    Renderiza un trabajo en varios formatos preparando los datos una sola vez.
+    'build_job' solo se invoca si algún formato no pudo servirse desde la caché.
+    Con 'append' se anexan solo las copias que no se entregaron en corridas anteriores (sin caché);
+    las omitidas se agregan a 'skipped' para mostrárselas al usuario.
+    """
+    cache = get_output_cache() if cache_key and not append else None
+    outputs: List[str] = []
+    pending: List[Renderer] = []
+
+    for renderer in renderers:
+        path = renderer.output_file(output_path, base_name)
+        if cache is not None and renderer.cacheable and cache.restore(f"{cache_key}-{renderer.name}", path):
+            # Sin el trabajo resuelto no se puede describir la corrida: el próximo anexo será completo
+            manifest = RunManifest(output_path, base_name, renderer.name)
+            previous = manifest.load()
+            if previous is not None:
+                manifest.remove_parts([part for part in previous["parts"] if part != path])
+            manifest.invalidate()
+            outputs.append(path)
+        else:
+            pending.append(renderer)
+
+    if pending:
+        job = build_job()
+        for renderer in pending:
+            manifest = RunManifest(output_path, base_name, renderer.name)
+            previous = manifest.load()
+            if append and previous is not None and previous.get("kind") == job.kind:
+                outputs.extend(_render_append(renderer, job, output_path, base_name, manifest, previous, skipped))
+                continue
+
+            path = _render_one(renderer, job, output_path, base_name)
+            if previous is not None:
+                manifest.remove_parts([part for part in previous["parts"] if part != path])
+            manifest.save(job.kind, job.lines, [path], job.total_labels)
+            # Solo se cachean salidas de un único archivo con el nombre esperado
+            if cache is not None and renderer.cacheable and path == renderer.output_file(output_path, base_name):
+                cache.store(f"{cache_key}-{renderer.name}", path)
+            outputs.append(path)
+
+    return outputs
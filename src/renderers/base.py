@@ -0,0 +1,47 @@
+import os
+from typing import List
+from src.labels import LabelJob
+
+
+class Renderer:
+    """
+    Interfaz común de los backends de salida.
+    Cada backend recibe un LabelJob ya resuelto y escribe un documento en la carpeta de salida.
+    """
+
+    name = ""
+    extension = ""
+    # Tipos de trabajo que el backend sabe dibujar
+    kinds: List[str] = []
+    # Tipos de trabajo que pueden dividirse en partes paralelas (src/sharding.py)
+    shardable_kinds: List[str] = []
+    # True si las partes se vuelven a unir en un solo archivo; si no, solo se parte con
+    # render.sharding.delivery "zip" o "parts" (cambia la forma de la salida)
+    merges_shards = False
+    # False si la salida no es un único archivo reutilizable (carpetas, sockets)
+    cacheable = True
+
+    def __init__(self, template_path: str = "", temp_path: str = ""):
+        self.template_path = template_path
+        self.temp_path = temp_path
+        # Contenido de la plantilla ya leído (LabelEngine); vacío = leer template_path
+        self.template_data = b""
+
+    def supports(self, job: LabelJob) -> bool:
+        return job.kind in self.kinds
+
+    def output_file(self, output_path: str, base_name: str) -> str:
+        return f"{output_path}/{base_name}{self.extension}"
+
+    def render(self, job: LabelJob, output_path: str, base_name: str) -> str:
+        """Escribe el documento y devuelve su ruta (o destino)."""
+        raise NotImplementedError
+
+    def render_bytes(self, job: LabelJob) -> bytes:
+        """Documento completo en memoria, sin tocar la carpeta de salida (src/engine.py)."""
+        raise ValueError(f"El formato '{self.name}' no produce un documento único en memoria")
+
+    def _prepare(self, job: LabelJob, output_path: str) -> None:
+        if not self.supports(job):
+            raise ValueError(f"El formato '{self.name}' no soporta trabajos de tipo '{job.kind}'")
+        os.makedirs(output_path, exist_ok=True)
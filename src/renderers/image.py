@@ -0,0 +1,69 @@
+import logging
+import os
+from PIL import Image, ImageDraw
+from config.config_loader import conf
+from src.code128 import load_font
+from src.labels import KIND_BARCODES, KIND_FRESCURAS, LabelJob
+from src.renderers.base import Renderer
+from src.renderers.symbols import code128_pngs
+from src.symbols2d import encode_batch, matrix_image, plain_qr_enabled, qr_payload
+
+logger = logging.getLogger(__name__)
+
+# Tamaño de la etiqueta de frescura en píxeles (100 x 50 mm a 203 dpi)
+FRESHNESS_SIZE = (800, 400)
+# Lado máximo del QR dentro de esa etiqueta
+QR_SIZE_PX = 300
+# Tamaños de títulos y valores en píxeles (misma proporción que los 16/44 pt del PDF)
+TITLE_SIZE_PX = 22
+VALUE_SIZE_PX = 60
+
+
+class ImageRenderer(Renderer):
+    """
+    Una imagen PNG por línea (no por copia) dentro de la carpeta '<base_name>_png'.
+    El número de copias va en el nombre del archivo para el software de impresión.
+    """
+
+    name = "png"
+    extension = "_png"
+    kinds = [KIND_BARCODES, KIND_FRESCURAS]
+    cacheable = False
+
+    def render(self, job: LabelJob, output_path: str, base_name: str) -> str:
+        self._prepare(job, output_path)
+        folder = self.output_file(output_path, base_name)
+        os.makedirs(folder, exist_ok=True)
+        names = [f"{index:04d}_{line.text}_x{line.copies}" for index, line in enumerate(job.lines, start=1)]
+        if job.kind == KIND_BARCODES:
+            code128_pngs([line.text for line in job.lines], folder, names)
+        else:
+            matrices = encode_batch(job.lines) if plain_qr_enabled() else {}
+            for line, name in zip(job.lines, names):
+                image = self._draw_freshness(line.text, line.lote, line.caducidad)
+                if matrices:
+                    self._paste_matrix(image, matrices[qr_payload(line)])
+                image.save(os.path.join(folder, f"{name}.png"))
+        logger.info(f"Imágenes generadas en: {folder}")
+        return folder
+
+    def _draw_freshness(self, sku: str, lote: str, caducidad: str) -> Image.Image:
+        image = Image.new("1", FRESHNESS_SIZE, 1)
+        draw = ImageDraw.Draw(image)
+        # La fuente por defecto de Pillow solo si la TTF configurada no está instalada
+        font_path = conf.get("render.frescuras.font_path", "arialbd.ttf")
+        title_font = load_font(font_path, TITLE_SIZE_PX)
+        value_font = load_font(font_path, VALUE_SIZE_PX)
+        y = 20
+        for title, value in (("LOTE:", lote), ("SKU:", sku), ("CONSUMO PREFERENTE:", caducidad)):
+            draw.text((20, y), title, fill=0, font=title_font)
+            draw.text((60, y + 30), value, fill=0, font=value_font)
+            y += 120
+        return image
+
+    @staticmethod
+    def _paste_matrix(image: Image.Image, matrix) -> None:
+        """QR en el margen derecho, con el módulo entero más grande que quepa en QR_SIZE_PX."""
+        module_px = max(1, QR_SIZE_PX // (matrix.shape[0] + 8))
+        symbol = matrix_image(matrix, module_px)
+        image.paste(symbol, (image.width - symbol.width - 20, (image.height - symbol.height) // 2))
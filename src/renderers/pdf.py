@@ -0,0 +1,203 @@
+import io
+import logging
+import os
+import shutil
+import tempfile
+from itertools import count, islice
+from typing import Iterable, List, Tuple
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from config.config_loader import conf
+from src.layout import SheetLayout, get_layout
+from src.labels import KIND_BARCODES, KIND_FRESCURAS, LabelJob, LabelLine
+from src.renderers.base import Renderer
+from src.renderers.symbols import cached_code128, restore_symbol, trim_symbol_cache
+from src.symbols2d import encode_batch, matrix_runs, plain_qr_enabled, qr_matrix, qr_payload
+from src.checkpoint import JobCheckpoint, job_fingerprint
+from utils.output_writer import BackgroundWriter, open_atomic, write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Lado del QR en la etiqueta de frescura
+QR_SIZE = 40 * mm
+
+
+def concatenate_pdfs(parts: List[str], pdf_path: str, parts_dir: str) -> str:
+    """
+    Une los bloques en un solo PDF si 'pdf.streaming.merge' está activo y pypdf está disponible;
+    si no, entrega las partes numeradas. La unión escribe una parte a la vez (utils.pdf_merge),
+    así la memoria también queda constante al entregar.
+    """
+    try:
+        if not conf.get("pdf.streaming.merge", True):
+            raise ImportError("unión desactivada en settings.yaml")
+        from utils.pdf_merge import StreamingPdfMerger
+    except ImportError as e:
+        logger.warning(f"PDF entregado en {len(parts)} partes en '{parts_dir}' ({e})")
+        if os.path.exists(pdf_path):
+            os.remove(pdf_path)
+        return parts_dir
+
+    with open_atomic(pdf_path) as f:
+        merger = StreamingPdfMerger(f)
+        for part_path in parts:
+            merger.append(part_path)
+        merger.finish()
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    logger.info(f"ÉXITO: Archivo PDF generado como '{pdf_path}' ({len(parts)} bloques)")
+    return pdf_path
+
+
+class PdfRenderer(Renderer):
+    """
+    PDF con reportlab.
+    barcodes: N x M códigos por página según la hoja configurada (src/layout.py).
+    frescuras: una etiqueta de consumo preferente por página.
+
+    Los trabajos grandes se escriben por bloques de 'pdf.streaming.chunk_pages' páginas:
+    cada bloque usa su propio lienzo y libera sus imágenes temporales al guardarse,
+    así la memoria no crece con el tamaño del trabajo. Los bloques terminados se registran
+    en un punto de control para reanudar el trabajo si la corrida se interrumpe.
+    """
+
+    name = "pdf"
+    extension = ".pdf"
+    kinds = [KIND_BARCODES, KIND_FRESCURAS]
+    shardable_kinds = [KIND_FRESCURAS]
+    merges_shards = True
+
+    def render(self, job: LabelJob, output_path: str, base_name: str) -> str:
+        self._prepare(job, output_path)
+        pdf_path = self.output_file(output_path, base_name)
+        layout = get_layout() if job.kind == KIND_BARCODES else None
+        labels_per_page = layout.labels_per_page if layout else 1
+        labels_per_chunk = max(1, int(conf.get("pdf.streaming.chunk_pages", 250))) * labels_per_page
+
+        if job.total_labels <= labels_per_chunk:
+            write_atomic(pdf_path, self._render_chunk(job.expanded(), layout))
+            logger.info(f"ÉXITO: Archivo PDF generado como '{pdf_path}'")
+            return pdf_path
+
+        parts_dir = os.path.join(output_path, f"{base_name}_partes")
+        total_chunks = -(-job.total_labels // labels_per_chunk)
+        layout_key = (layout.name, layout.labels_per_page, layout.content_width, layout.content_height) if layout else None
+        checkpoint = JobCheckpoint(
+            output_path, f"{base_name}_{self.name}",
+            job_fingerprint(job, renderer=self.name, chunk=labels_per_chunk, layout=layout_key), total_chunks
+        )
+        if not checkpoint.manifest["parts"] and os.path.isdir(parts_dir):
+            shutil.rmtree(parts_dir)
+        os.makedirs(parts_dir, exist_ok=True)
+
+        parts: List[str] = []
+        labels = job.expanded()
+        # El bloque siguiente se dibuja mientras el anterior se escribe en segundo plano
+        with BackgroundWriter() as writer:
+            for index in count(1):
+                chunk = list(islice(labels, labels_per_chunk))
+                if not chunk:
+                    break
+                part_path = checkpoint.completed_part(index)
+                if part_path is None:
+                    part_path = os.path.join(parts_dir, f"parte_{index:03d}.pdf")
+                    writer.submit(part_path, self._render_chunk(chunk, layout),
+                                  lambda path, index=index, labels=len(chunk): self._chunk_written(checkpoint, index, path, labels))
+                parts.append(part_path)
+
+        result = concatenate_pdfs(parts, pdf_path, parts_dir)
+        checkpoint.finish()
+        return result
+
+    def render_bytes(self, job: LabelJob) -> bytes:
+        """Un solo documento en memoria; los PNG temporales (sin caché de símbolos) van a una carpeta propia de la llamada."""
+        layout = get_layout() if job.kind == KIND_BARCODES else None
+        with tempfile.TemporaryDirectory(prefix="etiquetas_") as temp_path:
+            return self._render_chunk(job.expanded(), layout, temp_path)
+
+    @staticmethod
+    def _chunk_written(checkpoint: JobCheckpoint, index: int, path: str, labels: int) -> None:
+        checkpoint.mark_done(index, path, labels)
+        logger.debug(f"Bloque PDF {index} escrito: {path} ({labels} etiquetas)")
+
+    def _render_chunk(self, labels: Iterable[LabelLine], layout: SheetLayout | None, temp_path: str = "") -> bytes:
+        """Dibuja un bloque en memoria; la escritura en disco la hace el llamador (atómica)."""
+        buffer = io.BytesIO()
+        if layout is not None:
+            c = canvas.Canvas(buffer, pagesize=layout.page_size)
+            images = self._draw_barcodes(c, labels, layout, temp_path or self.temp_path)
+        else:
+            c = canvas.Canvas(buffer, pagesize=A4)
+            images = []
+            self._draw_freshness(c, labels)
+        c.save()
+        # Liberar las imágenes temporales del bloque; la caché de símbolos expulsa recién ahora que ya no se leen
+        for image_path in images:
+            if os.path.exists(image_path):
+                os.remove(image_path)
+        if layout is not None:
+            trim_symbol_cache()
+        return buffer.getvalue()
+
+    def _draw_barcodes(self, c: canvas.Canvas, labels: Iterable[LabelLine], layout: SheetLayout, temp_path: str) -> List[str]:
+        """Dibuja los códigos y devuelve las imágenes temporales usadas."""
+        positions = layout.positions
+        items_per_page = layout.labels_per_page
+        current_pos_index = 0
+        labels = list(labels)
+        # Un PNG por texto distinto: las copias lo reutilizan; con la caché de símbolos no hay temporales
+        images, temporary = cached_code128([line.text for line in labels], temp_path)
+
+        for line in labels:
+            temp_img_path = images[line.text]
+            x, y = positions[current_pos_index]
+
+            # Dibujar imagen ajustada al área de la etiqueta
+            try:
+                c.drawImage(temp_img_path, x, y, width=layout.content_width, height=layout.content_height, mask='auto')
+            except OSError:
+                if os.path.exists(temp_img_path):
+                    raise
+                # Entrada expulsada por otro proceso que comparte la caché: se vuelve a rasterizar
+                temp_img_path = images[line.text] = restore_symbol(line.text, temp_path)
+                c.drawImage(temp_img_path, x, y, width=layout.content_width, height=layout.content_height, mask='auto')
+
+            current_pos_index += 1
+
+            # Si se llenó la página
+            if current_pos_index >= items_per_page:
+                c.showPage() # Iniciar una nueva página
+                current_pos_index = 0 # Reiniciar el índice de posición en la nueva página
+
+        # Cerrar la última página si quedó incompleta
+        if current_pos_index > 0:
+            c.showPage()
+
+        return list(images.values()) if temporary else []
+
+    def _draw_freshness(self, c: canvas.Canvas, labels: Iterable[LabelLine]) -> None:
+        page_width, page_height = A4
+        margin_x = 25 * mm
+        labels = list(labels)
+        # QR opcional: una matriz por carga distinta, dibujada como tramos vectoriales
+        runs = {payload: matrix_runs(matrix) for payload, matrix in encode_batch(labels).items()} if plain_qr_enabled() else {}
+        for line in labels:
+            y = page_height - 40 * mm
+            for title, value in (("LOTE:", line.lote), ("SKU:", line.text), ("CONSUMO PREFERENTE:", line.caducidad)):
+                c.setFont("Helvetica-Bold", 16)
+                c.drawString(margin_x, y, title)
+                c.setFont("Helvetica-Bold", 44)
+                c.drawCentredString(page_width / 2, y - 25 * mm, value)
+                y -= 80 * mm
+            if runs:
+                payload = qr_payload(line)
+                self._draw_matrix(c, runs[payload], qr_matrix(payload).shape[0], page_width - margin_x - QR_SIZE, 15 * mm)
+            c.showPage()
+
+    @staticmethod
+    def _draw_matrix(c: canvas.Canvas, runs: List[Tuple[int, int, int]], modules: int, x: float, y: float) -> None:
+        module = QR_SIZE / modules
+        path = c.beginPath()
+        for row, column, length in runs:
+            path.rect(x + column * module, y + (modules - 1 - row) * module, length * module, module)
+        c.drawPath(path, stroke=0, fill=1)
@@ -0,0 +1,113 @@
+import io
+import os
+import shutil
+from typing import Dict, List, Sequence, Tuple
+from config.config_loader import conf
+from src.code128 import SymbolStyle, export_symbols, rasterize
+from utils.output_cache import build_key, get_symbol_cache
+
+# Opciones de python-barcode compartidas por los backends PDF e imagen (motor "python-barcode")
+RENDER_OPTIONS = {'font_path': 'arial.ttf'}
+# Cambiarla invalida los símbolos de la caché persistente
+SYMBOL_VERSION = "code128-1"
+
+
+def _engine() -> str:
+    return conf.get("barcodes.engine", "native")
+
+
+def code128_png(text: str, folder: str, name: str) -> str:
+    """Guarda el Code128 de 'text' como PNG en 'folder' ('name' sin extensión) y devuelve la ruta."""
+    os.makedirs(folder, exist_ok=True)
+    if _engine() == "python-barcode":
+        from barcode import Code128
+        from barcode.writer import ImageWriter
+
+        codigo = Code128(text, writer=ImageWriter())
+        return codigo.save(os.path.join(folder, name), options=RENDER_OPTIONS)
+
+    style = SymbolStyle.from_config()
+    path = os.path.join(folder, f"{name}.png")
+    rasterize(text, style).save(path, dpi=(style.dpi, style.dpi))
+    return path
+
+
+def symbol_key(text: str, style: SymbolStyle) -> str:
+    """Llave de contenido del símbolo: texto, simbología, motor, geometría y opciones."""
+    return build_key(text=text, symbology="code128", engine=_engine(), style=style.key(),
+                     options=RENDER_OPTIONS, version=SYMBOL_VERSION)
+
+
+def _symbol_bytes(text: str, style: SymbolStyle, temp_folder: str) -> bytes:
+    if _engine() == "python-barcode":
+        temp_path = code128_png(text, temp_folder, f"temp_barcode_{text}")
+        with open(temp_path, "rb") as f:
+            data = f.read()
+        os.remove(temp_path)
+        return data
+    buffer = io.BytesIO()
+    rasterize(text, style).save(buffer, format="PNG", dpi=(style.dpi, style.dpi))
+    return buffer.getvalue()
+
+
+def cached_code128(texts: Sequence[str], temp_folder: str) -> Tuple[Dict[str, str], bool]:
+    """
+    PNG de cada texto distinto: {texto: ruta} y si las rutas son temporales (a borrar por el llamador).
+    Con la caché de símbolos activa, las rutas son entradas de la caché y solo se rasterizan los textos nuevos.
+    La expulsión no corre aquí: el llamador llama a trim_symbol_cache() cuando terminó de usar las rutas.
+    """
+    cache = get_symbol_cache()
+    unique = list(dict.fromkeys(texts))
+    if cache is None:
+        return {text: code128_png(text, temp_folder, f"temp_barcode_{text}") for text in unique}, True
+
+    style = SymbolStyle.from_config()
+    paths: Dict[str, str] = {}
+    for text in unique:
+        key = symbol_key(text, style)
+        path = cache.lookup(key, ".png")
+        if path is None:
+            path = cache.store_bytes(key, ".png", _symbol_bytes(text, style, temp_folder), evict=False)
+        paths[text] = path
+    return paths, False
+
+
+def restore_symbol(text: str, temp_folder: str) -> str:
+    """
+    Vuelve a escribir la entrada de 'text' cuando ya no está en disco: la carpeta de la caché es compartida
+    entre procesos (workers de src/sharding.py) y la expulsión de otro puede borrarla entre la búsqueda y el uso.
+    """
+    style = SymbolStyle.from_config()
+    cache = get_symbol_cache()
+    if cache is None:
+        return code128_png(text, temp_folder, f"temp_barcode_{text}")
+    return cache.store_bytes(symbol_key(text, style), ".png", _symbol_bytes(text, style, temp_folder), evict=False)
+
+
+def trim_symbol_cache() -> None:
+    """Expulsión de la caché de símbolos, al terminar de usar las rutas de cached_code128."""
+    cache = get_symbol_cache()
+    if cache is not None:
+        cache.trim()
+
+
+def code128_pngs(texts: Sequence[str], folder: str, names: Sequence[str]) -> List[str]:
+    """Lote de PNG: cada texto distinto se rasteriza una sola vez (o se toma de la caché de símbolos)."""
+    if get_symbol_cache() is None:
+        if _engine() == "python-barcode":
+            return [code128_png(text, folder, name) for text, name in zip(texts, names)]
+        return export_symbols(texts, folder, names, SymbolStyle.from_config())
+
+    os.makedirs(folder, exist_ok=True)
+    sources, _ = cached_code128(texts, folder)
+    paths = []
+    for text, name in zip(texts, names):
+        path = os.path.join(folder, f"{name}.png")
+        try:
+            shutil.copyfile(sources[text], path)
+        except FileNotFoundError:
+            sources[text] = restore_symbol(text, folder)
+            shutil.copyfile(sources[text], path)
+        paths.append(path)
+    trim_symbol_cache()
+    return paths
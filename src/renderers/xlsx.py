@@ -0,0 +1,134 @@
+import io
+import logging
+from copy import copy
+import openpyxl
+from openpyxl.utils import get_column_letter, range_boundaries
+from openpyxl.worksheet.pagebreak import Break
+from src.labels import KIND_FRESCURAS, LabelJob
+from src.renderers.base import Renderer
+from utils.output_writer import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Constantes de la plantilla
+ROWS_PER_PAGE = 25  # Filas que ocupa cada pagina A4
+MAX_COL = 5  # Columnas A-E (5 columnas)
+# Celdas donde se inyectan datos (fila relativa dentro de cada bloque)
+ROW_FRESCURA = 8   # D8
+ROW_SKU = 15       # D15
+ROW_CADUCIDAD = 24 # D24
+COL_DATA = 4       # Columna D
+
+
+class XlsxRenderer(Renderer):
+    """Hojas de consumo preferente: replica el bloque de 25 filas de la plantilla por cada etiqueta."""
+
+    name = "xlsx"
+    extension = ".xlsx"
+    kinds = [KIND_FRESCURAS]
+    shardable_kinds = [KIND_FRESCURAS]
+
+    def render(self, job: LabelJob, output_path: str, base_name: str) -> str:
+        self._prepare(job, output_path)
+        excel_path = self.output_file(output_path, base_name)
+        write_atomic(excel_path, self.render_bytes(job))
+        logger.info(f"Documento generado: {excel_path}")
+        return excel_path
+
+    def render_bytes(self, job: LabelJob) -> bytes:
+        source = io.BytesIO(self.template_data) if self.template_data else self.template_path
+        template = openpyxl.load_workbook(source)
+
+        hoja = template.active
+        if hoja is None:
+            raise ValueError(f"La plantilla no tiene hoja activa: {self.template_path}")
+
+        # 1. Analizar plantilla original (Filas 1 a ROWS_PER_PAGE)
+
+        # Guardar alturas de fila
+        row_heights = {}
+        for row in range(1, ROWS_PER_PAGE + 1):
+            if row in hoja.row_dimensions:
+                row_heights[row] = hoja.row_dimensions[row].height
+
+        # Guardar celdas combinadas que estén dentro del rango de la plantilla
+        merged_ranges = []
+        for merged_range in hoja.merged_cells.ranges:
+            min_col, min_row, max_col, max_row = range_boundaries(str(merged_range))
+            if min_row <= ROWS_PER_PAGE:
+                merged_ranges.append((min_col, min_row, max_col, max_row))
+
+        # Guardar contenido y estilos celda por celda
+        template_cells = {}
+        for row in range(1, ROWS_PER_PAGE + 1):
+            for col in range(1, MAX_COL + 1):
+                cell = hoja.cell(row=row, column=col)
+                template_cells[(row, col)] = {
+                    'value': cell.value,
+                    'font': copy(cell.font) if cell.has_style else None,
+                    'border': copy(cell.border) if cell.has_style else None,
+                    'fill': copy(cell.fill) if cell.has_style else None,
+                    'number_format': copy(cell.number_format) if cell.has_style else None,
+                    'protection': copy(cell.protection) if cell.has_style else None,
+                    'alignment': copy(cell.alignment) if cell.has_style else None,
+                }
+
+        # 2. Generar copias
+        for idx, line in enumerate(job.expanded()):
+            # El primer registro (idx=0) ya usa la plantilla original en filas 1-25
+            # Solo escribimos datos.
+
+            row_offset = idx * ROWS_PER_PAGE
+
+            # Si es una copia (idx > 0), replicamos estructura
+            if idx > 0:
+                # A. Copiar filas y celdas
+                for row in range(1, ROWS_PER_PAGE + 1):
+                    target_row = row + row_offset
+
+                    # Copiar altura
+                    if row in row_heights:
+                        hoja.row_dimensions[target_row].height = row_heights[row]
+
+                    # Copiar celdas
+                    for col in range(1, MAX_COL + 1):
+                        source_data = template_cells.get((row, col))
+                        if source_data:
+                            target_cell = hoja.cell(row=target_row, column=col)
+                            target_cell.value = source_data['value']
+
+                            if source_data['font']: target_cell.font = copy(source_data['font'])
+                            if source_data['border']: target_cell.border = copy(source_data['border'])
+                            if source_data['fill']: target_cell.fill = copy(source_data['fill'])
+                            if source_data['number_format']: target_cell.number_format = source_data['number_format']
+                            if source_data['protection']: target_cell.protection = copy(source_data['protection'])
+                            if source_data['alignment']: target_cell.alignment = copy(source_data['alignment'])
+
+                # B. Replicar celdas combinadas (merged cells) con el offset
+                for (min_col, min_row, max_col, max_row) in merged_ranges:
+                    # Ajustar filas con el offset
+                    new_min_row = min_row + row_offset
+                    new_max_row = max_row + row_offset
+
+                    # Crear string del rango, ej: "A26:B28"
+                    start_cell = f"{get_column_letter(min_col)}{new_min_row}"
+                    end_cell = f"{get_column_letter(max_col)}{new_max_row}"
+                    hoja.merge_cells(f"{start_cell}:{end_cell}")
+
+                # C. Agregar salto de página
+                hoja.row_breaks.append(Break(id=row_offset))
+
+            # 3. Inyectar datos
+            hoja.cell(row=ROW_FRESCURA + row_offset, column=COL_DATA).value = line.lote
+            hoja.cell(row=ROW_SKU + row_offset, column=COL_DATA).value = line.text
+            hoja.cell(row=ROW_CADUCIDAD + row_offset, column=COL_DATA).value = line.caducidad
+
+        # Continuar la numeración de páginas en anexos y partes (una etiqueta por página)
+        if job.start_index:
+            hoja.page_setup.firstPageNumber = job.start_index + 1
+            hoja.page_setup.useFirstPageNumber = True
+
+        # Guardar
+        buffer = io.BytesIO()
+        template.save(buffer)
+        return buffer.getvalue()
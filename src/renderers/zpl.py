@@ -0,0 +1,32 @@
+from src.labels import KIND_BARCODES, KIND_FRESCURAS, LabelJob
+from src.renderers.base import Renderer
+from src.symbols2d import plain_qr_enabled, qr_payload
+from src.zpl import ZplWriter, emit_zpl
+
+
+class ZplRenderer(Renderer):
+    """Etiquetas ZPL para impresoras térmicas; las copias viajan como ^PQ."""
+
+    name = "zpl"
+    extension = ".zpl"
+    kinds = [KIND_BARCODES, KIND_FRESCURAS]
+    # El destino puede ser un socket: no se cachea
+    cacheable = False
+
+    def render(self, job: LabelJob, output_path: str, base_name: str) -> str:
+        self._prepare(job, output_path)
+        _, target = emit_zpl(self._build(job), output_path, f"{base_name}{self.extension}")
+        return target
+
+    def render_bytes(self, job: LabelJob) -> bytes:
+        return self._build(job).encode("utf-8")
+
+    def _build(self, job: LabelJob) -> str:
+        writer = ZplWriter.from_config()
+        if job.kind == KIND_BARCODES:
+            labels = [writer.barcode_label(line.text, line.copies) for line in job.lines]
+        else:
+            with_symbol = plain_qr_enabled()
+            labels = [writer.freshness_label(line.text, line.lote, line.caducidad, line.copies,
+                                             qr_payload(line) if with_symbol else "") for line in job.lines]
+        return "\n".join(labels) + "\n"
@@ -0,0 +1,98 @@
+import json
+import logging
+import os
+import shutil
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from src.labels import LabelJob, LabelLine
+
+logger = logging.getLogger(__name__)
+
+# Carpeta oculta dentro de la salida; cleanning_service la respeta al vaciar salidas
+RUNS_DIR = ".runs"
+
+
+class RunManifest:
+    """
+    Registro de la última corrida terminada de un formato: líneas renderizadas,
+    partes entregadas (la salida original + anexos) y total de etiquetas.
+    Es la base del modo anexar: solo se renderizan las líneas nuevas.
+    """
+
+    def __init__(self, output_path: str, base_name: str, renderer_name: str):
+        self.path = os.path.join(output_path, RUNS_DIR, f"{base_name}_{renderer_name}.json")
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not os.path.isfile(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Manifiesto de corrida ilegible ({self.path}): {e}")
+            return None
+        # Si alguien borró o movió una parte, ya no se puede anexar sobre ella
+        if not all(os.path.exists(part) for part in manifest.get("parts", [])):
+            logger.info(f"Partes de la corrida anterior incompletas: {self.path}")
+            return None
+        return manifest
+
+    def save(self, kind: str, lines: List[LabelLine], parts: List[str], labels: int) -> None:
+        manifest = {
+            "kind": kind,
+            "lines": [line.to_list() for line in lines],
+            "parts": parts,
+            "labels": labels,
+            "updated": time.time(),
+        }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def remove_parts(self, parts: List[str]) -> None:
+        """Elimina anexos de una corrida anterior que ya no forman parte de la salida."""
+        for part in parts:
+            try:
+                if os.path.isdir(part):
+                    shutil.rmtree(part)
+                elif os.path.exists(part):
+                    os.remove(part)
+            except OSError as e:
+                logger.warning(f"No se pudo eliminar la parte anterior {part}: {e}")
+
+    def invalidate(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def line_from_list(values: List[str]) -> LabelLine:
+    text, frescura, lote, caducidad, copies = values
+    return LabelLine(text, int(copies), frescura, lote, caducidad)
+
+
+def compute_delta(previous: Dict[str, Any], job: LabelJob) -> Tuple[LabelJob, List[LabelLine], List[LabelLine]]:
+    """
+    Devuelve (trabajo con solo lo nuevo, líneas acumuladas, líneas omitidas).
+    Diferencia por línea (multiconjunto): de cada línea del pedido se descuentan las copias de esa misma
+    línea (SKU, frescura, lote, caducidad) ya entregadas en corridas anteriores, sin importar el orden.
+    Las omitidas llevan las copias descontadas, para avisar al usuario qué no se volvió a imprimir.
+    """
+    old_lines = [line_from_list(values) for values in previous["lines"]]
+    printed: Counter = Counter()
+    for old in old_lines:
+        printed[old.key()] += old.copies
+
+    delta_lines: List[LabelLine] = []
+    skipped: List[LabelLine] = []
+    for line in job.lines:
+        key = line.key()
+        already = min(printed[key], line.copies)
+        printed[key] -= already
+        if already:
+            skipped.append(LabelLine(line.text, already, line.frescura, line.lote, line.caducidad))
+        if line.copies > already:
+            delta_lines.append(LabelLine(line.text, line.copies - already, line.frescura, line.lote, line.caducidad))
+    return LabelJob(job.kind, delta_lines), old_lines + delta_lines, skipped
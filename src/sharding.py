@@ -0,0 +1,129 @@
+import logging
+import os
+import shutil
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+from config.config_loader import conf
+from src.labels import LabelJob, LabelLine
+from src.checkpoint import JobCheckpoint, job_fingerprint
+from utils.logging_setup import worker_logging
+from utils.output_writer import open_atomic
+
+logger = logging.getLogger(__name__)
+
+
+def sharding_settings() -> Tuple[bool, int, int]:
+    """(activo, etiquetas por parte, procesos) según 'render.sharding'."""
+    enabled = bool(conf.get("render.sharding.enabled", True))
+    shard_size = max(1, int(conf.get("render.sharding.shard_size", 500)))
+    workers = int(conf.get("render.sharding.workers", 0)) or (os.cpu_count() or 1)
+    return enabled, shard_size, workers
+
+
+def split_job(job: LabelJob, shard_size: int) -> List[LabelJob]:
+    """Divide el trabajo en partes de 'shard_size' etiquetas, partiendo las copias si hace falta."""
+    shards: List[LabelJob] = []
+    current: List[LabelLine] = []
+    used = 0
+    start = job.start_index
+    for line in job.lines:
+        remaining = line.copies
+        while remaining > 0:
+            take = min(remaining, shard_size - used)
+            current.append(LabelLine(line.text, take, line.frescura, line.lote, line.caducidad))
+            used += take
+            remaining -= take
+            if used == shard_size:
+                shards.append(LabelJob(job.kind, current, start))
+                current, used, start = [], 0, start + shard_size
+    if current:
+        shards.append(LabelJob(job.kind, current, start))
+    return shards
+
+
+def _render_shard(renderer_name: str, template_path: str, temp_path: str, kind: str, start_index: int,
+                  rows: List[Tuple[str, int, str, str, str]], parts_dir: str, part_base: str) -> str:
+    """Se ejecuta en un proceso aparte: reconstruye el renderizador y dibuja una parte."""
+    from src.renderers import get_renderer
+    renderer = get_renderer(renderer_name, template_path=template_path, temp_path=temp_path)
+    job = LabelJob(kind, [LabelLine(*row) for row in rows], start_index)
+    return renderer.render(job, parts_dir, part_base)
+
+
+def render_sharded(renderer, job: LabelJob, output_path: str, base_name: str, shard_size: int, workers: int) -> str:
+    """
+    Renderiza el trabajo en partes paralelas (una por proceso) con orden de páginas determinista.
+    Los PDF se unen en un solo archivo; el resto se entrega como partes numeradas (y un .zip si
+    render.sharding.delivery es "zip").
+    Cada parte terminada queda registrada en un punto de control: si la corrida se interrumpe,
+    la siguiente con el mismo trabajo solo renderiza las partes que faltan.
+    """
+    t0 = time.perf_counter()
+    shards = split_job(job, shard_size)
+    parts_dir = os.path.join(output_path, f"{base_name}_{renderer.name}_partes")
+    checkpoint = JobCheckpoint(
+        output_path, f"{base_name}_{renderer.name}",
+        job_fingerprint(job, renderer=renderer.name, shard_size=shard_size), len(shards)
+    )
+    if not checkpoint.manifest["parts"] and os.path.isdir(parts_dir):
+        shutil.rmtree(parts_dir)
+    os.makedirs(parts_dir, exist_ok=True)
+
+    parts: Dict[int, str] = {}
+    pending = []
+    for index, shard in enumerate(shards, start=1):
+        done = checkpoint.completed_part(index)
+        if done:
+            parts[index] = done
+            continue
+        pending.append((index, shard.total_labels, (
+            renderer.name, renderer.template_path, renderer.temp_path, shard.kind, shard.start_index,
+            [(line.text, line.copies, line.frescura, line.lote, line.caducidad) for line in shard.lines],
+            parts_dir, f"parte_{index:03d}"
+        )))
+
+    if workers <= 1:
+        for index, labels, arg in pending:
+            parts[index] = _render_shard(*arg)
+            checkpoint.mark_done(index, parts[index], labels)
+    elif pending:
+        # Los procesos de trabajo registran en el mismo log que este proceso
+        with worker_logging() as (initializer, initargs), \
+                ProcessPoolExecutor(max_workers=min(workers, len(pending)), initializer=initializer, initargs=initargs) as pool:
+            futures = {pool.submit(_render_shard, *arg): (index, labels) for index, labels, arg in pending}
+            # Cada parte se registra en cuanto termina; el orden final lo da el índice
+            for future in as_completed(futures):
+                index, labels = futures[future]
+                parts[index] = future.result()
+                checkpoint.mark_done(index, parts[index], labels)
+
+    logger.info(f"{len(pending)} de {len(shards)} partes '{renderer.name}' renderizadas con {workers} procesos en {time.perf_counter() - t0:.3f} s")
+    ordered = [parts[index] for index in sorted(parts)]
+
+    if renderer.extension == ".pdf":
+        from src.renderers.pdf import concatenate_pdfs
+        result = concatenate_pdfs(ordered, renderer.output_file(output_path, base_name), parts_dir)
+    else:
+        # Evitar que quede la salida de un archivo de una corrida anterior junto a las partes
+        single_output = renderer.output_file(output_path, base_name)
+        if os.path.exists(single_output):
+            os.remove(single_output)
+        if conf.get("render.sharding.delivery", "single") == "zip":
+            result = zip_parts(ordered, os.path.join(output_path, f"{base_name}.zip"))
+            # Las partes ya viajan en el .zip: no duplicar lo entregado (ni lo que cuenta la retención)
+            shutil.rmtree(parts_dir, ignore_errors=True)
+        else:
+            result = parts_dir
+    checkpoint.finish()
+    return result
+
+
+def zip_parts(parts: List[str], zip_path: str) -> str:
+    """Empaqueta las partes en orden; se guardan sin recomprimir (xlsx ya viene comprimido)."""
+    with open_atomic(zip_path) as f, zipfile.ZipFile(f, "w", compression=zipfile.ZIP_STORED) as zf:
+        for part in parts:
+            zf.write(part, arcname=os.path.basename(part))
+    logger.info(f"Partes empaquetadas en: {zip_path}")
+    return zip_path
@@ -0,0 +1,75 @@
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from PIL import Image
+from config.config_loader import conf
+from src.labels import LabelLine
+
+try:
+    import qrcode
+except ImportError:  # Opcional: sin él, los PDF/PNG se generan sin el QR (ZPL lo codifica la impresora)
+    qrcode = None
+
+logger = logging.getLogger(__name__)
+
+# Separador entre campos de longitud variable, como en las cadenas GS1 (aquí es un carácter más del texto)
+GS = "\x1d"
+
+
+def plain_qr_enabled() -> bool:
+    return bool(conf.get("render.frescuras.plain_qr", False))
+
+
+def _yymmdd(value: str) -> str:
+    return datetime.strptime(value, "%d/%m/%Y").strftime("%y%m%d")
+
+
+def qr_payload(line: LabelLine) -> str:
+    """
+    Texto del QR de una etiqueta de frescura, con el formato de una cadena de elementos GS1:
+    (11) fecha de elaboración, (17) caducidad, (240) SKU, (10) código de frescura.
+    Los AI de longitud fija van primero; el GS separa el único campo variable que no va al final.
+
+    Es un QR normal (sin FNC1 en primera posición): los lectores no lo reportan como GS1 (]Q3)
+    y el software que espera GS1 no lo interpreta; quien lo lea debe separar los campos por su cuenta.
+    """
+    return f"11{_yymmdd(line.lote)}17{_yymmdd(line.caducidad)}240{line.text}{GS}10{line.frescura}"
+
+
+@lru_cache(maxsize=4096)
+def qr_matrix(payload: str) -> Optional[np.ndarray]:
+    """Matriz QR (True = módulo oscuro) sin zona de silencio, o None si qrcode no está instalado."""
+    if qrcode is None:
+        return None
+    code = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, border=0)
+    code.add_data(payload)
+    code.make(fit=True)
+    matrix = np.array(code.get_matrix(), dtype=bool)
+    matrix.flags.writeable = False
+    return matrix
+
+
+def encode_batch(lines: Iterable[LabelLine]) -> Dict[str, np.ndarray]:
+    """{carga: matriz} de las líneas del trabajo; las cargas repetidas se codifican una sola vez."""
+    if qrcode is None:
+        logger.warning("Paquete 'qrcode' no instalado: las etiquetas se generan sin QR")
+        return {}
+    return {payload: qr_matrix(payload) for payload in dict.fromkeys(qr_payload(line) for line in lines)}
+
+
+def matrix_image(matrix: np.ndarray, module_px: int, quiet_modules: int = 4) -> Image.Image:
+    """Imagen de 1 bit: cada módulo se expande a module_px x module_px con np.repeat."""
+    padded = np.pad(matrix, quiet_modules)
+    pixels = np.repeat(np.repeat(~padded, module_px, axis=0), module_px, axis=1)
+    return Image.fromarray(pixels)
+
+
+def matrix_runs(matrix: np.ndarray) -> List[Tuple[int, int, int]]:
+    """Tramos horizontales oscuros (fila, columna, largo) para dibujar la matriz como vectores."""
+    runs = []
+    for row_index, row in enumerate(matrix):
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], row.astype(np.int8), [0]))))
+        runs.extend((row_index, int(start), int(end - start)) for start, end in zip(edges[::2], edges[1::2]))
+    return runs
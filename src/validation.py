@@ -0,0 +1,141 @@
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from config.config_loader import conf
+from src.labels import KIND_BARCODES, KIND_FRESCURAS
+
+logger = logging.getLogger(__name__)
+
+# Códigos de error por fila
+ERR_INCOMPLETE = "DATOS_INCOMPLETOS"
+ERR_EMPTY_TEXT = "TEXTO_VACIO"
+ERR_SKU_FORMAT = "SKU_INVALIDO"
+ERR_SKU_UNKNOWN = "SKU_INEXISTENTE"
+ERR_FRESCURA_FORMAT = "FRESCURA_INCORRECTA"
+ERR_FRESCURA_DATE = "FECHA_INVALIDA"
+ERR_COPIES = "CANTIDAD_INVALIDA"
+ERR_COPIES_RANGE = "CANTIDAD_FUERA_DE_RANGO"
+ERR_MAX_ROWS = "EXCEDE_MAXIMO_DE_FILAS"
+
+MESSAGES: Dict[str, str] = {
+    ERR_INCOMPLETE: "Datos incompletos",
+    ERR_EMPTY_TEXT: "Texto vacío",
+    ERR_SKU_FORMAT: "SKU inválido",
+    ERR_SKU_UNKNOWN: "SKU inexistente",
+    ERR_FRESCURA_FORMAT: "Frescura incorrecta",
+    ERR_FRESCURA_DATE: "Fecha inválida",
+    ERR_COPIES: "Cantidad inválida",
+    ERR_COPIES_RANGE: "Cantidad fuera de rango",
+    ERR_MAX_ROWS: "Excede el máximo de filas por generación",
+}
+
+COLUMNS = ["sku", "frescura", "copias"]
+
+
+def frescura_dates(frescuras: pd.Series) -> pd.Series:
+    """
+    Fecha de lote de cada frescura 'A000' (ya con formato válido), vectorizado.
+    Letra A-L -> mes, [1:3] -> día, último dígito -> año de la década actual.
+    Devuelve NaT donde la fecha no existe en el calendario (p. ej. B305 = 30 de febrero).
+    """
+    decade_start = (datetime.now().year // 10) * 10
+    parts = pd.DataFrame({
+        "year": decade_start + pd.to_numeric(frescuras.str[3], errors="coerce"),
+        "month": frescuras.str[0].map(lambda letter: ord(letter) - ord("A") + 1 if isinstance(letter, str) and letter else np.nan),
+        "day": pd.to_numeric(frescuras.str[1:3], errors="coerce"),
+    }, index=frescuras.index)
+    return pd.to_datetime(parts, errors="coerce")
+
+
+class OrderValidation:
+    """
+    Resultado de validar un pedido completo.
+    table: filas normalizadas (sku, frescura, copias, fecha_lote).
+    flags: DataFrame booleano filas x códigos de error.
+    """
+
+    def __init__(self, mode: str, table: pd.DataFrame, flags: pd.DataFrame):
+        self.mode = mode
+        self.table = table
+        self.flags = flags
+        self.valid_mask: pd.Series = ~flags.any(axis=1)
+
+    @property
+    def is_valid(self) -> bool:
+        return bool(self.valid_mask.all())
+
+    def errors_by_row(self) -> Dict[int, List[str]]:
+        """{número de fila (desde 1): [códigos]} solo para las filas con errores."""
+        invalid = self.flags[~self.valid_mask]
+        return {int(index) + 1: [code for code in invalid.columns if row[code]] for index, row in invalid.iterrows()}
+
+    def messages(self) -> List[str]:
+        return [f"Fila {row}: {', '.join(MESSAGES[code] for code in codes)}" for row, codes in self.errors_by_row().items()]
+
+    def to_query(self) -> List[List[str]]:
+        """Consulta para los motores: frescuras -> [sku, frescura] por copia; barcodes -> [texto, copias]."""
+        valid = self.table[self.valid_mask]
+        if self.mode == KIND_FRESCURAS:
+            repeated = valid.loc[valid.index.repeat(valid["copias"].astype(int))]
+            return repeated[["sku", "frescura"]].values.tolist()
+        return [[text, str(int(copies))] for text, copies in zip(valid["sku"], valid["copias"])]
+
+
+def validate_order(rows: Iterable[Sequence[str]], mode: str = KIND_FRESCURAS,
+                   catalog_codes: Optional[Iterable[str]] = None,
+                   frescura_pattern: Optional[str] = None,
+                   copies_range: Optional[tuple] = None,
+                   max_rows: Optional[int] = None) -> OrderValidation:
+    """
+    Valida un pedido en una sola pasada vectorizada.
+    rows: [[sku/texto, frescura, copias], ...]; la frescura y las copias son opcionales (copias = 1).
+    catalog_codes: códigos existentes; si es None no se comprueba la existencia.
+    Los parámetros omitidos se leen de settings.yaml (validation.* y security.max_rows_per_generation).
+    """
+    defaults = ["", "", "1"]
+    table = pd.DataFrame([list(row) + defaults[len(row):] for row in rows], columns=COLUMNS, dtype=str).fillna("")
+    for column in COLUMNS:
+        table[column] = table[column].str.strip()
+    table["frescura"] = table["frescura"].str.upper()
+
+    frescura_pattern = frescura_pattern or conf.get("validation.frescura.pattern", r"^[A-L](0[1-9]|1[0-9]|2[0-9]|3[0-1])[0-9]$")
+    sku_length = int(conf.get("validation.sku.max_length", 7))
+    min_copies, max_copies = copies_range or (int(conf.get("validation.copias.min", 1)), int(conf.get("validation.copias.max", 99)))
+    max_rows = max_rows if max_rows is not None else int(conf.get("security.max_rows_per_generation", 100))
+
+    flags = pd.DataFrame(False, index=table.index, columns=list(MESSAGES))
+    copies = pd.to_numeric(table["copias"], errors="coerce")
+    table["copias"] = copies
+
+    if mode == KIND_BARCODES:
+        empty = table["sku"] == ""
+        flags[ERR_EMPTY_TEXT] = empty
+        checked = ~empty
+    else:
+        incomplete = (table["sku"] == "") | (table["frescura"] == "")
+        flags[ERR_INCOMPLETE] = incomplete
+        complete = ~incomplete
+
+        sku_ok = table["sku"].str.fullmatch(rf"[0-9]{{{sku_length}}}")
+        flags[ERR_SKU_FORMAT] = complete & ~sku_ok
+        if catalog_codes is not None:
+            codes = catalog_codes if isinstance(catalog_codes, (set, frozenset)) else set(map(str, catalog_codes))
+            flags[ERR_SKU_UNKNOWN] = complete & sku_ok & ~table["sku"].isin(codes)
+
+        frescura_ok = table["frescura"].str.fullmatch(frescura_pattern)
+        flags[ERR_FRESCURA_FORMAT] = complete & ~frescura_ok
+        table["fecha_lote"] = pd.NaT
+        table.loc[frescura_ok, "fecha_lote"] = frescura_dates(table.loc[frescura_ok, "frescura"])
+        flags[ERR_FRESCURA_DATE] = complete & frescura_ok & table["fecha_lote"].isna()
+        checked = complete
+
+    flags[ERR_COPIES] = checked & (copies.isna() | (copies % 1 != 0))
+    flags[ERR_COPIES_RANGE] = checked & copies.notna() & ((copies < min_copies) | (copies > max_copies))
+    flags[ERR_MAX_ROWS] = pd.Series(np.arange(len(table)) >= max_rows, index=table.index)
+
+    result = OrderValidation(mode, table, flags)
+    if not result.is_valid:
+        logger.info(f"Pedido con {int((~result.valid_mask).sum())} de {len(table)} filas inválidas")
+    return result
@@ -0,0 +1,111 @@
+import logging
+import os
+import socket
+from typing import List, Tuple
+from config.config_loader import conf
+from utils.output_writer import write_atomic
+
+logger = logging.getLogger(__name__)
+
+MM_PER_INCH = 25.4
+# Caracteres con significado especial en ZPL (y el separador GS del texto del QR): se escapan con ^FH (hexadecimal precedido de '_')
+ZPL_SPECIAL_CHARS = {"^", "~", "_", "\x1d"}
+
+
+def _field(data: str) -> str:
+    """Devuelve el bloque ^FD...^FS escapando caracteres especiales si hace falta."""
+    if not any(char in ZPL_SPECIAL_CHARS for char in data):
+        return f"^FD{data}^FS"
+    escaped = "".join(f"_{ord(char):02X}" if char in ZPL_SPECIAL_CHARS else char for char in data)
+    return f"^FH_^FD{escaped}^FS"
+
+
+class ZplWriter:
+    """
+    Genera etiquetas ZPL (Zebra) usando el motor de códigos de barras de la impresora.
+    Las copias se envían con ^PQ en lugar de repetir la etiqueta.
+    """
+
+    def __init__(self, dpi: int = 203, label_width_mm: float = 100, label_height_mm: float = 50):
+        self.dpi = dpi
+        self.width_dots = self.mm_to_dots(label_width_mm)
+        self.height_dots = self.mm_to_dots(label_height_mm)
+
+    @classmethod
+    def from_config(cls) -> "ZplWriter":
+        return cls(
+            dpi=int(conf.get("zpl.dpi", 203)),
+            label_width_mm=float(conf.get("zpl.label_width_mm", 100)),
+            label_height_mm=float(conf.get("zpl.label_height_mm", 50)),
+        )
+
+    def mm_to_dots(self, value_mm: float) -> int:
+        return int(round(value_mm / MM_PER_INCH * self.dpi))
+
+    def _label(self, body: List[str], copies: int) -> str:
+        header = ["^XA", "^CI28", f"^PW{self.width_dots}", f"^LL{self.height_dots}", "^LH0,0"]
+        footer = [f"^PQ{max(1, copies)},0,1,Y", "^XZ"]
+        return "\n".join(header + body + footer)
+
+    def barcode_label(self, text: str, copies: int = 1) -> str:
+        """Etiqueta con un Code128 en el margen superior izquierdo (^FO) y su texto legible debajo."""
+        margin = self.mm_to_dots(3)
+        module = max(2, self.dpi // 100)
+        bar_height = self.height_dots - 2 * margin - self.mm_to_dots(6)
+        body = [
+            f"^FO{margin},{margin}",
+            f"^BY{module},3",
+            f"^BCN,{bar_height},Y,N,N",
+            _field(text),
+        ]
+        return self._label(body, copies)
+
+    def freshness_label(self, sku: str, lote: str, caducidad: str, copies: int = 1, payload: str = "") -> str:
+        """
+        Etiqueta de consumo preferente con los mismos campos que la plantilla XLSX.
+        'payload': texto opcional (ver symbols2d.qr_payload); la impresora lo codifica como QR normal
+        (^BQ; 'MA,' = corrección de errores M y modo automático, sin FNC1) en el margen derecho.
+        """
+        margin = self.mm_to_dots(3)
+        line = (self.height_dots - 2 * margin) // 6
+        font_small = max(20, line // 2)
+        font_big = max(30, line - 4)
+        body = []
+        for index, (title, value) in enumerate((("LOTE:", lote), ("SKU:", sku), ("CONSUMO PREFERENTE:", caducidad))):
+            y = margin + index * 2 * line
+            body.append(f"^FO{margin},{y}^A0N,{font_small},{font_small}{_field(title)}")
+            body.append(f"^FO{margin * 3},{y + font_small}^A0N,{font_big},{font_big}{_field(value)}")
+        if payload:
+            # ~33 módulos para estas cargas (versión 4, corrección M)
+            magnification = max(1, min(10, (self.height_dots - 2 * margin) // 33))
+            body.append(f"^FO{self.width_dots - margin - 33 * magnification},{margin}^BQN,2,{magnification}")
+            body.append(_field(f"MA,{payload}"))
+        return self._label(body, copies)
+
+
+def write_zpl_file(zpl_data: str, path: str) -> str:
+    write_atomic(path, zpl_data.encode("utf-8"))
+    logger.info(f"Archivo ZPL generado: {path}")
+    return path
+
+
+def send_to_printer(zpl_data: str, host: str, port: int = 9100, timeout: float = 10.0) -> None:
+    """Envía ZPL crudo a una impresora de red (puerto RAW 9100)."""
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall(zpl_data.encode("utf-8"))
+    logger.info(f"ZPL enviado a {host}:{port} ({len(zpl_data)} bytes)")
+
+
+def emit_zpl(zpl_data: str, output_path: str, filename: str) -> Tuple[str, str]:
+    """
+    Entrega el ZPL según 'zpl.output' ("file" o "socket").
+    Devuelve (destino, descripción) para informar al usuario.
+    """
+    target = conf.get("zpl.output", "file")
+    if target == "socket":
+        host = conf.get("zpl.host", "127.0.0.1")
+        port = int(conf.get("zpl.port", 9100))
+        send_to_printer(zpl_data, host, port, float(conf.get("zpl.timeout_seconds", 10)))
+        return "socket", f"{host}:{port}"
+    path = write_zpl_file(zpl_data, os.path.join(output_path, filename))
+    return "file", path
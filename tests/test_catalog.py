@@ -0,0 +1,72 @@
+import copy
+import os
+import pytest
+from config.config_loader import conf
+from src.catalog import build_binary_catalog, diff_catalogs, get_catalog, load_catalog
+
+
+@pytest.fixture
+def catalog_folder(monkeypatch, tmp_path):
+    settings = copy.deepcopy(conf._config)
+    settings.setdefault("catalog", {})["binary_folder"] = str(tmp_path / "binarios")
+    settings["catalog"]["precedence"] = "first"
+    monkeypatch.setattr(conf, "_config", settings)
+    return tmp_path
+
+
+def _csv(path, rows) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("CODIGO,DESCRIPCION,SHELF_LIFE\n")
+        for row in rows:
+            f.write(",".join(row) + "\n")
+    return str(path)
+
+
+def test_binary_lookup(catalog_folder):
+    source = _csv(catalog_folder / "frescuras.csv", [
+        ("3017868", "Yogur natural", "30"), ("0000120", "Ñandú ahumado", "365"),
+        ("3010443", "Sin vida útil", ""), ("abc", "No numérico", "10"), ("3017868", "Duplicado", "1"),
+    ])
+    catalog = get_catalog(source)
+    assert len(catalog) == 3
+    assert catalog.lookup("3017868") == ("Yogur natural", 30)
+    assert catalog.lookup(" 120 ") == ("Ñandú ahumado", 365)
+    assert catalog.lookup("3010443") == ("Sin vida útil", None)
+    assert catalog.lookup("9999999") is None and catalog.lookup("abc") is None
+    assert catalog.code_strings() == {"3017868", "0000120", "3010443"}
+
+
+def test_binary_is_rebuilt_only_when_the_csv_changes(catalog_folder):
+    source = _csv(catalog_folder / "frescuras.csv", [("3017868", "Yogur", "30")])
+    first = build_binary_catalog(source)
+    mtime = os.path.getmtime(first)
+    assert build_binary_catalog(source) == first and os.path.getmtime(first) == mtime
+
+    old = get_catalog(source)
+    _csv(catalog_folder / "frescuras.csv", [("3017868", "Yogur", "45"), ("3000003", "Leche", "10")])
+    second = build_binary_catalog(source)
+    assert second != first and not os.path.exists(first)
+    assert diff_catalogs(old, get_catalog(source)) == {3017868, 3000003}
+
+
+@pytest.mark.parametrize("precedence, winner", [("first", ("Planta A", 30)), ("last", ("Planta B", 45))])
+def test_merge_precedence_and_conflicts(catalog_folder, precedence, winner):
+    conf._config["catalog"]["precedence"] = precedence
+    a = _csv(catalog_folder / "a.csv", [("3017868", "Planta A", "30"), ("3000003", "Leche", "10")])
+    b = _csv(catalog_folder / "b.csv", [("3017868", "Planta B", "45"), ("3000003", "Leche", "10"), ("3010443", "Queso", "60")])
+    catalog = load_catalog([a, b])
+    assert len(catalog) == 3
+    assert catalog.lookup("3017868") == winner
+    assert catalog.lookup("3000003") == ("Leche", 10)
+    assert catalog.lookup("3010443") == ("Queso", 60)
+    # Solo el SKU con datos distintos es conflicto; el idéntico en ambas fuentes no
+    assert [conflict["sku"] for conflict in catalog.conflicts] == [3017868]
+    assert load_catalog([a, b]) is catalog
+
+
+def test_folder_source_uses_every_csv_in_name_order(catalog_folder):
+    folder = catalog_folder / "fuentes"
+    folder.mkdir()
+    _csv(folder / "2_planta.csv", [("3017868", "Segunda", "45")])
+    _csv(folder / "1_central.csv", [("3017868", "Central", "30")])
+    assert load_catalog(str(folder)).lookup("3017868") == ("Central", 30)
@@ -0,0 +1,62 @@
+import copy
+import os
+import pytest
+from pypdf import PdfReader
+from config.config_loader import conf
+from src.checkpoint import CHECKPOINT_DIR, JobCheckpoint, job_fingerprint
+from src.labels import KIND_FRESCURAS, LabelJob, LabelLine
+from src.renderers.pdf import PdfRenderer
+
+
+@pytest.fixture
+def one_page_chunks(monkeypatch):
+    settings = copy.deepcopy(conf._config)
+    settings.setdefault("pdf", {}).setdefault("streaming", {}).update(chunk_pages=1, merge=True)
+    monkeypatch.setattr(conf, "_config", settings)
+
+
+def _job(count: int = 5) -> LabelJob:
+    return LabelJob(KIND_FRESCURAS, [LabelLine(f"30000{index:02d}", 1, "A011", f"A011{index}", "01/01/2027") for index in range(count)])
+
+
+def test_resume_after_crash_renders_only_missing_parts(one_page_chunks, monkeypatch, tmp_path):
+    renderer = PdfRenderer(temp_path=str(tmp_path / "temp"))
+    render_chunk = PdfRenderer._render_chunk
+    rendered = []
+    crash_at = ["3000003"]
+
+    def tracking_render(self, labels, layout, temp_path=""):
+        labels = list(labels)
+        if labels[0].text in crash_at:
+            raise RuntimeError("corte de luz")
+        rendered.append(labels[0].text)
+        return render_chunk(self, labels, layout, temp_path)
+
+    monkeypatch.setattr(PdfRenderer, "_render_chunk", tracking_render)
+    with pytest.raises(RuntimeError):
+        renderer.render(_job(), str(tmp_path), "Frescuras")
+    assert rendered == ["3000000", "3000001", "3000002"]
+    assert os.path.isdir(tmp_path / CHECKPOINT_DIR)
+
+    rendered.clear()
+    crash_at.clear()
+    pdf_path = renderer.render(_job(), str(tmp_path), "Frescuras")
+    assert rendered == ["3000003", "3000004"]
+    assert len(PdfReader(pdf_path).pages) == 5
+    assert not os.path.exists(tmp_path / CHECKPOINT_DIR)
+    assert not os.path.exists(tmp_path / "Frescuras_partes")
+
+
+def test_checkpoint_of_another_job_is_ignored(tmp_path):
+    checkpoint = JobCheckpoint(str(tmp_path), "trabajo", job_fingerprint(_job(), chunk=1), 5)
+    part = tmp_path / "parte_001.pdf"
+    part.write_bytes(b"%PDF")
+    checkpoint.mark_done(1, str(part), 1)
+    checkpoint.mark_done(3, str(part), 1)
+    assert checkpoint.manifest["next_label"] == 1
+
+    assert JobCheckpoint(str(tmp_path), "trabajo", job_fingerprint(_job(), chunk=1), 5).completed_part(1) == str(part)
+    assert JobCheckpoint(str(tmp_path), "trabajo", job_fingerprint(_job(4), chunk=1), 5).completed_part(1) is None
+    assert JobCheckpoint(str(tmp_path), "trabajo", job_fingerprint(_job(), chunk=2), 5).completed_part(1) is None
+    part.unlink()
+    assert JobCheckpoint(str(tmp_path), "trabajo", job_fingerprint(_job(), chunk=1), 5).completed_part(1) is None
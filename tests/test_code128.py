@@ -0,0 +1,104 @@
+import random
+import string
+import numpy as np
+import pytest
+from src.code128 import (MODULES, PATTERNS, SHIFT, START, STOP, SWITCH, SymbolStyle, encode_values,
+                         encoded_modules, module_array, rasterize)
+
+SET_OF_START = {value: code_set for code_set, value in START.items()}
+# Cambios válidos desde cada subconjunto (en C, 99 es el dato "99"; en A/B, el propio valor es FNC4)
+SWITCHES = {code_set: {SWITCH[other]: other for other in SWITCH if other != code_set} for code_set in SWITCH}
+
+
+def _char(value: int, code_set: str) -> str:
+    if code_set == "B" or value < 64:
+        return chr(value + 32)
+    return chr(value - 64)
+
+
+def decode_values(values):
+    """Decodificador de referencia: valida checksum y stop, y reconstruye el texto."""
+    assert values[-1] == STOP
+    checksum = (values[0] + sum(position * value for position, value in enumerate(values[1:-2], start=1))) % 103
+    assert values[-2] == checksum
+    code_set = SET_OF_START[values[0]]
+    text, shifted = [], False
+    for value in values[1:-2]:
+        current = ("A" if code_set == "B" else "B") if shifted else code_set
+        shifted = False
+        if code_set != "C" and value == SHIFT:
+            shifted = True
+        elif value in SWITCHES[code_set]:
+            code_set = SWITCHES[code_set][value]
+        elif code_set == "C":
+            text.append(f"{value:02d}")
+        else:
+            text.append(_char(value, current))
+    return "".join(text)
+
+
+def decode_modules(modules: np.ndarray, quiet_modules: int = 10):
+    """Módulos -> valores, leyendo anchos de barras/espacios de 6 en 6 (stop: 7)."""
+    bits = modules[quiet_modules:len(modules) - quiet_modules]
+    edges = np.flatnonzero(np.diff(bits)) + 1
+    widths = np.diff(np.concatenate(([0], edges, [len(bits)])))
+    patterns = {pattern: value for value, pattern in enumerate(PATTERNS)}
+    values, i = [], 0
+    while i < len(widths):
+        size = 7 if len(widths) - i == 7 else 6
+        values.append(patterns["".join(map(str, widths[i:i + size]))])
+        i += size
+    return values
+
+
+def test_known_checksum():
+    assert encode_values("3017868") == [105, 30, 17, 86, 100, 24, 20, 106]
+    assert encode_values("ABC-123") == [104, 33, 34, 35, 13, 17, 18, 19, 70, 106]
+
+
+@pytest.mark.parametrize("text", ["3017868", "7501234567890", "ABC-123", "a1b2c3", "99", "0", "X",
+                                  "HOLA\tMUNDO", "abc\x01DEF", "12345abcd6789", "lote_0042/B"])
+def test_round_trip(text):
+    values = encode_values(text)
+    assert decode_values(values) == text
+    assert decode_modules(module_array(values)) == values
+
+
+def test_round_trip_random():
+    rng = random.Random(43)
+    alphabet = string.digits * 3 + string.ascii_letters + "-_/ .\x01\x1f"
+    for _ in range(500):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 24)))
+        assert decode_values(encode_values(text)) == text
+
+
+def test_digits_use_code_c():
+    # 12 dígitos: inicio C + 6 pares + checksum + stop
+    assert len(encode_values("123456789012")) == 9
+
+
+def test_rejects_unencodable_text():
+    with pytest.raises(ValueError):
+        encode_values("")
+    with pytest.raises(ValueError):
+        encode_values("ñ")
+
+
+def test_encoded_modules_are_cached_and_read_only():
+    first = encoded_modules("3017868")
+    assert encoded_modules("3017868") is first
+    assert not first.flags.writeable
+    assert np.array_equal(first, module_array(encode_values("3017868")))
+    assert sum(len(MODULES[value]) for value in encode_values("3017868")) + 20 == len(first)
+
+
+def test_rasterize_is_one_bit_at_module_width():
+    style = SymbolStyle(dpi=300, module_width_mm=0.254, bar_height_mm=10, quiet_modules=10, text=False)
+    image = rasterize("3017868", style)
+    assert image.mode == "1"
+    pixels = np.array(image)
+    modules = encoded_modules("3017868")
+    module_px = image.width // len(modules)
+    assert image.width == len(modules) * module_px
+    # Cada columna de módulo queda en negro (False) donde hay barra
+    assert np.array_equal(~pixels[0, ::module_px], modules.astype(bool))
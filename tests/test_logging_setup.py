@@ -0,0 +1,53 @@
+import logging
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from utils.logging_setup import TruncatingQueueHandler, worker_logging
+
+
+def _queued(max_chars: int = 0):
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger("tests.logging_setup")
+    logger.propagate = False
+    handler = TruncatingQueueHandler(log_queue, max_chars)
+    logger.addHandler(handler)
+    return logger, handler, log_queue
+
+
+def test_message_is_formatted_when_logged():
+    logger, handler, log_queue = _queued()
+    try:
+        rows = ["3000003"]
+        logger.warning("filas: %s", rows)
+        rows.append("3000022")
+        record = log_queue.get_nowait()
+    finally:
+        logger.removeHandler(handler)
+    assert record.getMessage() == "filas: ['3000003']" and record.args is None
+
+
+def test_long_message_is_truncated_but_traceback_is_kept():
+    logger, handler, log_queue = _queued(max_chars=10)
+    try:
+        try:
+            raise ValueError("falla")
+        except ValueError:
+            logger.exception("x" * 50)
+        record = log_queue.get_nowait()
+    finally:
+        logger.removeHandler(handler)
+    message = record.getMessage()
+    assert message.startswith("x" * 10 + "... [+40 caracteres]\nTraceback")
+    assert message.endswith("ValueError: falla") and record.exc_info is None
+
+
+def _log_in_worker(index: int) -> int:
+    logging.getLogger("tests.worker").warning(f"parte {index} lista")
+    return index
+
+
+def test_worker_records_reach_the_main_process(caplog):
+    with caplog.at_level(logging.INFO), worker_logging() as (initializer, initargs), \
+            ProcessPoolExecutor(max_workers=2, initializer=initializer, initargs=initargs) as pool:
+        assert sorted(pool.map(_log_in_worker, range(3))) == [0, 1, 2]
+    assert sorted(record.getMessage() for record in caplog.records if record.name == "tests.worker") == [
+        "parte 0 lista", "parte 1 lista", "parte 2 lista"]
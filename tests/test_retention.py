@@ -0,0 +1,64 @@
+import os
+import time
+from utils.retention import MARKER_FILE, RetentionManager
+
+
+def _write(path: str, size: int = 1024) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+
+def _manager(root: str, max_bytes: int = 0, max_age_seconds: float = 0) -> RetentionManager:
+    manager = RetentionManager(root, max_bytes, max_age_seconds)
+    manager.enforce()
+    return manager
+
+
+def test_enforce_never_touches_unrelated_files(tmp_path):
+    root = tmp_path / "generaciones"
+    _write(str(root / "tesis.docx"), 4096)
+    _write(str(root / "fotos" / "foto.jpg"), 4096)
+    old = time.time() - 90 * 24 * 3600
+    os.utime(root / "tesis.docx", (old, old))
+    os.utime(root / "fotos", (old, old))
+
+    manager = _manager(str(root), max_bytes=0, max_age_seconds=1)
+    job = manager.job_folder("frescuras", "pedido")
+    _write(os.path.join(job, "hojas_de_frescura.xlsx"))
+    manager.commit(job)
+    manager.enforce()
+
+    assert not os.path.exists(job)
+    assert (root / "tesis.docx").exists()
+    assert (root / "fotos" / "foto.jpg").exists()
+    assert "tesis.docx" not in manager.entries and "fotos" not in manager.entries
+
+
+def test_index_cannot_point_at_unmarked_folders(tmp_path):
+    root = tmp_path / "generaciones"
+    _write(str(root / "ajeno" / "dato.txt"))
+    (root / ".retencion.json").write_text('{"ajeno": {"bytes": 999999, "last_used": 0, "done": true}}')
+
+    manager = _manager(str(root), max_bytes=0)
+
+    assert "ajeno" not in manager.entries
+    assert (root / "ajeno" / "dato.txt").exists()
+
+
+def test_unfinished_job_is_reused_by_the_same_order(tmp_path):
+    manager = _manager(str(tmp_path / "generaciones"), max_bytes=10 ** 9)
+    first = manager.job_folder("frescuras", "pedido-a")
+    _write(os.path.join(first, ".checkpoints", "manifest.json"))
+    manager.commit(first, finished=False)
+
+    # Un proceso nuevo (índice en disco) encuentra el trabajo sin terminar
+    reopened = _manager(str(tmp_path / "generaciones"), max_bytes=10 ** 9)
+    assert reopened.job_folder("frescuras", "pedido-b") != first
+    again = reopened.job_folder("frescuras", "pedido-a")
+    assert again == first
+    assert os.path.isfile(os.path.join(again, MARKER_FILE))
+    reopened.commit(again)
+
+    # Ya confirmado: el mismo pedido abre una carpeta nueva
+    assert reopened.job_folder("frescuras", "pedido-a") != first
@@ -0,0 +1,43 @@
+from src.labels import KIND_FRESCURAS, LabelJob, LabelLine
+from src.run_manifest import compute_delta
+
+
+def _line(sku: str, copies: int, frescura: str = "A011") -> LabelLine:
+    return LabelLine(sku, copies, frescura, "01/01/2026", "01/01/2027")
+
+
+def _previous(lines):
+    return {"lines": [line.to_list() for line in lines], "labels": sum(line.copies for line in lines)}
+
+
+def _summary(lines):
+    return [(line.text, line.frescura, line.copies) for line in lines]
+
+
+def test_equal_order_is_all_skipped():
+    old = [_line("3000003", 2), _line("3000022", 1)]
+    delta, lines, skipped = compute_delta(_previous(old), LabelJob(KIND_FRESCURAS, [_line("3000003", 2), _line("3000022", 1)]))
+    assert delta.total_labels == 0
+    assert _summary(skipped) == [("3000003", "A011", 2), ("3000022", "A011", 1)]
+    assert _summary(lines) == _summary(old)
+
+
+def test_prefix_with_more_copies_and_new_lines():
+    old = [_line("3000003", 2), _line("3000022", 1)]
+    job = LabelJob(KIND_FRESCURAS, [_line("3000003", 2), _line("3000022", 3), _line("3000040", 4)])
+    delta, lines, skipped = compute_delta(_previous(old), job)
+    assert _summary(delta.lines) == [("3000022", "A011", 2), ("3000040", "A011", 4)]
+    assert _summary(skipped) == [("3000003", "A011", 2), ("3000022", "A011", 1)]
+    assert sum(line.copies for line in lines) == job.total_labels
+
+
+def test_reordered_order_does_not_duplicate():
+    old = [_line("3000003", 2), _line("3000022", 1), _line("3000003", 1, "B021")]
+    job = LabelJob(KIND_FRESCURAS, [_line("3000040", 1), _line("3000003", 1, "B021"), _line("3000022", 1), _line("3000003", 3)])
+    delta, lines, skipped = compute_delta(_previous(old), job)
+    assert _summary(delta.lines) == [("3000040", "A011", 1), ("3000003", "A011", 1)]
+    assert _summary(skipped) == [("3000003", "B021", 1), ("3000022", "A011", 1), ("3000003", "A011", 2)]
+
+    # La siguiente corrida con el mismo pedido ya no tiene nada nuevo
+    delta, _, _ = compute_delta(_previous(lines), job)
+    assert delta.total_labels == 0
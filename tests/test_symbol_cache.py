@@ -0,0 +1,63 @@
+import copy
+import os
+import pytest
+from PIL import Image
+from pypdf import PdfReader
+from config.config_loader import conf
+from src.labels import LabelJob
+from src.renderers import symbols
+from src.renderers.pdf import PdfRenderer
+from src.renderers.symbols import cached_code128, code128_pngs, trim_symbol_cache
+from utils import output_cache
+
+
+@pytest.fixture
+def symbol_cache(monkeypatch, tmp_path):
+    settings = copy.deepcopy(conf._config)
+    settings.setdefault("cache", {})["symbols"] = {"enabled": True, "folder": str(tmp_path / "simbolos"), "max_size_mb": 50}
+    settings.setdefault("barcodes", {})["engine"] = "native"
+    monkeypatch.setattr(conf, "_config", settings)
+    monkeypatch.setattr(output_cache, "_instances", {})
+    rasterized = []
+    rasterize = symbols.rasterize
+    monkeypatch.setattr(symbols, "rasterize", lambda text, style=None: rasterized.append(text) or rasterize(text, style))
+    return rasterized
+
+
+def test_each_text_is_rasterized_once_across_calls(symbol_cache, tmp_path):
+    first, temporary = cached_code128(["3017868", "3010443", "3017868"], str(tmp_path / "temp"))
+    assert not temporary and symbol_cache == ["3017868", "3010443"]
+    assert Image.open(first["3017868"]).size[0] > 0
+
+    second, _ = cached_code128(["3010443", "3017868"], str(tmp_path / "temp"))
+    assert second == first and symbol_cache == ["3017868", "3010443"]
+
+    conf._config["barcodes"]["symbol"] = dict(conf.get("barcodes.symbol", {}), dpi=150)
+    third, _ = cached_code128(["3017868"], str(tmp_path / "temp"))
+    assert third["3017868"] != first["3017868"] and symbol_cache[-1] == "3017868"
+
+
+def test_entries_are_only_trimmed_after_use(symbol_cache, tmp_path):
+    conf._config["cache"]["symbols"]["max_size_mb"] = 0
+    paths, _ = cached_code128(["3017868", "3010443"], str(tmp_path / "temp"))
+    assert all(os.path.isfile(path) for path in paths.values())
+    trim_symbol_cache()
+    assert not any(os.path.isfile(path) for path in paths.values())
+
+
+def test_entry_evicted_by_another_process_is_rendered_again(symbol_cache, monkeypatch, tmp_path):
+    lookup = cached_code128
+
+    def evicted_after_lookup(texts, temp_folder):
+        paths, temporary = lookup(texts, temp_folder)
+        for path in paths.values():
+            os.remove(path)
+        return paths, temporary
+
+    monkeypatch.setattr(symbols, "cached_code128", evicted_after_lookup)
+    folder = tmp_path / "pngs"
+    assert [os.path.basename(path) for path in code128_pngs(["3017868", "3017868"], str(folder), ["a", "b"])] == ["a.png", "b.png"]
+
+    monkeypatch.setattr("src.renderers.pdf.cached_code128", evicted_after_lookup)
+    pdf_path = PdfRenderer(temp_path=str(tmp_path / "temp")).render(LabelJob.from_barcodes([["3017868", "3"]]), str(tmp_path), "Codigos")
+    assert len(PdfReader(pdf_path).pages) >= 1
@@ -0,0 +1,73 @@
+import re
+from itertools import product
+import pytest
+from config.config_loader import conf
+from src.labels import KIND_BARCODES, KIND_FRESCURAS
+from src.validation import (ERR_COPIES, ERR_COPIES_RANGE, ERR_FRESCURA_DATE, ERR_FRESCURA_FORMAT, ERR_INCOMPLETE,
+                            ERR_MAX_ROWS, ERR_SKU_FORMAT, ERR_SKU_UNKNOWN, validate_order)
+from utils.utils import frescure_to_date, validate_frescures, validate_sku
+
+PATTERN = conf.get("validation.frescura.pattern", r"^[A-L](0[1-9]|1[0-9]|2[0-9]|3[0-1])[0-9]$")
+
+
+def _reference(frescura: str):
+    """Validación fila a fila anterior: formato con validate_frescures y fecha con frescure_to_date."""
+    if not validate_frescures(re.compile(PATTERN), frescura):
+        return False, None
+    try:
+        date = frescure_to_date(frescura)
+    except ValueError:
+        return False, None
+    return bool(date), date or None
+
+
+def test_frescura_parity_with_frescure_to_date():
+    frescuras = [f"{letter}{day:02d}{year}" for letter, day, year in product("ABCDEFGHIJKL", range(0, 33), range(10))]
+    frescuras += ["M011", "Z305", "A0111", "A01", "0A11", "A 01", "AA11", "A1O1", ""]
+    validation = validate_order([["3000003", frescura, "1"] for frescura in frescuras], KIND_FRESCURAS,
+                                max_rows=len(frescuras))
+    dates = validation.table["fecha_lote"].dt.strftime("%d/%m/%Y")
+    for index, frescura in enumerate(frescuras):
+        expected_ok, expected_date = _reference(frescura)
+        assert bool(validation.valid_mask[index]) == expected_ok, frescura
+        if expected_ok:
+            assert dates[index] == expected_date, frescura
+
+
+def test_sku_parity_with_validate_sku():
+    skus = ["3000003", "300000", "30000033", "30000a3", " 3000003 ", "", "３000003"]
+    validation = validate_order([[sku, "A011", "1"] for sku in skus], KIND_FRESCURAS)
+    for index, sku in enumerate(skus):
+        expected = bool(sku.strip()) and validate_sku(sku) and sku.strip().isascii()
+        assert bool(validation.valid_mask[index]) == expected, sku
+
+
+def test_error_codes_per_row():
+    rows = [
+        ["3000003", "A011", "2"],    # válida
+        ["", "A011", "1"],           # incompleta
+        ["300", "A011", "1"],        # SKU con formato inválido
+        ["9999999", "A011", "1"],    # SKU fuera del catálogo
+        ["3000003", "M011", "1"],    # frescura con formato inválido
+        ["3000003", "B305", "1"],    # 30 de febrero
+        ["3000003", "A011", "x"],    # cantidad no numérica
+        ["3000003", "A011", "500"],  # cantidad fuera de rango
+    ]
+    validation = validate_order(rows, KIND_FRESCURAS, catalog_codes={"3000003"}, copies_range=(1, 99))
+    assert validation.errors_by_row() == {
+        2: [ERR_INCOMPLETE], 3: [ERR_SKU_FORMAT], 4: [ERR_SKU_UNKNOWN], 5: [ERR_FRESCURA_FORMAT],
+        6: [ERR_FRESCURA_DATE], 7: [ERR_COPIES], 8: [ERR_COPIES_RANGE],
+    }
+    assert validation.to_query() == [["3000003", "A011"], ["3000003", "A011"]]
+
+
+def test_max_rows_and_barcodes():
+    validation = validate_order([["ABC", "", "3"], ["", "", "1"], ["XYZ", "", "2"]], KIND_BARCODES, max_rows=2)
+    errors = validation.errors_by_row()
+    assert list(errors) == [2, 3] and errors[3] == [ERR_MAX_ROWS]
+    assert validation.to_query() == [["ABC", "3"]]
+
+
+@pytest.mark.parametrize("frescura", ["a011", " a011 "])
+def test_frescura_is_normalized(frescura):
+    assert validate_order([["3000003", frescura, "1"]], KIND_FRESCURAS).is_valid
@@ -0,0 +1,48 @@
+import socket
+import threading
+from config.config_loader import conf
+from src.labels import LabelJob
+from src.renderers.zpl import ZplRenderer
+
+
+def _serve_once(server: socket.socket, received: bytearray) -> None:
+    """Impresora de prueba: acepta una conexión y guarda todo lo recibido hasta que el cliente cierra."""
+    conn, _ = server.accept()
+    with conn:
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            received.extend(chunk)
+
+
+def test_batch_reaches_socket_target(monkeypatch, tmp_path):
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    server.settimeout(10)
+    received = bytearray()
+    thread = threading.Thread(target=_serve_once, args=(server, received), daemon=True)
+    thread.start()
+
+    settings = dict(conf._config)
+    settings["zpl"] = dict(settings.get("zpl") or {}, output="socket", host="127.0.0.1",
+                           port=server.getsockname()[1], timeout_seconds=5)
+    monkeypatch.setattr(conf, "_config", settings)
+
+    job = LabelJob.from_barcodes([["7501234567890", "3"], ["ABC-123", "1"], ["99887766", "12"]])
+    renderer = ZplRenderer()
+    try:
+        target = renderer.render(job, str(tmp_path), "codigos")
+        thread.join(10)
+    finally:
+        server.close()
+
+    assert target == f"127.0.0.1:{settings['zpl']['port']}"
+    assert bytes(received) == renderer.render_bytes(job)
+    zpl = received.decode("utf-8")
+    assert zpl.count("^XA") == 3
+    for copies in (3, 1, 12):
+        assert f"^PQ{copies},0,1,Y" in zpl
+    # Con destino socket no se escribe ningún archivo
+    assert not list(tmp_path.iterdir())
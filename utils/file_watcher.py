@@ -0,0 +1,94 @@
+import logging
+import os
+import sys
+import threading
+from typing import Callable, Optional, Tuple
+
+try:
+    import inotify_simple
+except ImportError:  # Opcional: sin él (o fuera de Linux) se sondea el mtime
+    inotify_simple = None
+
+logger = logging.getLogger(__name__)
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher:
+    """
+    Vigila un archivo en un hilo propio y llama a 'on_change(path)' desde ese hilo cuando cambia.
+    Usa inotify (inotify_simple) si está disponible; si no, sondea (mtime, tamaño) cada 'interval' segundos.
+    Antes de avisar espera a que el archivo deje de cambiar durante 'settle' segundos,
+    porque los editores y Excel guardan en varias escrituras o reemplazan el archivo.
+    """
+
+    def __init__(self, path: str, on_change: Callable[[str], None], interval: float = 1.0, settle: float = 0.5):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.interval = interval
+        self.settle = settle
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"watch-{os.path.basename(path)}", daemon=True)
+        self._last = _signature(self.path)
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if inotify_simple is not None and sys.platform.startswith("linux") else "polling"
+
+    def start(self) -> "FileWatcher":
+        self._thread.start()
+        logger.debug(f"Vigilando {self.path} ({self.backend})")
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 1)
+
+    def _run(self) -> None:
+        if self.backend == "inotify":
+            try:
+                self._run_inotify()
+                return
+            except OSError as e:
+                logger.warning(f"inotify no disponible ({e}); se usará sondeo")
+        self._run_polling()
+
+    def _run_polling(self) -> None:
+        while not self._stop.wait(self.interval):
+            if _signature(self.path) != self._last:
+                self._notify()
+
+    def _run_inotify(self) -> None:
+        flags = inotify_simple.flags
+        mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE | flags.MODIFY
+        name = os.path.basename(self.path)
+        # Se vigila la carpeta: guardar con reemplazo cambia el inodo del archivo
+        with inotify_simple.INotify() as inotify:
+            inotify.add_watch(os.path.dirname(self.path), mask)
+            while not self._stop.is_set():
+                events = inotify.read(timeout=int(self.interval * 1000))
+                if any(event.name == name for event in events):
+                    self._notify()
+
+    def _notify(self) -> None:
+        # Esperar a que el archivo se estabilice
+        signature = _signature(self.path)
+        while not self._stop.wait(self.settle):
+            current = _signature(self.path)
+            if current == signature:
+                break
+            signature = current
+        if self._stop.is_set() or signature is None or signature == self._last:
+            return
+        self._last = signature
+        try:
+            self.on_change(self.path)
+        except Exception as e:
+            logger.error(f"Error al procesar el cambio de {self.path}: {e}", exc_info=True)
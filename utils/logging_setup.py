@@ -0,0 +1,153 @@
+import atexit
+import copy
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Callable, Iterator, List, Optional, Tuple
+from config.config_loader import conf
+from utils.utils import get_application_path
+
+DEFAULT_FORMAT = "%(filename)s:%(lineno)d: %(message)s"
+
+_listener: Optional[QueueListener] = None
+
+
+class TruncatingQueueHandler(QueueHandler):
+    """
+    Como el QueueHandler estándar, arma el mensaje (msg % args) y la traza al registrar, así la cola
+    lleva texto y no referencias a objetos que el llamador puede mutar después (ni objetos sin pickle,
+    para la cola entre procesos). Los mensajes de más de 'max_chars' se recortan; la traza nunca.
+    """
+
+    def __init__(self, log_queue, max_chars: int = 0):
+        super().__init__(log_queue)
+        self.max_chars = max_chars
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = record.getMessage()
+        if self.max_chars and len(message) > self.max_chars:
+            hidden = len(message) - self.max_chars
+            message = f"{message[:self.max_chars]}... [+{hidden} caracteres]"
+        formatter = self.formatter or logging.Formatter()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = formatter.formatException(record.exc_info)
+        if record.exc_text:
+            message = f"{message}\n{record.exc_text}"
+        if record.stack_info:
+            message = f"{message}\n{formatter.formatStack(record.stack_info)}"
+        record = copy.copy(record)
+        record.message = message
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        record.stack_info = None
+        return record
+
+
+class _ForwardHandler(logging.Handler):
+    """Reenvía los registros de los procesos de trabajo al logger del mismo nombre en este proceso."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        logging.getLogger(record.name).handle(record)
+
+
+def _max_chars() -> int:
+    return int(conf.get("logging.max_message_chars", 2000))
+
+
+def configure_logging() -> Optional[QueueListener]:
+    """
+    Aplica la sección 'logging' de settings.yaml: nivel, formato y archivo rotativo
+    (max_file_size_mb, backup_count). Las llamadas a logging arman el mensaje y lo encolan; un QueueListener
+    lo escribe a disco y consola en segundo plano. Es idempotente.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level_name = os.environ.get("DEBUG", conf.get("logging.level", "INFO")).upper()
+    level = getattr(logging, level_name, logging.INFO)
+    formatter = logging.Formatter(conf.get("logging.format", DEFAULT_FORMAT))
+
+    handlers: List[logging.Handler] = []
+    folder = conf.get("logging.folder", "logs")
+    if not os.path.isabs(folder):
+        folder = os.path.join(get_application_path(), folder)
+    try:
+        os.makedirs(folder, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            os.path.join(folder, conf.get("logging.file", "generador.log")),
+            maxBytes=int(float(conf.get("logging.max_file_size_mb", 5)) * 1024 * 1024),
+            backupCount=int(conf.get("logging.backup_count", 3)),
+            encoding="utf-8",
+            delay=True,
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    except OSError as e:
+        print(f"ADVERTENCIA: No se pudo abrir el log en {folder}: {e}")
+
+    # En el ejecutable sin consola no hay a dónde escribir stderr
+    if sys.stderr is not None:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+        handlers.append(stream_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = TruncatingQueueHandler(log_queue, _max_chars())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging() -> None:
+    """Vacía la cola y detiene el hilo de escritura."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+def init_worker_logging(log_queue, level: int) -> None:
+    """
+    Inicializador de los procesos de trabajo (src/sharding.py): sus registros van a 'log_queue'
+    y los escribe el proceso principal (ver worker_logging), con el mismo formato y archivo.
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(TruncatingQueueHandler(log_queue, _max_chars()))
+    root.setLevel(level)
+
+
+@contextmanager
+def worker_logging() -> Iterator[Tuple[Callable[..., None], tuple]]:
+    """
+    (initializer, initargs) para un ProcessPoolExecutor: una cola entre procesos que un hilo de este
+    proceso vacía hacia los loggers locales mientras dure el bloque.
+    """
+    log_queue = multiprocessing.Queue()
+    listener = QueueListener(log_queue, _ForwardHandler())
+    listener.start()
+    try:
+        yield init_worker_logging, (log_queue, logging.getLogger().getEffectiveLevel())
+    finally:
+        listener.stop()
+        log_queue.close()
+        log_queue.join_thread()
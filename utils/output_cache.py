@@ -0,0 +1,182 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from typing import Any, Dict, Optional, Tuple
+from config.config_loader import conf
+from utils.utils import get_application_path
+from utils.output_writer import copy_atomic
+
+logger = logging.getLogger(__name__)
+
+# Huellas ya calculadas: (ruta, mtime, tamaño) -> sha256
+_fingerprints: Dict[Tuple[str, float, int], str] = {}
+_fingerprints_lock = threading.Lock()
+
+
+def file_fingerprint(path: Optional[str]) -> Optional[str]:
+    """Devuelve el sha256 del contenido del archivo, memorizado por (ruta, mtime, tamaño)."""
+    if not path or not os.path.isfile(path):
+        return None
+    stat = os.stat(path)
+    cache_key = (os.path.abspath(path), stat.st_mtime, stat.st_size)
+    with _fingerprints_lock:
+        cached = _fingerprints.get(cache_key)
+    if cached:
+        return cached
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    fingerprint = digest.hexdigest()
+    with _fingerprints_lock:
+        _fingerprints[cache_key] = fingerprint
+    return fingerprint
+
+
+def build_key(**parts: Any) -> str:
+    """Construye la llave de contenido a partir de partes serializables a JSON."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class OutputCache:
+    """
+    Caché direccionada por contenido para documentos generados.
+    Cada entrada es un archivo '<llave><extensión>' dentro de 'cache_dir'.
+    El mtime de la entrada marca su último uso y la expulsión es LRU por tamaño total.
+    """
+
+    def __init__(self, cache_dir: str, max_size_mb: float):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _entry_path(self, key: str, extension: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{extension}")
+
+    def restore(self, key: str, dest_path: str) -> bool:
+        """Copia la entrada cacheada a 'dest_path'. Devuelve False si no existe."""
+        extension = os.path.splitext(dest_path)[1]
+        entry = self._entry_path(key, extension)
+        with self._lock:
+            if not os.path.isfile(entry):
+                return False
+            try:
+                os.utime(entry, None)
+                copy_atomic(entry, dest_path)
+            except OSError as e:
+                logger.warning(f"No se pudo restaurar desde caché {entry}: {e}")
+                return False
+        logger.info(f"Salida servida desde caché: {dest_path}")
+        return True
+
+    def lookup(self, key: str, extension: str) -> Optional[str]:
+        """Ruta de la entrada si existe (marcándola como usada), para leerla sin copiarla."""
+        entry = self._entry_path(key, extension)
+        try:
+            os.utime(entry, None)
+        except OSError:
+            return None
+        return entry
+
+    def store_bytes(self, key: str, extension: str, data: bytes, evict: bool = True) -> str:
+        """
+        Escribe 'data' como entrada (tmp + os.replace) y devuelve su ruta.
+        Con evict=False la expulsión queda para un trim() al final del lote.
+        """
+        entry = self._entry_path(key, extension)
+        tmp_path = f"{entry}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, entry)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if evict:
+            self.trim()
+        return entry
+
+    def trim(self) -> None:
+        with self._lock:
+            self._evict()
+
+    def store(self, key: str, src_path: str) -> None:
+        """Guarda una copia de 'src_path' bajo la llave (escritura atómica) y aplica la expulsión."""
+        if not os.path.isfile(src_path):
+            return
+        extension = os.path.splitext(src_path)[1]
+        entry = self._entry_path(key, extension)
+        tmp_path = f"{entry}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            try:
+                shutil.copyfile(src_path, tmp_path)
+                os.replace(tmp_path, entry)
+            except OSError as e:
+                logger.warning(f"No se pudo guardar en caché {src_path}: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for item in os.scandir(self.cache_dir):
+            if not item.is_file() or item.name.endswith(".tmp"):
+                continue
+            stat = item.stat()
+            entries.append((stat.st_mtime, stat.st_size, item.path))
+            total += stat.st_size
+
+        if total <= self.max_size_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                logger.debug(f"Entrada de caché expulsada: {path}")
+            except OSError as e:
+                logger.warning(f"No se pudo expulsar {path}: {e}")
+
+
+_instances: Dict[str, OutputCache] = {}
+_instance_lock = threading.Lock()
+
+
+def _get_cache(section: str, default_folder: str, default_size_mb: float) -> Optional[OutputCache]:
+    """Instancia única por sección 'cache.<section>' de settings.yaml, o None si está desactivada."""
+    if not conf.get(f"cache.{section}.enabled", True):
+        return None
+    with _instance_lock:
+        instance = _instances.get(section)
+        if instance is None:
+            folder = conf.get(f"cache.{section}.folder", default_folder)
+            if not os.path.isabs(folder):
+                folder = os.path.join(get_application_path(), folder)
+            try:
+                instance = _instances[section] = OutputCache(folder, float(conf.get(f"cache.{section}.max_size_mb", default_size_mb)))
+            except OSError as e:
+                logger.warning(f"Caché '{section}' desactivada: {e}")
+                return None
+        return instance
+
+
+def get_output_cache() -> Optional[OutputCache]:
+    """Devuelve la caché global de documentos configurada en settings.yaml, o None si está desactivada."""
+    return _get_cache("output", "cache_salidas", 200)
+
+
+def get_symbol_cache() -> Optional[OutputCache]:
+    """Caché persistente de símbolos rasterizados (un PNG por texto y estilo), compartida entre corridas."""
+    return _get_cache("symbols", "cache_simbolos", 50)
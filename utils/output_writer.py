@@ -0,0 +1,93 @@
+import logging
+import os
+import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import BinaryIO, Callable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sufijo de los archivos a medio escribir: las colas de impresión que buscan *.pdf / *.xlsx no los ven
+PART_SUFFIX = ".part"
+BLOCK_SIZE = 1024 * 1024
+
+
+@contextmanager
+def open_atomic(path: str) -> Iterator[BinaryIO]:
+    """
+    Abre '<path>.part' para escritura binaria y, al salir sin errores, lo renombra a 'path' (os.replace).
+    El destino nunca queda a medias: o existe la versión anterior o la nueva completa.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}{PART_SUFFIX}"
+    try:
+        with open(tmp_path, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_atomic(path: str, data: bytes) -> str:
+    """Escribe 'data' en 'path' por bloques (los recursos compartidos de red toleran mal escrituras enormes)."""
+    view = memoryview(data)
+    with open_atomic(path) as f:
+        for start in range(0, len(view), BLOCK_SIZE):
+            f.write(view[start:start + BLOCK_SIZE])
+    return path
+
+
+def copy_atomic(src_path: str, dest_path: str) -> str:
+    with open(src_path, "rb") as src, open_atomic(dest_path) as dest:
+        shutil.copyfileobj(src, dest, BLOCK_SIZE)
+    return dest_path
+
+
+class BackgroundWriter:
+    """
+    Escritor de un solo hilo para documentos producidos en memoria.
+    submit() entrega el bloque y vuelve de inmediato, así el render del siguiente se solapa con la escritura;
+    como mucho hay una escritura en curso (memoria acotada a dos bloques). 'on_written' corre en el hilo
+    que llama, al confirmarse la escritura, para que los puntos de control no se toquen desde dos hilos.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="output-writer")
+        self._pending: Optional[Tuple[Future, Optional[Callable[[str], None]]]] = None
+
+    def submit(self, path: str, data: bytes, on_written: Optional[Callable[[str], None]] = None) -> None:
+        self.flush()
+        self._pending = (self._executor.submit(write_atomic, path, data), on_written)
+
+    def flush(self) -> None:
+        """Espera la escritura en curso; relanza su error, si lo hubo."""
+        if self._pending is None:
+            return
+        future, on_written = self._pending
+        self._pending = None
+        path = future.result()
+        if on_written is not None:
+            on_written(path)
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "BackgroundWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # Ya hay un error en curso: esperar al hilo sin enmascararlo
+        try:
+            self.close()
+        except Exception as e:
+            logger.warning(f"Escritura pendiente fallida tras otro error: {e}")
@@ -0,0 +1,98 @@
+import logging
+from typing import BinaryIO, Dict, List
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, NameObject, NumberObject, PdfObject
+
+logger = logging.getLogger(__name__)
+
+# Objetos fijos del documento unido; el resto se numera a partir de FIRST_FREE_ID
+PAGES_ID = 1
+CATALOG_ID = 2
+FIRST_FREE_ID = 3
+
+
+class StreamingPdfMerger:
+    """
+    Une PDFs escribiendo cada parte directo al archivo de salida, una a la vez.
+
+    De cada parte se copian solo los objetos alcanzables desde sus páginas (contenido, fuentes, imágenes),
+    renumerados y con /Parent apuntando al árbol de páginas común; el lector se suelta al terminar la parte.
+    En memoria solo quedan los desplazamientos del xref y la lista de páginas (enteros), así que la memoria
+    no crece con el contenido del trabajo, a diferencia de PdfWriter.append, que retiene todas las páginas.
+    """
+
+    def __init__(self, out: BinaryIO):
+        self.out = out
+        self.offsets: Dict[int, int] = {}
+        self.page_ids: List[int] = []
+        self._next_id = FIRST_FREE_ID
+        out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _allocate(self) -> int:
+        new_id = self._next_id
+        self._next_id += 1
+        return new_id
+
+    def _write_object(self, new_id: int, obj: PdfObject) -> None:
+        self.offsets[new_id] = self.out.tell()
+        self.out.write(f"{new_id} 0 obj\n".encode("ascii"))
+        obj.write_to_stream(self.out)
+        self.out.write(b"\nendobj\n")
+
+    def append(self, path: str) -> None:
+        reader = PdfReader(path)
+        mapping: Dict[int, int] = {}
+        pending: List[int] = []
+
+        def remap(obj: PdfObject) -> PdfObject:
+            """Reemplaza en el lugar las referencias de la parte por las del documento unido."""
+            if isinstance(obj, IndirectObject):
+                if obj.idnum not in mapping:
+                    mapping[obj.idnum] = self._allocate()
+                    pending.append(obj.idnum)
+                return IndirectObject(mapping[obj.idnum], 0, None)
+            if isinstance(obj, DictionaryObject):
+                for key, value in list(obj.items()):
+                    obj[key] = remap(value)
+            elif isinstance(obj, ArrayObject):
+                for index, value in enumerate(obj):
+                    obj[index] = remap(value)
+            return obj
+
+        parent = IndirectObject(PAGES_ID, 0, None)
+        for page in reader.pages:
+            old_id = page.indirect_reference.idnum
+            mapping[old_id] = self._allocate()
+            self.page_ids.append(mapping[old_id])
+            # Los atributos heredados ya vienen copiados en la página; el árbol de la parte no se usa
+            page[NameObject("/Parent")] = parent
+            for key, value in list(page.items()):
+                if key != "/Parent":
+                    page[key] = remap(value)
+            self._write_object(mapping[old_id], page)
+
+        while pending:
+            old_id = pending.pop()
+            self._write_object(mapping[old_id], remap(reader.get_object(old_id)))
+        reader.stream.close()
+
+    def finish(self) -> None:
+        """Árbol de páginas, catálogo, xref y trailer."""
+        pages = DictionaryObject({
+            NameObject("/Type"): NameObject("/Pages"),
+            NameObject("/Kids"): ArrayObject(IndirectObject(page_id, 0, None) for page_id in self.page_ids),
+            NameObject("/Count"): NumberObject(len(self.page_ids)),
+        })
+        self._write_object(PAGES_ID, pages)
+        catalog = DictionaryObject({
+            NameObject("/Type"): NameObject("/Catalog"),
+            NameObject("/Pages"): IndirectObject(PAGES_ID, 0, None),
+        })
+        self._write_object(CATALOG_ID, catalog)
+
+        xref_offset = self.out.tell()
+        size = self._next_id
+        self.out.write(f"xref\n0 {size}\n0000000000 65535 f \n".encode("ascii"))
+        for object_id in range(1, size):
+            self.out.write(f"{self.offsets[object_id]:010d} 00000 n \n".encode("ascii"))
+        self.out.write(f"trailer\n<< /Size {size} /Root {CATALOG_ID} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("ascii"))
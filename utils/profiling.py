@@ -0,0 +1,133 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from typing import Callable, Iterator, Optional
+from config.config_loader import conf
+
+logger = logging.getLogger(__name__)
+
+# Variable de entorno que activa el perfilado sin tocar settings.yaml
+PROFILE_ENV_VAR = "GENERADOR_PROFILE"
+
+# Solo un perfilado activo a la vez: las llamadas anidadas (GUI -> motor) no reinician el perfil
+_active_lock = threading.Lock()
+_active = False
+
+
+def profiling_enabled() -> bool:
+    """Indica si el perfilado está activo (variable de entorno o settings.yaml)."""
+    env_value = os.environ.get(PROFILE_ENV_VAR, "").strip().lower()
+    if env_value:
+        return env_value in {"1", "true", "yes", "si", "on"}
+    return bool(conf.get("profiling.enabled", False))
+
+
+def _format_cpu_table(profiler: cProfile.Profile, top_n: int) -> str:
+    buffer = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buffer)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top_n)
+    return buffer.getvalue()
+
+
+def _format_memory_table(snapshot: tracemalloc.Snapshot, top_n: int) -> str:
+    lines = []
+    top_stats = snapshot.statistics("lineno")
+    for index, stat in enumerate(top_stats[:top_n], start=1):
+        frame = stat.traceback[0]
+        lines.append(f"{index:>3}. {frame.filename}:{frame.lineno}: {stat.size / 1024:.1f} KiB ({stat.count} bloques)")
+    total = sum(stat.size for stat in top_stats)
+    lines.append(f"Total asignado: {total / 1024:.1f} KiB")
+    return "\n".join(lines)
+
+
+def _dump_report(name: str, output_dir: str, elapsed: float, profiler: cProfile.Profile,
+                 snapshot: Optional[tracemalloc.Snapshot], peak: int) -> None:
+    folder = os.path.join(output_dir, conf.get("profiling.folder", "profiling"))
+    os.makedirs(folder, exist_ok=True)
+    top_n = int(conf.get("profiling.top_n", 25))
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    base = os.path.join(folder, f"{name}_{stamp}")
+
+    profiler.dump_stats(f"{base}.prof")
+
+    with open(f"{base}.txt", "w", encoding="utf-8") as f:
+        f.write(f"Perfil de '{name}' - duración: {elapsed:.3f} s\n\n")
+        f.write(f"=== Top {top_n} por tiempo acumulado ===\n")
+        f.write(_format_cpu_table(profiler, top_n))
+        if snapshot is not None:
+            f.write(f"\n=== Top {top_n} asignaciones de memoria (pico: {peak / 1024:.1f} KiB) ===\n")
+            f.write(_format_memory_table(snapshot, top_n))
+            f.write("\n")
+
+    logger.info(f"Perfil guardado: {base}.prof ({elapsed:.3f} s)")
+
+
+@contextmanager
+def profile_run(name: str, output_dir: str) -> Iterator[None]:
+    """
+    Envuelve una ejecución con cProfile y tracemalloc si el perfilado está activo.
+    Solo se escribe el reporte si la ejecución supera 'profiling.min_duration_seconds'.
+    """
+    global _active
+    if not profiling_enabled():
+        yield
+        return
+
+    with _active_lock:
+        nested = _active
+        _active = True
+    if nested:
+        yield
+        return
+
+    trace_memory = bool(conf.get("profiling.trace_memory", True))
+    started_tracemalloc = False
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start(int(conf.get("profiling.trace_frames", 1)))
+        started_tracemalloc = True
+
+    profiler = cProfile.Profile()
+    t0 = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - t0
+        snapshot = None
+        peak = 0
+        if trace_memory and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+        if started_tracemalloc:
+            tracemalloc.stop()
+        with _active_lock:
+            _active = False
+
+        min_duration = float(conf.get("profiling.min_duration_seconds", 2.0))
+        if elapsed < min_duration:
+            logger.debug(f"Perfil de '{name}' descartado ({elapsed:.3f} s < {min_duration} s)")
+        else:
+            try:
+                _dump_report(name, output_dir, elapsed, profiler, snapshot, peak)
+            except Exception as e:
+                logger.warning(f"No se pudo guardar el perfil de '{name}': {e}")
+
+
+def profiled(name: str, output_dir_getter: Callable[..., str]) -> Callable:
+    """Decorador de métodos: 'output_dir_getter' recibe la instancia y devuelve la carpeta de salida."""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with profile_run(name, output_dir_getter(self)):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,269 @@
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+from config.config_loader import conf
+
+logger = logging.getLogger(__name__)
+
+# Índice de uso dentro de la carpeta administrada (oculto, no es un trabajo)
+INDEX_FILE = ".retencion.json"
+# Marca que deja el administrador en cada subcarpeta que crea: solo esas se adoptan o se expulsan
+MARKER_FILE = ".trabajo.json"
+DAY_SECONDS = 24 * 60 * 60
+
+
+def _folder_size(path: str) -> int:
+    """Bytes de un solo trabajo (se recorre solo esa subcarpeta, nunca el árbol completo)."""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                pass
+    return total
+
+
+def _read_marker(path: str) -> Optional[Dict[str, Any]]:
+    """Contenido de la marca de trabajo, o None si 'path' no es una carpeta creada por el administrador."""
+    marker_path = os.path.join(path, MARKER_FILE)
+    if not os.path.isfile(marker_path):
+        return None
+    try:
+        with open(marker_path, "r", encoding="utf-8") as f:
+            marker = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return marker if isinstance(marker, dict) else None
+
+
+class RetentionManager:
+    """
+    Retención acotada de una carpeta dedicada ('root'): cada generación escribe en su propia subcarpeta
+    ('<AAAAmmdd-HHMMSS>_<modo>') con una marca MARKER_FILE, y el índice de uso guarda bytes, último uso,
+    llave del pedido y si terminó.
+
+    Solo se adoptan y expulsan subcarpetas con la marca; cualquier otro archivo o carpeta que haya en
+    'root' se ignora. Un trabajo sin terminar (la corrida falló o se cerró el programa) se reutiliza
+    cuando se vuelve a generar el mismo pedido, así sus puntos de control permiten reanudar.
+
+    El índice se actualiza al terminar cada trabajo midiendo solo esa subcarpeta, así que consultar
+    el uso no recorre el árbol. Un hilo en segundo plano expulsa trabajos por LRU mientras se supere
+    el presupuesto de bytes y borra los que excedan la edad máxima; nunca el trabajo en curso.
+    """
+
+    def __init__(self, root: str, max_bytes: int, max_age_seconds: float):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.index_path = os.path.join(self.root, INDEX_FILE)
+        self._lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._active: Dict[str, int] = {}
+        self._wake = threading.Event()
+        os.makedirs(self.root, exist_ok=True)
+        self.entries: Dict[str, Dict[str, Any]] = self._load_index()
+        self._thread = threading.Thread(target=self._evict_loop, name=f"retention-{os.path.basename(self.root)}", daemon=True)
+        self._thread.start()
+        self._wake.set()
+
+    # ==================== Índice ====================
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return self._adopt_existing()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Índice de retención ilegible ({e}); se reconstruye")
+            return self._adopt_existing()
+        # Un índice editado a mano no puede hacer que se expulse algo que no creamos
+        return {name: entry for name, entry in entries.items() if self._is_job(name)}
+
+    def _adopt_existing(self) -> Dict[str, Dict[str, Any]]:
+        """Primera vez (o índice dañado): registra los trabajos marcados que ya hay en la carpeta, una sola vez."""
+        entries = {}
+        for item in os.scandir(self.root):
+            marker = _read_marker(item.path) if item.is_dir(follow_symlinks=False) else None
+            if marker is None:
+                continue
+            entries[item.name] = {
+                "bytes": _folder_size(item.path),
+                "last_used": item.stat().st_mtime,
+                "key": marker.get("key", ""),
+                "done": True,
+            }
+        self._write_index(entries)
+        return entries
+
+    def _is_job(self, name: str) -> bool:
+        path = os.path.join(self.root, name)
+        return os.path.isdir(path) and not os.path.islink(path) and _read_marker(path) is not None
+
+    def _write_index(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            with self._index_lock:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(entries, f, separators=(",", ":"))
+                os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"No se pudo guardar el índice de retención: {e}")
+
+    @property
+    def used_bytes(self) -> int:
+        with self._lock:
+            return int(sum(entry["bytes"] for entry in self.entries.values()))
+
+    # ==================== Trabajos ====================
+
+    def job_folder(self, mode: str, key: str = "", append: bool = False) -> str:
+        """
+        Subcarpeta para una generación.
+        key: llave estable del pedido; si el último trabajo con esa llave no terminó, se reutiliza su carpeta
+        (ahí están sus puntos de control). Solo se crea una nueva cuando el anterior quedó confirmado.
+        append: se reutiliza la última del mismo modo, porque ahí viven el manifiesto de la corrida y las partes previas.
+        """
+        suffix = f"_{mode}"
+        with self._lock:
+            name = None
+            if append:
+                previous = [job for job in self.entries if job.endswith(suffix) and self._is_job(job)]
+                if previous:
+                    name = max(previous, key=lambda job: self.entries[job]["last_used"])
+            elif key:
+                unfinished = [job for job, entry in self.entries.items()
+                              if entry.get("key") == key and not entry.get("done", True) and self._is_job(job)]
+                if unfinished:
+                    name = max(unfinished, key=lambda job: self.entries[job]["last_used"])
+                    logger.info(f"Se reutiliza el trabajo sin terminar del mismo pedido: {name}")
+            created = name is None
+            if created:
+                stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+                name = f"{stamp}{suffix}"
+                counter = 1
+                while name in self.entries or os.path.exists(os.path.join(self.root, name)):
+                    counter += 1
+                    name = f"{stamp}-{counter}{suffix}"
+            self._active[name] = self._active.get(name, 0) + 1
+            entry = self.entries.setdefault(name, {"bytes": 0, "last_used": time.time(), "key": key})
+            entry["done"] = False
+            snapshot = dict(self.entries)
+        path = os.path.join(self.root, name)
+        if created:
+            os.makedirs(path, exist_ok=True)
+            with open(os.path.join(path, MARKER_FILE), "w", encoding="utf-8") as f:
+                json.dump({"mode": mode, "key": key, "created": time.time()}, f)
+        # Sin terminar en el índice desde ahora: si el proceso muere, la próxima corrida lo encuentra
+        self._write_index(snapshot)
+        return path
+
+    def commit(self, path: str, finished: bool = True) -> None:
+        """
+        Fin del trabajo: mide su subcarpeta, actualiza el índice y despierta la expulsión.
+        finished=False (la corrida falló) deja el trabajo abierto para reanudarlo con el mismo pedido.
+        """
+        name = os.path.basename(os.path.normpath(path))
+        size = _folder_size(path) if os.path.exists(path) else 0
+        # Trabajo terminado sin salidas (p. ej. ZPL enviado a la impresora): no se conserva la carpeta
+        empty = finished and os.path.isdir(path) and os.listdir(path) == [MARKER_FILE]
+        with self._lock:
+            count = self._active.get(name, 0) - 1
+            if count > 0:
+                self._active[name] = count
+            else:
+                self._active.pop(name, None)
+            entry = self.entries.get(name)
+            if empty and name not in self._active:
+                self.entries.pop(name, None)
+                shutil.rmtree(path, ignore_errors=True)
+            elif entry is not None:
+                entry.update(bytes=size, last_used=time.time(), done=finished)
+            snapshot = dict(self.entries)
+        self._write_index(snapshot)
+        self._wake.set()
+
+    # ==================== Expulsión (hilo en segundo plano) ====================
+
+    def _evict_loop(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                self.enforce()
+            except Exception as e:
+                logger.error(f"Error en la retención de {self.root}: {e}", exc_info=True)
+
+    def enforce(self) -> None:
+        """Expulsa por edad y luego por LRU hasta cumplir el presupuesto de bytes."""
+        now = time.time()
+        with self._lock:
+            candidates = sorted(
+                (entry["last_used"], name, entry["bytes"])
+                for name, entry in self.entries.items() if name not in self._active
+            )
+            total = sum(entry["bytes"] for entry in self.entries.values())
+        victims = []
+        for last_used, name, size in candidates:
+            if total > self.max_bytes or (self.max_age_seconds and now - last_used > self.max_age_seconds):
+                victims.append(name)
+                total -= size
+        if not victims:
+            return
+
+        for name in victims:
+            with self._lock:
+                if name in self._active:
+                    continue
+            path = os.path.join(self.root, name)
+            try:
+                # Se comprueba la marca justo antes de borrar: nunca se toca algo que no creamos
+                if self._is_job(name):
+                    shutil.rmtree(path)
+            except OSError as e:
+                logger.warning(f"No se pudo expulsar {path}: {e}")
+                continue
+            with self._lock:
+                if name not in self._active:
+                    self.entries.pop(name, None)
+            logger.debug(f"Trabajo expulsado por retención: {path}")
+        with self._lock:
+            snapshot = dict(self.entries)
+        self._write_index(snapshot)
+        logger.info(f"Retención {self.root}: {len(victims)} trabajos expulsados, {self.used_bytes / 1024 / 1024:.1f} MB en uso")
+
+
+_managers: Dict[str, RetentionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_retention(root: str, section: str = "output") -> Optional[RetentionManager]:
+    """
+    Administrador de la subcarpeta dedicada 'retention.folder' dentro de 'root' (la carpeta que eligió
+    el usuario no se administra) con el presupuesto 'retention.<section>' de settings.yaml,
+    o None si la retención está desactivada (se escribe directo en 'root', como antes).
+    """
+    if not conf.get("retention.enabled", True):
+        return None
+    root = os.path.abspath(os.path.join(root, conf.get("retention.folder", "generaciones")))
+    with _managers_lock:
+        manager = _managers.get(root)
+        if manager is None:
+            try:
+                manager = _managers[root] = RetentionManager(
+                    root,
+                    int(float(conf.get(f"retention.{section}.max_size_mb", 2000)) * 1024 * 1024),
+                    float(conf.get(f"retention.{section}.max_age_days", 30)) * DAY_SECONDS,
+                )
+            except OSError as e:
+                logger.warning(f"Retención desactivada para {root}: {e}")
+                return None
+        return manager
@@ -1,10 +1,41 @@
+import os
 import re
-from typing import Pattern, List
+import sys
+from typing import Any, Iterable, Pattern, List
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+def get_application_path() -> str:
+    """Obtiene la ruta de la aplicación (compatible con PyInstaller)."""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Preview:
+    """
+    Vista perezosa y acotada de una colección para los logs: solo se convierte a texto
+    si el mensaje se emite, y nunca más de 'limit' elementos.
+    Uso: logger.info("Consulta: %s", Preview(datos))
+    """
+
+    __slots__ = ("items", "limit")
+
+    def __init__(self, items: Iterable[Any], limit: int = 5):
+        self.items = items
+        self.limit = limit
+
+    def __str__(self) -> str:
+        items = self.items if isinstance(self.items, (list, tuple)) else list(self.items)
+        shown = ", ".join(repr(item) for item in items[:self.limit])
+        hidden = len(items) - self.limit
+        if hidden > 0:
+            return f"[{shown}, ... (+{hidden} más)] ({len(items)} en total)"
+        return f"[{shown}]"
+
+
 def validate_text(text: str) -> bool:
     text = text.strip()
     if len(text) > 0 and not text.isspace():